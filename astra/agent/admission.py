@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .config import config
+from .metrics import observe_stage
+
+
+class Overloaded(RuntimeError):
+    """A stage could not admit a request within its queue-wait budget; answered with 429."""
+
+    def __init__(self, stage: str, retry_after_sec: float):
+        super().__init__(f"{stage} stage overloaded, retry later")
+        self.stage = stage
+        self.retry_after_sec = retry_after_sec
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Slot:
+    """One admitted request; ``release`` is idempotent.
+
+    A slot handed to a streaming response is released by the body's
+    ``finally`` and by the response's background task, whichever runs first;
+    collection is only the last resort.
+    """
+
+    def __init__(self, limiter: StageLimiter, waited: float):
+        self.limiter = limiter
+        self.waited = waited
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.limiter._release(time.monotonic() - self._start)
+
+    def __del__(self) -> None:
+        self.release()
+
+
+class StageLimiter:
+    """At most ``limit`` concurrent requests in one pipeline stage, FIFO beyond that.
+
+    A request that would queue is rejected right away when the expected wait
+    (queue position times the EWMA time a slot is held) exceeds
+    ``max_wait_sec``, and after waiting that long otherwise, so overload turns
+    into fast 429s instead of slow timeouts. Not tied to one event loop.
+    """
+
+    def __init__(self, name: str, limit: int, max_wait_sec: float, alpha: float = 0.2):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_wait_sec = max_wait_sec
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self.in_use = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.hold_ewma_sec: Optional[float] = None
+        self.wait_ewma_sec = 0.0
+
+    def _expected_wait(self, position: int) -> float:
+        # Slots free up at about limit / hold_time per second
+        if self.hold_ewma_sec is None:
+            return 0.0
+        return self.hold_ewma_sec * math.ceil(position / self.limit)
+
+    def _reject(self, position: int) -> Overloaded:
+        self.rejected += 1
+        retry = max(1.0, self._expected_wait(position + 1))
+        return Overloaded(self.name, retry)
+
+    def _admitted(self, waited: float) -> Slot:
+        if waited:
+            observe_stage(f"{self.name}_admission_wait", waited)
+        self.admitted += 1
+        self.wait_ewma_sec += self.alpha * (waited - self.wait_ewma_sec)
+        return Slot(self, waited)
+
+    async def acquire(self) -> Slot:
+        start = time.monotonic()
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return self._admitted(0.0)
+            position = len(self._waiters) + 1
+            if self._expected_wait(position) > self.max_wait_sec:
+                raise self._reject(position)
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait_sec)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    raise self._reject(len(self._waiters))
+            # The slot was handed over just as the wait ended
+            if isinstance(e, asyncio.CancelledError):
+                self._release(None)
+                raise
+        with self._lock:
+            return self._admitted(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Slot]:
+        slot = await self.acquire()
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def _release(self, held: Optional[float]) -> None:
+        with self._lock:
+            if held is not None:
+                if self.hold_ewma_sec is None:
+                    self.hold_ewma_sec = held
+                else:
+                    self.hold_ewma_sec += self.alpha * (held - self.hold_ewma_sec)
+            # Hand the slot straight to the next live waiter; in_use is unchanged then
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    continue  # that waiter's event loop is closed
+                waiter.granted = True
+                return
+            self.in_use -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_use": self.in_use,
+                "waiting": len(self._waiters),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_hold_ms": round((self.hold_ewma_sec or 0.0) * 1000, 1),
+                "avg_wait_ms": round(self.wait_ewma_sec * 1000, 1),
+            }
+
+
+_max_wait = config.admission_max_wait_ms / 1000
+stages: Dict[str, StageLimiter] = {
+    "llm": StageLimiter("llm", config.llm_concurrency, _max_wait),
+    "exec": StageLimiter("exec", config.exec_concurrency, _max_wait),
+    "stt": StageLimiter("stt", config.stt_concurrency or config.whisper_workers, _max_wait),
+}
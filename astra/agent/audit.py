@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import bisect
 import json
+import logging
+import os
+import queue
+import re
+import struct
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterator, Optional
 
 from cryptography.fernet import Fernet
 
 from .config import config
+from .metrics import stage
+from .startup import timed
+
+
+# Segment record: token length + timestamp (ms) header, then the Fernet token.
+# The plaintext timestamp lets readers skip records without decrypting them.
+_RECORD_HEADER = struct.Struct(">IQ")
+# Sparse index entry: timestamp (ms) and byte offset of a record header
+_INDEX_ENTRY = struct.Struct(">QQ")
+
+SEGMENT_SUFFIX = ".alog"
+INDEX_SUFFIX = ".aidx"
+_SEGMENT_RE = re.compile(r"^segment_(\d+)(?:_\d+)?\.alog$")
+_LEGACY_RE = re.compile(r"^event_(\d+)\.log$")
 
 
 def _ensure_key(path: Path) -> bytes:
@@ -18,18 +42,356 @@ def _ensure_key(path: Path) -> bytes:
     return path.read_bytes()
 
 
-class SecureAuditLog:
-    def __init__(self, dir_path: Path, key_file: Path):
+@dataclass
+class AuditEntry:
+    ts_ms: int
+    record: dict[str, Any]
+    source: Path
+
+
+class SegmentWriter:
+    """Append length-prefixed tokens to rotating segment files.
+
+    A segment is rotated once it exceeds ``max_bytes`` or is older than
+    ``max_age_sec``. Every ``index_every``-th record (and the first one) gets an
+    entry in the segment's sparse timestamp index. Timestamps are kept
+    monotonic within a segment so the index can be binary-searched.
+    """
+
+    def __init__(self, dir_path: Path, max_bytes: int, max_age_sec: float, index_every: int):
         self.dir = dir_path
+        self.max_bytes = max_bytes
+        self.max_age_ms = int(max_age_sec * 1000)
+        self.index_every = max(1, index_every)
+        self._log: Optional[BinaryIO] = None
+        self._idx: Optional[BinaryIO] = None
+        self._start_ms = 0
+        self._size = 0
+        self._count = 0
+        self._last_ts = 0
+
+    def _open_segment(self, ts_ms: int) -> None:
+        self.close()
         self.dir.mkdir(parents=True, exist_ok=True)
-        key = _ensure_key(key_file)
+        # Never append to a segment another writer (or a crashed run) may own
+        name = f"segment_{ts_ms:013d}"
+        n = 0
+        while (self.dir / f"{name}{SEGMENT_SUFFIX}").exists():
+            n += 1
+            name = f"segment_{ts_ms:013d}_{n}"
+        self._log = open(self.dir / f"{name}{SEGMENT_SUFFIX}", "ab")
+        self._idx = open(self.dir / f"{name}{INDEX_SUFFIX}", "ab")
+        self._start_ms = ts_ms
+        self._size = 0
+        self._count = 0
+
+    def append(self, ts_ms: int, token: bytes) -> None:
+        ts_ms = max(ts_ms, self._last_ts)
+        if (
+            self._log is None
+            or self._size >= self.max_bytes
+            or ts_ms - self._start_ms >= self.max_age_ms
+        ):
+            self._open_segment(ts_ms)
+        assert self._log is not None and self._idx is not None
+        if self._count % self.index_every == 0:
+            self._idx.write(_INDEX_ENTRY.pack(ts_ms, self._size))
+        self._log.write(_RECORD_HEADER.pack(len(token), ts_ms))
+        self._log.write(token)
+        self._size += _RECORD_HEADER.size + len(token)
+        self._count += 1
+        self._last_ts = ts_ms
+
+    def flush(self, fsync: bool = False) -> None:
+        for f in (self._log, self._idx):
+            if f is not None:
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        for f in (self._log, self._idx):
+            if f is not None:
+                f.close()
+        self._log = None
+        self._idx = None
+
+
+class AuditReader:
+    """Iterate audit records by time range across segments and legacy per-event files.
+
+    Only records inside the requested range are decrypted. Records come out in
+    timestamp order within each source; sources are visited by start time.
+    """
+
+    def __init__(self, dir_path: Path, key: bytes):
+        self.dir = dir_path
         self.fernet = Fernet(key)
 
+    def _sources(self) -> list[tuple[int, Path]]:
+        out: list[tuple[int, Path]] = []
+        if not self.dir.exists():
+            return out
+        for p in self.dir.iterdir():
+            m = _SEGMENT_RE.match(p.name) or _LEGACY_RE.match(p.name)
+            if m:
+                out.append((int(m.group(1)), p))
+        out.sort()
+        return out
+
+    @staticmethod
+    def _seek_offset(index_path: Path, start_ms: Optional[int]) -> int:
+        if start_ms is None or not index_path.exists():
+            return 0
+        raw = index_path.read_bytes()
+        usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+        entries = [_INDEX_ENTRY.unpack_from(raw, i) for i in range(0, usable, _INDEX_ENTRY.size)]
+        # Last indexed record strictly before start_ms; everything ahead of it is older still
+        pos = bisect.bisect_left([ts for ts, _ in entries], start_ms) - 1
+        return entries[pos][1] if pos >= 0 else 0
+
+    def _iter_segment(
+        self, path: Path, start_ms: Optional[int], end_ms: Optional[int]
+    ) -> Iterator[AuditEntry]:
+        offset = self._seek_offset(path.with_suffix(INDEX_SUFFIX), start_ms)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                length, ts_ms = _RECORD_HEADER.unpack(header)
+                if end_ms is not None and ts_ms > end_ms:
+                    return
+                if start_ms is not None and ts_ms < start_ms:
+                    f.seek(length, os.SEEK_CUR)
+                    continue
+                token = f.read(length)
+                if len(token) < length:
+                    return  # torn tail from an interrupted write
+                yield AuditEntry(ts_ms, json.loads(self.fernet.decrypt(token)), path)
+
+    def iter_records(
+        self, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+    ) -> Iterator[AuditEntry]:
+        for first_ts, path in self._sources():
+            if end_ms is not None and first_ts > end_ms:
+                break
+            if path.suffix == SEGMENT_SUFFIX:
+                yield from self._iter_segment(path, start_ms, end_ms)
+            elif start_ms is None or first_ts >= start_ms:
+                record = json.loads(self.fernet.decrypt(path.read_bytes()))
+                yield AuditEntry(first_ts, record, path)
+
+
+class GroupCommitWriter:
+    """Background thread that batches queued records and commits them as a group.
+
+    A batch is closed after ``batch_max`` records or ``flush_interval_sec`` past
+    its first record, whichever comes first. When the queue is full the
+    ``backpressure`` policy applies: ``block`` waits for room, ``drop`` discards
+    the record (counted), ``spill`` commits it synchronously on the caller's
+    thread so nothing is lost.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        commit: Callable[[list[tuple[int, dict[str, Any]]]], None],
+        queue_size: int,
+        flush_interval_sec: float,
+        batch_max: int,
+        backpressure: str,
+    ):
+        if backpressure not in {"block", "drop", "spill"}:
+            raise ValueError(f"Unknown audit backpressure policy: {backpressure}")
+        self._commit = commit
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.flush_interval_sec = flush_interval_sec
+        self.batch_max = max(1, batch_max)
+        self.backpressure = backpressure
+        self._thread = threading.Thread(target=self._run, name="astra-audit-writer", daemon=True)
+        self._thread.start()
+        self.committed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+
+    def try_submit(self, item: tuple[int, dict[str, Any]]) -> bool:
+        """Queue without blocking or committing; False when the queue is full."""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def submit(self, item: tuple[int, dict[str, Any]]) -> None:
+        if self.backpressure == "block":
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.backpressure == "drop":
+                self.dropped += 1
+            else:
+                self.spilled += 1
+                self._commit([item])
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval_sec
+            while item is not self._STOP and len(batch) < self.batch_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+            records = [b for b in batch if b is not self._STOP]
+            try:
+                if records:
+                    self._commit(records)
+                    self.committed += len(records)
+                    self.batches += 1
+            except Exception as e:  # keep the writer alive; a lost batch must not stop auditing
+                self.failed += len(records)
+                logging.error("Audit writer failed to commit %d records: %s", len(records), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if item is self._STOP:
+                return
+
+    def flush(self) -> None:
+        """Block until every record queued so far has been committed."""
+        self._queue.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "committed": self.committed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed": self.failed,
+        }
+
+
+class SecureAuditLog:
+    """Encrypted, segmented audit log.
+
+    The directory and key are created (or the key read) on the first write
+    or read, or by ``open``, so importing the module touches no files.
+    """
+
+    def __init__(self, dir_path: Path, key_file: Path):
+        self.dir = dir_path
+        self.key_file = key_file
+        self.key: Optional[bytes] = None
+        self.fernet: Optional[Fernet] = None
+        self._lock = threading.Lock()
+        self._segments: Optional[SegmentWriter] = None
+        self._writer: Optional[GroupCommitWriter] = None
+        self._closed = False
+
+    def open(self) -> None:
+        if self._segments is not None:
+            return
+        with self._lock:
+            if self._segments is not None:
+                return
+            with timed("audit.open"):
+                self.dir.mkdir(parents=True, exist_ok=True)
+                self.key = _ensure_key(self.key_file)
+                self.fernet = Fernet(self.key)
+                self._segments = SegmentWriter(
+                    self.dir,
+                    max_bytes=config.audit_segment_max_bytes,
+                    max_age_sec=config.audit_segment_max_age_sec,
+                    index_every=config.audit_index_every,
+                )
+
+    def _commit(self, batch: list[tuple[int, dict[str, Any]]]) -> None:
+        self.open()
+        # Encrypt outside the lock; only the appends need to be serialized
+        with stage("audit_encrypt"):
+            tokens = [
+                (ts, self.fernet.encrypt(json.dumps(record, ensure_ascii=False).encode("utf-8")))
+                for ts, record in batch
+            ]
+        with stage("audit_write"), self._lock:
+            for ts, token in tokens:
+                self._segments.append(ts, token)
+            self._segments.flush(fsync=config.audit_fsync == "batch")
+
+    def _get_writer(self) -> Optional[GroupCommitWriter]:
+        if not config.audit_async or self._closed:
+            return None
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = GroupCommitWriter(
+                        self._commit,
+                        queue_size=config.audit_queue_size,
+                        flush_interval_sec=config.audit_flush_interval_sec,
+                        batch_max=config.audit_batch_max,
+                        backpressure=config.audit_backpressure,
+                    )
+                    atexit.register(self.close)
+        return self._writer
+
     def write(self, record: dict[str, Any]) -> None:
-        ts = int(time.time() * 1000)
-        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
-        token = self.fernet.encrypt(data)
-        (self.dir / f"event_{ts}.log").write_bytes(token)
+        self._write_item((int(time.time() * 1000), record))
+
+    async def write_async(self, record: dict[str, Any]) -> None:
+        """``write`` for the event loop: a commit (sync mode, spill, block) runs in a worker thread."""
+        item = (int(time.time() * 1000), record)
+        writer = self._get_writer()
+        if writer is not None and writer.try_submit(item):
+            return
+        await asyncio.to_thread(self._write_item, item)
+
+    def _write_item(self, item: tuple[int, dict[str, Any]]) -> None:
+        writer = self._get_writer()
+        if writer is None:
+            self._commit([item])
+        else:
+            writer.submit(item)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def read(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[AuditEntry]:
+        self.open()
+        return AuditReader(self.dir, self.key).iter_records(start_ms, end_ms)
+
+    def stats(self) -> dict[str, Any]:
+        if self._writer is None:
+            return {"mode": "sync" if not config.audit_async else "idle"}
+        return {"mode": "async", **self._writer.stats()}
+
+    def close(self) -> None:
+        """Drain the background writer and close the current segment."""
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+        with self._lock:
+            if self._segments is not None:
+                self._segments.close()
 
 
 audit = SecureAuditLog(config.audit_dir, config.audit_key_file)
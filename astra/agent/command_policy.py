@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import config
+
+ALLOW = "allow"
+CONFIRM = "confirm"
+DENY = "deny"
+_SEVERITY = {ALLOW: 0, CONFIRM: 1, DENY: 2}
+
+# Built-in rules; a policy file adds to these unless it sets "replace_defaults".
+# A rule matches a command whose binary (basename of argv[0]; "name*" matches a prefix,
+# "*" any binary) is listed, when every "args" regex fully matches some argument and,
+# if "paths" is given, some argument lies under one of those path prefixes. The most
+# severe matching rule decides; commands no rule matches get "default".
+DEFAULT_POLICY: Dict[str, Any] = {
+    "default": ALLOW,
+    # Binaries that run another command from their arguments; those are checked too. An
+    # argument containing whitespace is also checked as a command string (watch, sg, script -c).
+    "wrappers": ["env", "nice", "nohup", "timeout", "xargs", "stdbuf", "ionice", "setsid", "time",
+                 "command", "exec", "watch", "firejail", "flatpak-spawn", "chroot", "sg", "unshare",
+                 "systemd-run", "script", "flock", "nsenter", "chrt", "taskset", "setpriv", "prlimit",
+                 "runuser", "cgexec", "busybox"],
+    # Options after which a binary takes a command, up to a ";" or "+" argument
+    "exec_options": {"find": ["-exec", "-execdir", "-ok", "-okdir"]},
+    "rules": [
+        {"id": "escalation", "binary": ["sudo", "su", "doas", "pkexec", "run0"], "action": DENY,
+         "reason": "sudo not allowed without explicit feature enable"},
+        {"id": "shell-escalation", "binary": ["sh", "bash", "dash", "zsh", "ksh", "fish"], "action": DENY,
+         "args": [r"(?:.*[\s;&|(`])?(?:sudo|su|doas|pkexec|run0)(?:\s.*)?"],
+         "reason": "sudo not allowed without explicit feature enable"},
+        # Escalation named anywhere in the arguments: interpreter code (python -c, perl -e, awk),
+        # runners not listed as wrappers (strace, gdb, ssh), option values (git -c, tar --to-command).
+        # Whole words only, so "echo pseudocode" is fine.
+        {"id": "escalation-argument", "binary": "*", "action": DENY,
+         "args": [r"(?s)(?:.*[\s;&|()`'\"=/{}$<>,:])?(?:sudo|su|doas|pkexec|run0)(?:[\s;&|()`'\"{}$<>,:].*)?"],
+         "reason": "sudo not allowed without explicit feature enable"},
+        {"id": "shell-script", "binary": ["sh", "bash", "dash", "zsh", "ksh", "fish"], "action": CONFIRM,
+         "args": [r"-\w*c\w*"], "reason": "inline shell scripts are not inspected"},
+        {"id": "rm-recursive", "binary": "rm", "action": CONFIRM,
+         "args": [r"-[^-]*[rR][^-]*|--recursive"], "reason": "recursive delete"},
+        {"id": "rm-system", "binary": "rm", "action": CONFIRM,
+         "paths": ["/bin", "/boot", "/dev", "/etc", "/lib", "/lib64", "/sbin", "/sys", "/usr", "/var"],
+         "reason": "deletes system files"},
+        {"id": "disk", "binary": ["dd", "mkfs", "mkfs.*", "mkswap", "parted", "fdisk", "sfdisk", "wipefs"],
+         "action": CONFIRM, "reason": "writes to disks or partitions"},
+        {"id": "chown-absolute", "binary": ["chown", "chgrp"], "action": CONFIRM, "paths": ["/"],
+         "reason": "changes ownership of absolute paths"},
+    ],
+}
+
+
+class PolicyError(ValueError):
+    """A policy file or rule that cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class PolicyDecision:
+    action: str
+    reason: str
+    rule: Optional[str]
+    argv: Tuple[str, ...]
+
+    @property
+    def allowed(self) -> bool:
+        return self.action == ALLOW
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"action": self.action, "rule": self.rule, "reason": self.reason}
+
+
+# No quotes, escapes or exotic whitespace: shlex.split would just split on whitespace
+_PLAIN = re.compile(r"[^'\"\\\s]*(?:[ \t\r\n]+[^'\"\\\s]*)*")
+
+
+def tokenize(raw: str) -> List[str]:
+    """shlex.split, with a fast path for the common command that needs no shell quoting."""
+    if _PLAIN.fullmatch(raw):
+        return raw.split()
+    return shlex.split(raw)
+
+
+def _norm_path(token: str) -> Optional[str]:
+    # "--target-directory=/etc" names a path just like "/etc" does
+    if token.startswith("-"):
+        if "=" not in token:
+            return None
+        token = token.split("=", 1)[1]
+    if not token.startswith(("/", "~")):
+        return None
+    return os.path.normpath(os.path.expanduser(token))
+
+
+@dataclass(frozen=True)
+class _Rule:
+    id: str
+    action: str
+    reason: str
+    args: Tuple[re.Pattern, ...]
+    paths: Tuple[str, ...]
+
+    def matches(self, args: Sequence[str]) -> bool:
+        for pattern in self.args:
+            if not any(pattern.fullmatch(a) for a in args):
+                return False
+        if self.paths:
+            for a in args:
+                path = _norm_path(a)
+                if path is not None and any(path == p or path.startswith(p.rstrip("/") + "/") for p in self.paths):
+                    return True
+            return False
+        return True
+
+
+def _stricter(rule: Optional[_Rule], than: Optional[_Rule]) -> bool:
+    if rule is None:
+        return False
+    return than is None or _SEVERITY[rule.action] > _SEVERITY[than.action]
+
+
+def _compile_rule(raw: Dict[str, Any], n: int) -> Tuple[List[str], _Rule]:
+    action = raw.get("action")
+    if action not in _SEVERITY:
+        raise PolicyError(f"rule {n}: action must be one of {sorted(_SEVERITY)}, got {action!r}")
+    binaries = raw.get("binary")
+    if isinstance(binaries, str):
+        binaries = [binaries]
+    if not binaries or not all(isinstance(b, str) and b for b in binaries):
+        raise PolicyError(f"rule {n}: 'binary' must be a name or a list of names")
+    try:
+        args = tuple(re.compile(p) for p in raw.get("args", []))
+    except re.error as e:
+        raise PolicyError(f"rule {n}: bad args pattern: {e}") from None
+    paths = tuple(os.path.normpath(os.path.expanduser(p)) for p in raw.get("paths", []))
+    rule_id = str(raw.get("id") or f"rule-{n}")
+    return list(binaries), _Rule(rule_id, action, str(raw.get("reason") or rule_id), args, paths)
+
+
+class CommandPolicy:
+    """Declarative allow/confirm/deny rules, compiled into a table keyed by binary.
+
+    ``evaluate`` tokenizes a command once and returns a PolicyDecision whose
+    ``argv`` is what the executor runs. Only the rules for that binary (plus
+    prefix and "*" rules) are tried. Decisions are memoized per command string.
+    """
+
+    def __init__(self, policy: Dict[str, Any], memo_size: int = 4096):
+        default = policy.get("default", ALLOW)
+        if default not in _SEVERITY:
+            raise PolicyError(f"default must be one of {sorted(_SEVERITY)}, got {default!r}")
+        self.default = default
+        self.wrappers = frozenset(policy.get("wrappers", []))
+        self.exec_options = {b: frozenset(opts) for b, opts in policy.get("exec_options", {}).items()}
+        self._by_binary: Dict[str, List[_Rule]] = {}
+        self._by_prefix: List[Tuple[str, _Rule]] = []
+        self._any: List[_Rule] = []
+        self.size = 0
+        for n, raw in enumerate(policy.get("rules", [])):
+            binaries, rule = _compile_rule(raw, n)
+            self.size += 1
+            for b in binaries:
+                if b == "*":
+                    self._any.append(rule)
+                elif b.endswith("*"):
+                    self._by_prefix.append((b[:-1], rule))
+                else:
+                    self._by_binary.setdefault(b, []).append(rule)
+        self.evaluate = lru_cache(maxsize=memo_size)(self._evaluate)
+
+    def _rules_for(self, binary: str) -> List[_Rule]:
+        rules = self._by_binary.get(binary, [])
+        if self._by_prefix:
+            rules = rules + [r for p, r in self._by_prefix if binary.startswith(p)]
+        return rules + self._any if self._any else rules
+
+    def _own(self, argv: Sequence[str]) -> Optional[_Rule]:
+        best: Optional[_Rule] = None
+        for rule in self._rules_for(os.path.basename(argv[0])):
+            if _stricter(rule, best) and rule.matches(argv[1:]):
+                best = rule
+        return best
+
+    def _direct(self, argv: Sequence[str]) -> Optional[_Rule]:
+        """The command's own rule, or a stricter one from a command in its exec options."""
+        best = self._own(argv)
+        options = self.exec_options.get(os.path.basename(argv[0]))
+        if options:
+            start = None
+            for i, a in enumerate(argv[1:], 1):
+                if a in options:
+                    start = i + 1
+                elif start is not None and a in (";", "+"):
+                    if i > start:
+                        rule = self._match(argv[start:i])
+                        if _stricter(rule, best):
+                            best = rule
+                    start = None
+            if start is not None and start < len(argv):
+                rule = self._match(argv[start:])
+                if _stricter(rule, best):
+                    best = rule
+        return best
+
+    def _command_string(self, arg: str) -> Optional[_Rule]:
+        try:
+            argv = tokenize(arg)
+        except ValueError:
+            return None
+        return self._match(argv) if argv else None
+
+    def _match(self, argv: Sequence[str]) -> Optional[_Rule]:
+        if os.path.basename(argv[0]) not in self.wrappers:
+            return self._direct(argv)
+        # The wrapped command's position depends on the wrapper's options, so every later
+        # non-option argument is checked as a possible binary (itself possibly a wrapper)
+        # and the strictest outcome wins. Tails are scored right to left, once each.
+        later: Optional[_Rule] = None
+        for k in range(len(argv) - 1, -1, -1):
+            if k and any(c.isspace() for c in argv[k]):
+                rule = self._command_string(argv[k])
+                if _stricter(rule, later):
+                    later = rule
+            if k and argv[k].startswith("-"):
+                continue
+            rule = self._direct(argv[k:])
+            if os.path.basename(argv[k]) in self.wrappers and _stricter(later, rule):
+                rule = later
+            if _stricter(rule, later):
+                later = rule
+            if k == 0:
+                return rule
+        return None
+
+    def _evaluate(self, raw: str) -> PolicyDecision:
+        try:
+            argv = tuple(tokenize(raw))
+        except ValueError as e:
+            return PolicyDecision(DENY, f"cannot parse command: {e}", None, ())
+        if not argv:
+            return PolicyDecision(DENY, "empty command", None, ())
+        rule = self._match(argv)
+        if rule is None:
+            return PolicyDecision(self.default, "no matching rule", None, argv)
+        return PolicyDecision(rule.action, rule.reason, rule.id, argv)
+
+    def stats(self) -> Dict[str, Any]:
+        info = self.evaluate.cache_info()
+        return {
+            "rules": self.size,
+            "binaries": len(self._by_binary),
+            "default": self.default,
+            "memo_hits": info.hits,
+            "memo_misses": info.misses,
+        }
+
+
+def load_policy(path: Optional[Path] = None) -> CommandPolicy:
+    """Built-in rules, extended (or replaced) by the JSON policy file at ``path``."""
+    policy = dict(DEFAULT_POLICY)
+    if path is not None:
+        try:
+            extra = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as e:
+            raise PolicyError(f"cannot read command policy {path}: {e}") from None
+        if extra.get("replace_defaults"):
+            policy = {"default": ALLOW, "wrappers": [], "exec_options": {}, "rules": []}
+        policy["default"] = extra.get("default", policy["default"])
+        policy["wrappers"] = [*policy["wrappers"], *extra.get("wrappers", [])]
+        policy["exec_options"] = {**policy["exec_options"], **extra.get("exec_options", {})}
+        policy["rules"] = [*policy["rules"], *extra.get("rules", [])]
+    return CommandPolicy(policy)
+
+
+command_policy = load_policy(config.command_policy_file)
@@ -16,10 +16,19 @@ class Config:
     app_name: str = "Astra"
     host: str = os.getenv("ASTRA_HOST", "127.0.0.1")
     port: int = int(os.getenv("ASTRA_PORT", "3110"))
+    # lazy: STT, TTS, audit and the Ollama model initialize on first use; eager: warm them before serving
+    startup_mode: str = os.getenv("ASTRA_STARTUP", "lazy").lower()
 
     # Routing
     complexity_threshold_tokens: int = int(os.getenv("ASTRA_COMPLEXITY_TOKENS", "800"))
     force_cloud: bool = os.getenv("ASTRA_FORCE_CLOUD", "false").lower() == "true"
+    # static: privacy + complexity rules; adaptive: also weigh observed backend latency/errors/load
+    routing_mode: str = os.getenv("ASTRA_ROUTING_MODE", "static").lower()
+    routing_ewma_alpha: float = float(os.getenv("ASTRA_ROUTING_EWMA_ALPHA", "0.2"))
+    routing_max_error_rate: float = float(os.getenv("ASTRA_ROUTING_MAX_ERROR_RATE", "0.5"))
+    # An avoided backend serves nothing, so its error rate also decays with time
+    routing_error_half_life_sec: float = float(os.getenv("ASTRA_ROUTING_ERROR_HALF_LIFE_SEC", "60"))
+    routing_local_max_inflight: int = int(os.getenv("ASTRA_ROUTING_LOCAL_MAX_INFLIGHT", "2"))
 
     # Privacy
     allow_cloud_uploads: bool = os.getenv("ASTRA_ALLOW_CLOUD", "false").lower() == "true"
@@ -27,6 +36,18 @@ class Config:
     # Security
     enable_firejail: bool = os.getenv("ASTRA_ENABLE_FIREJAIL", "false").lower() == "true"
     confirmations_required: bool = True  # always ask for destructive ops
+    # JSON rules added to (or replacing) the built-in command policy, see command_policy.py
+    command_policy_file: Path | None = (
+        Path(os.environ["ASTRA_COMMAND_POLICY"]) if os.getenv("ASTRA_COMMAND_POLICY") else None
+    )
+    exec_parallelism: int = int(os.getenv("ASTRA_EXEC_PARALLELISM", "4"))
+    exec_timeout_sec: float = float(os.getenv("ASTRA_EXEC_TIMEOUT", "30"))  # 0 = no timeout
+    exec_max_output_bytes: int = int(os.getenv("ASTRA_EXEC_MAX_OUTPUT", "65536"))  # per stream
+    app_index_ttl_sec: float = float(os.getenv("ASTRA_APP_INDEX_TTL", "30"))
+    app_fuzzy_max_distance: int = int(os.getenv("ASTRA_APP_FUZZY_MAX_DIST", "2"))
+    exec_cache: bool = os.getenv("ASTRA_EXEC_CACHE", "true").lower() == "true"
+    exec_cache_size: int = int(os.getenv("ASTRA_EXEC_CACHE_SIZE", "256"))
+    exec_stream_buffer_lines: int = int(os.getenv("ASTRA_EXEC_STREAM_BUFFER", "256"))
     run_user: str = os.getenv("USER", "user")
 
     # Audit
@@ -35,6 +56,46 @@ class Config:
         os.getenv("ASTRA_AUDIT_KEY", BASE_DIR / "data" / "audit" / "key.fernet")
     )
 
+    audit_segment_max_bytes: int = int(os.getenv("ASTRA_AUDIT_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+    audit_segment_max_age_sec: float = float(os.getenv("ASTRA_AUDIT_SEGMENT_SEC", "3600"))
+    audit_index_every: int = int(os.getenv("ASTRA_AUDIT_INDEX_EVERY", "64"))
+    # Background group-commit writer
+    audit_async: bool = os.getenv("ASTRA_AUDIT_ASYNC", "true").lower() == "true"
+    audit_queue_size: int = int(os.getenv("ASTRA_AUDIT_QUEUE_SIZE", "4096"))
+    audit_flush_interval_sec: float = float(os.getenv("ASTRA_AUDIT_FLUSH_MS", "200")) / 1000
+    audit_batch_max: int = int(os.getenv("ASTRA_AUDIT_BATCH_MAX", "256"))
+    audit_fsync: str = os.getenv("ASTRA_AUDIT_FSYNC", "batch").lower()  # batch|never
+    audit_backpressure: str = os.getenv("ASTRA_AUDIT_BACKPRESSURE", "block").lower()  # block|drop|spill
+
+    # Admission control: concurrent requests per pipeline stage; requests that would wait
+    # longer than the budget for a slot get 429 + Retry-After
+    llm_concurrency: int = int(os.getenv("ASTRA_LLM_CONCURRENCY", "4"))
+    exec_concurrency: int = int(os.getenv("ASTRA_EXEC_CONCURRENCY", "8"))
+    stt_concurrency: int = int(os.getenv("ASTRA_STT_CONCURRENCY", "0"))  # 0 = WHISPER_WORKERS
+    admission_max_wait_ms: float = float(os.getenv("ASTRA_ADMISSION_MAX_WAIT_MS", "2000"))
+
+    # Tracing: stage spans go out in Server-Timing; also append them to the audit log
+    trace_audit: bool = os.getenv("ASTRA_TRACE_AUDIT", "false").lower() == "true"
+    # Admin endpoints (sampling profiler) are disabled unless a token is set
+    admin_token: str = os.getenv("ASTRA_ADMIN_TOKEN", "")
+    profile_max_sec: float = float(os.getenv("ASTRA_PROFILE_MAX_SEC", "60"))
+
+    # Batch ingestion: max transcripts per request, concurrent LLM intent fallbacks
+    batch_max_items: int = int(os.getenv("ASTRA_BATCH_MAX_ITEMS", "256"))
+    batch_llm_concurrency: int = int(os.getenv("ASTRA_BATCH_LLM_CONCURRENCY", "4"))
+
+    # Intent cache (normalized transcript -> resolved intent)
+    intent_cache_size: int = int(os.getenv("ASTRA_INTENT_CACHE_SIZE", "512"))
+    intent_cache_ttl_sec: float = float(os.getenv("ASTRA_INTENT_CACHE_TTL", "600"))
+    # Semantic intent cache: nearest LLM-resolved transcript by embedding similarity (0 entries disables)
+    semantic_cache_size: int = int(os.getenv("ASTRA_SEMANTIC_CACHE_SIZE", "20000"))
+    semantic_cache_threshold: float = float(os.getenv("ASTRA_SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    semantic_cache_embedder: str = os.getenv("ASTRA_SEMANTIC_CACHE_EMBEDDER", "ollama").lower()  # ollama|hashing
+    semantic_cache_path: Path = Path(
+        os.getenv("ASTRA_SEMANTIC_CACHE_PATH", BASE_DIR / "data" / "semantic_intents.npz")
+    )
+    ollama_embed_model: str = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+
     # Models
     ollama_url: str = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434")
     ollama_model: str = os.getenv("OLLAMA_MODEL", "mistral")
@@ -47,6 +108,18 @@ class Config:
     )
 
     http_timeout_sec: int = int(os.getenv("ASTRA_HTTP_TIMEOUT", "10"))
+    ollama_max_connections: int = int(os.getenv("ASTRA_OLLAMA_MAX_CONNECTIONS", "16"))
+    # Circuit breaker around Ollama calls, plus a background /api/tags probe (0 disables it)
+    ollama_breaker_failures: int = int(os.getenv("ASTRA_OLLAMA_BREAKER_FAILURES", "3"))
+    ollama_breaker_reset_sec: float = float(os.getenv("ASTRA_OLLAMA_BREAKER_RESET_SEC", "15"))
+    ollama_breaker_half_open_calls: int = int(os.getenv("ASTRA_OLLAMA_BREAKER_HALF_OPEN_CALLS", "1"))
+    ollama_probe_interval_sec: float = float(os.getenv("ASTRA_OLLAMA_PROBE_SEC", "5"))
+    ollama_probe_timeout_sec: float = float(os.getenv("ASTRA_OLLAMA_PROBE_TIMEOUT_SEC", "1"))
+    # LLM response cache: memory LRU entries (0 disables), optional SQLite tier
+    llm_cache_size: int = int(os.getenv("ASTRA_LLM_CACHE_SIZE", "256"))
+    llm_cache_db: str = os.getenv("ASTRA_LLM_CACHE_DB", "")
+    llm_cache_db_max_mb: int = int(os.getenv("ASTRA_LLM_CACHE_DB_MAX_MB", "64"))
+    llm_cache_max_temperature: float = float(os.getenv("ASTRA_LLM_CACHE_MAX_TEMPERATURE", "0.1"))
 
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
 
@@ -58,7 +131,18 @@ class Config:
     whisper_language: str | None = os.getenv("WHISPER_LANGUAGE") or None  # e.g., "en" or "hi"
     whisper_beam_size: int = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
     whisper_initial_prompt: str | None = os.getenv("WHISPER_INITIAL_PROMPT") or None
+    # Model registry: sizes a request may pick, what to preload and warm at startup, eviction
+    whisper_allowed_models: str = os.getenv("WHISPER_ALLOWED_MODELS", "tiny,base,small")
+    whisper_preload: str = os.getenv("WHISPER_PRELOAD", "")  # eager startup warms WHISPER_MODEL if empty
+    whisper_memory_budget_mb: float = float(os.getenv("WHISPER_MEMORY_BUDGET_MB", "0"))  # 0 = unlimited
+    whisper_idle_evict_sec: float = float(os.getenv("WHISPER_IDLE_EVICT_SEC", "1800"))  # 0 = never
+    # STT worker pool: parallel decodes on one shared model, bounded backlog
+    whisper_workers: int = int(os.getenv("WHISPER_WORKERS", "2"))
+    whisper_cpu_threads: int = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # per decode; 0 = auto
+    whisper_queue_size: int = int(os.getenv("WHISPER_QUEUE_SIZE", "8"))
+    # Streaming STT: re-decode after this much new audio, commit once the window is this long
+    whisper_stream_step_sec: float = float(os.getenv("WHISPER_STREAM_STEP_SEC", "1.0"))
+    whisper_stream_window_sec: float = float(os.getenv("WHISPER_STREAM_WINDOW_SEC", "15"))
 
 
 config = Config()
-config.audit_dir.mkdir(parents=True, exist_ok=True)
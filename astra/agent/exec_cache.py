@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import config
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_sec: float
+    # Argument prefixes that turn the command into a state change (never cached)
+    deny_args: tuple[str, ...] = ()
+
+
+# Side-effect-free commands whose output is safe to reuse for a while. Anything
+# not listed here (cp, mv, du, GUI launches, ...) always runs.
+READ_ONLY_CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "uname": CachePolicy(3600),
+    "whoami": CachePolicy(3600),
+    "pwd": CachePolicy(3600),
+    "df": CachePolicy(5),
+    "free": CachePolicy(1.5),
+    "date": CachePolicy(1, deny_args=("-s", "--set")),
+}
+
+
+class _LeaderGone(Exception):
+    """Set on a shared run whose leader was cancelled; waiters run the command again."""
+
+
+class ExecResultCache:
+    """TTL cache of command results keyed by argv and run limits, with single-flight coalescing.
+
+    Concurrent identical requests (from any thread or event loop) share one
+    subprocess: the first caller runs it, the rest wait on its future. Only
+    complete, successful results are stored (not truncated or timed out);
+    coalesced and cached results come back with ``cached=True``.
+    """
+
+    def __init__(self, policies: Dict[str, CachePolicy], max_entries: int = 256):
+        self.policies = policies
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def ttl_for(self, parts: List[str]) -> Optional[float]:
+        if not parts:
+            return None
+        policy = self.policies.get(parts[0])
+        if policy is None:
+            return None
+        if any(arg.startswith(p) for arg in parts[1:] for p in policy.deny_args):
+            return None
+        return policy.ttl_sec
+
+    async def run(self, parts: List[str], runner: Callable[[], Awaitable[Any]], limits: tuple = ()) -> Any:
+        """``limits`` (e.g. timeout and output cap) are part of the key: they shape the result."""
+        ttl = self.ttl_for(parts)
+        if ttl is None or self.max_entries <= 0:
+            return await runner()
+        key = (tuple(parts), limits)
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dataclasses.replace(entry[1], cached=True)
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._inflight[key] = Future()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                # Shielded: a waiter's own cancellation must not cancel the shared future
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderGone:
+                continue
+            return dataclasses.replace(result, cached=True)
+        try:
+            result = await runner()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            # Only a real failure is shared; after a cancelled leader the next waiter runs the command
+            future.set_exception(e if isinstance(e, Exception) else _LeaderGone())
+            raise
+        with self._lock:
+            complete = not getattr(result, "timed_out", False) and not getattr(result, "truncated", False)
+            if result.returncode == 0 and complete:
+                self._entries[key] = (time.monotonic() + ttl, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+exec_cache = ExecResultCache(
+    READ_ONLY_CACHE_POLICIES, max_entries=config.exec_cache_size if config.exec_cache else 0
+)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import shlex
-import subprocess
-from dataclasses import dataclass
-from typing import List, Optional
+import signal
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
 from .config import config
-from .utils import requires_confirmation
+from .command_policy import ALLOW, CONFIRM, PolicyDecision, command_policy
+from .exec_cache import exec_cache
+from .metrics import observe_stage, record_exec, stage
 
 
 WHITELIST = {
@@ -53,15 +57,60 @@ ALLOWED_ENV_PASSTHROUGH = {
 }
 
 
+# Launchers that hand off to a desktop app; the app itself may run for hours
+GUI_LAUNCHERS = {"gtk-launch", "gio", "xdg-open"}
+
+# Binaries without side effects; they may run concurrently with their neighbours in a plan
+READ_ONLY_COMMANDS = {
+    "ls",
+    "cat",
+    "head",
+    "tail",
+    "echo",
+    "pwd",
+    "whoami",
+    "uname",
+    "df",
+    "du",
+    "free",
+    "date",
+}
+
+# How long a detached GUI launch is watched for an immediate failure
+_LAUNCH_GRACE_SEC = 1.0
+
+
 @dataclass
 class ExecResult:
     command: str
     stdout: str
     stderr: str
     returncode: int
+    duration_ms: float = 0.0
+    truncated: bool = False
+    timed_out: bool = False
+    cached: bool = False
+    # Command policy decision: action, rule id and reason
+    policy: Optional[Dict[str, Any]] = None
+
 
+def _is_gui_launch(parts: List[str]) -> bool:
+    if not parts:
+        return False
+    if parts[0] == "flatpak":
+        return len(parts) > 1 and parts[1] == "run"
+    return parts[0] in {*GUI_LAUNCHERS, *WHITELIST["apps"]}
 
-def _run_subprocess(cmd: List[str], env: Optional[dict] = None) -> ExecResult:
+
+def _is_independent(parts: List[str]) -> bool:
+    if _is_gui_launch(parts):
+        return True
+    if parts and parts[0] == "systemctl":
+        return len(parts) > 1 and parts[1] == "status"
+    return bool(parts) and parts[0] in READ_ONLY_COMMANDS
+
+
+def _build_env(env: Optional[dict] = None) -> dict:
     # Never escalate; set constrained environment
     env_vars = {
         "PATH": os.environ.get("PATH", ""),
@@ -74,58 +123,319 @@ def _run_subprocess(cmd: List[str], env: Optional[dict] = None) -> ExecResult:
             env_vars[key] = os.environ[key]
     if env:
         env_vars.update(env)
-    proc = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        env=env_vars,
-        check=False,
+    return env_vars
+
+
+def _kill_group(proc: asyncio.subprocess.Process) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class _CappedBuffer:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.truncated = False
+
+    async def drain(self, stream: asyncio.StreamReader) -> None:
+        # Keep reading past the cap so the child never blocks on a full pipe
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                return
+            room = self.limit - len(self.data)
+            if room > 0:
+                self.data += chunk[:room]
+            if len(chunk) > room:
+                self.truncated = True
+
+    def text(self) -> str:
+        return self.data.decode("utf-8", errors="replace").strip()
+
+
+async def _spawn(cmd: List[str], env: Optional[dict] = None, capture: bool = True) -> asyncio.subprocess.Process:
+    # New session = new process group, so a timeout can kill everything the command started
+    out = asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=out,
+        stderr=out,
+        env=_build_env(env),
+        start_new_session=True,
     )
+
+
+async def _run_subprocess(
+    cmd: List[str],
+    env: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    max_output: Optional[int] = None,
+) -> ExecResult:
+    """Run one command in its own process group with a wall-clock timeout and capped output."""
+    timeout = timeout if timeout is not None else config.exec_timeout_sec
+    limit = max_output if max_output is not None else config.exec_max_output_bytes
+    command = " ".join(shlex.quote(c) for c in cmd)
+    start = time.perf_counter()
+    try:
+        proc = await _spawn(cmd, env)
+    except OSError as e:
+        return ExecResult(command, "", str(e), 127, round((time.perf_counter() - start) * 1000, 3))
+    out, err = _CappedBuffer(limit), _CappedBuffer(limit)
+    readers = asyncio.ensure_future(asyncio.gather(out.drain(proc.stdout), err.drain(proc.stderr)))
+    waiter = asyncio.ensure_future(proc.wait())
+    done, _ = await asyncio.wait({readers, waiter}, timeout=timeout or None)
+    timed_out = len(done) < 2
+    if timed_out:
+        _kill_group(proc)
+        await waiter
+        # Collect whatever the killed group had already written
+        done, _ = await asyncio.wait({readers}, timeout=1.0)
+        if not done:
+            readers.cancel()
+    stderr = err.text()
+    if timed_out:
+        stderr = (stderr + "\n" if stderr else "") + f"killed after {timeout:g}s timeout"
     return ExecResult(
-        command=" ".join(shlex.quote(c) for c in cmd),
-        stdout=proc.stdout.strip(),
-        stderr=proc.stderr.strip(),
-        returncode=proc.returncode,
+        command=command,
+        stdout=out.text(),
+        stderr=stderr,
+        returncode=proc.returncode if proc.returncode is not None else -1,
+        duration_ms=round((time.perf_counter() - start) * 1000, 3),
+        truncated=out.truncated or err.truncated,
+        timed_out=timed_out,
     )
 
 
-def execute_safe(commands: List[str], confirm: bool = False, dry_run: bool = True) -> List[ExecResult]:
-    results: List[ExecResult] = []
-    for raw in commands:
-        if "sudo" in raw:
-            results.append(
-                ExecResult(raw, "", "sudo not allowed without explicit feature enable", 1)
-            )
-            continue
+async def _launch_detached(cmd: List[str]) -> ExecResult:
+    """Start a GUI app in its own session without waiting for it to exit."""
+    command = " ".join(shlex.quote(c) for c in cmd)
+    start = time.perf_counter()
+    try:
+        proc = await _spawn(cmd, capture=False)
+    except OSError as e:
+        return ExecResult(command, "", str(e), 127, round((time.perf_counter() - start) * 1000, 3))
+    try:
+        code = await asyncio.wait_for(proc.wait(), _LAUNCH_GRACE_SEC)
+    except asyncio.TimeoutError:
+        return ExecResult(
+            command, f"launched (pid {proc.pid})", "", 0, round((time.perf_counter() - start) * 1000, 3)
+        )
+    stderr = "" if code == 0 else f"exited with code {code}"
+    return ExecResult(command, "", stderr, code, round((time.perf_counter() - start) * 1000, 3))
 
-        if requires_confirmation(raw) and not confirm:
-            results.append(ExecResult(raw, "", "confirmation required", 2))
-            continue
 
-        if dry_run:
-            results.append(ExecResult(raw, "dry-run: not executed", "", 0))
-            continue
+def _preflight(raw: str, confirm: bool, dry_run: bool) -> Union[ExecResult, PolicyDecision]:
+    """Apply the command policy, dry-run and GUI checks; returns the decision to run or a final result."""
+    decision = command_policy.evaluate(raw)
+    policy = decision.to_dict()
+    if decision.action not in (ALLOW, CONFIRM):
+        return ExecResult(raw, "", decision.reason, 1, policy=policy)
+
+    if decision.action == CONFIRM and not confirm:
+        return ExecResult(raw, "", "confirmation required", 2, policy=policy)
+
+    if dry_run:
+        return ExecResult(raw, "dry-run: not executed", "", 0, policy=policy)
+
+    # If this looks like a GUI launch but no display is available, fail fast with a helpful message
+    if (
+        (decision.argv[0] in {*GUI_LAUNCHERS, *WHITELIST["apps"]})
+        and ("DISPLAY" not in os.environ and "WAYLAND_DISPLAY" not in os.environ)
+    ):
+        return ExecResult(
+            raw,
+            "",
+            "No GUI session detected (DISPLAY/WAYLAND_DISPLAY not set). Start the server from your desktop session or export these vars.",
+            1,
+            policy=policy,
+        )
+    return decision
+
+
+async def _run_planned(parts: List[str], timeout: Optional[float], max_output: Optional[int]) -> ExecResult:
+    gui = _is_gui_launch(parts)
+    cmd = parts
+    # Optional firejail: only for risky binaries, disabled by default
+    if config.enable_firejail:
+        cmd = ["firejail", "--quiet", "--private"] + parts
+    if gui:
+        return await _launch_detached(cmd)
+    # Read-only commands may be answered from (or coalesced into) a recent identical run
+    return await exec_cache.run(
+        parts, lambda: _run_subprocess(cmd, timeout=timeout, max_output=max_output), limits=(timeout, max_output)
+    )
+
+
+async def execute_safe_async(
+    commands: List[str],
+    confirm: bool = False,
+    dry_run: bool = True,
+    parallelism: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_output: Optional[int] = None,
+) -> List[ExecResult]:
+    """Run a plan with the same policy as before, overlapping independent commands.
+
+    Read-only commands and GUI launches run concurrently (at most ``parallelism``
+    at a time). Any other command is a barrier: it starts after everything before
+    it has finished and completes before anything after it starts. Results keep
+    the order of ``commands``.
+    """
+    sem = asyncio.Semaphore(max(1, parallelism or config.exec_parallelism))
+    results: List[Optional[ExecResult]] = [None] * len(commands)
+    pending: List[asyncio.Task] = []
+
+    async def run(i: int, decision: PolicyDecision) -> None:
+        async with sem:
+            result = await _run_planned(list(decision.argv), timeout, max_output)
+        if not result.cached:
+            observe_stage("exec_command", result.duration_ms / 1000)
+        results[i] = replace(result, policy=decision.to_dict())
 
-        # split safely
-        parts = shlex.split(raw)
-        # If this looks like a GUI launch but no display is available, fail fast with a helpful message
-        if (
-            (parts and parts[0] in {"gtk-launch", "gio", "xdg-open", *WHITELIST["apps"]})
-            and ("DISPLAY" not in os.environ and "WAYLAND_DISPLAY" not in os.environ)
-        ):
-            results.append(
-                ExecResult(
-                    raw,
-                    "",
-                    "No GUI session detected (DISPLAY/WAYLAND_DISPLAY not set). Start the server from your desktop session or export these vars.",
-                    1,
-                )
-            )
+    with stage("exec_plan"):
+        for i, raw in enumerate(commands):
+            prepared = _preflight(raw, confirm, dry_run)
+            if isinstance(prepared, ExecResult):
+                results[i] = prepared
+            elif _is_independent(list(prepared.argv)):
+                pending.append(asyncio.create_task(run(i, prepared)))
+            else:
+                if pending:
+                    await asyncio.gather(*pending)
+                    pending = []
+                await run(i, prepared)
+        if pending:
+            await asyncio.gather(*pending)
+    out = [r for r in results if r is not None]
+    for r in out:
+        record_exec(r.returncode, r.policy, r.cached)
+    return out
+
+
+async def _pump_lines(
+    stream: asyncio.StreamReader, name: str, out: asyncio.Queue, max_line: int
+) -> None:
+    """Forward complete lines into ``out``; over-long lines are split at ``max_line`` bytes."""
+    carry = b""
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        carry += chunk
+        while True:
+            nl = carry.find(b"\n")
+            if nl == -1 and len(carry) < max_line:
+                break
+            cut = nl if nl != -1 and nl < max_line else max_line
+            line, carry = carry[:cut], carry[cut + 1 if cut == nl else cut :]
+            # Blocks while the consumer is behind, which in turn stalls the child on a full pipe
+            await out.put((name, line.decode("utf-8", errors="replace")))
+    if carry:
+        await out.put((name, carry.decode("utf-8", errors="replace")))
+    await out.put((name, None))
+
+
+async def _stream_subprocess(
+    index: int, cmd: List[str], timeout: Optional[float]
+) -> AsyncIterator[Dict[str, Any]]:
+    timeout = timeout if timeout is not None else config.exec_timeout_sec
+    command = " ".join(shlex.quote(c) for c in cmd)
+    start = time.perf_counter()
+    try:
+        proc = await _spawn(cmd)
+    except OSError as e:
+        yield {"type": "exit", "index": index, "command": command, "returncode": 127, "error": str(e),
+               "duration_ms": 0.0, "timed_out": False}
+        return
+    yield {"type": "start", "index": index, "command": command, "pid": proc.pid}
+    lines: asyncio.Queue = asyncio.Queue(maxsize=config.exec_stream_buffer_lines)
+    max_line = config.exec_max_output_bytes
+    pumps = [
+        asyncio.create_task(_pump_lines(proc.stdout, "stdout", lines, max_line)),
+        asyncio.create_task(_pump_lines(proc.stderr, "stderr", lines, max_line)),
+    ]
+    deadline = start + timeout if timeout else None
+    timed_out = False
+    open_streams = 2
+    try:
+        while open_streams:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            try:
+                name, line = await asyncio.wait_for(lines.get(), remaining)
+            except asyncio.TimeoutError:
+                timed_out = True
+                break
+            if line is None:
+                open_streams -= 1
+                continue
+            yield {"type": name, "index": index, "line": line}
+        if timed_out:
+            _kill_group(proc)
+        else:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                await asyncio.wait_for(proc.wait(), remaining)
+            except asyncio.TimeoutError:
+                timed_out = True
+                _kill_group(proc)
+        returncode = await proc.wait()
+        yield {
+            "type": "exit",
+            "index": index,
+            "command": command,
+            "returncode": returncode,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            "timed_out": timed_out,
+        }
+    finally:
+        # Client went away or the stream was abandoned: do not leave the command running
+        if proc.returncode is None:
+            _kill_group(proc)
+        for task in pumps:
+            task.cancel()
+
+
+async def execute_stream(
+    commands: List[str],
+    confirm: bool = False,
+    dry_run: bool = True,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run a plan one command at a time, yielding output lines as they are produced.
+
+    Frames: ``start``/``stdout``/``stderr``/``exit`` for executed commands, ``result``
+    for commands settled by policy (blocked, dry-run, GUI launch) and a final ``done``
+    frame with every return code. Applies the same checks as execute_safe.
+    """
+    returncodes: List[int] = []
+    for i, raw in enumerate(commands):
+        prepared = _preflight(raw, confirm, dry_run)
+        if isinstance(prepared, ExecResult):
+            returncodes.append(prepared.returncode)
+            record_exec(prepared.returncode, prepared.policy, False)
+            yield {"type": "result", "index": i, **asdict(prepared)}
+            continue
+        parts = list(prepared.argv)
+        if _is_gui_launch(parts):
+            result = replace(await _run_planned(parts, timeout, None), policy=prepared.to_dict())
+            returncodes.append(result.returncode)
+            record_exec(result.returncode, result.policy, result.cached)
+            yield {"type": "result", "index": i, **asdict(result)}
             continue
-        # Optional firejail: only for risky binaries, disabled by default
         if config.enable_firejail:
             parts = ["firejail", "--quiet", "--private"] + parts
+        async for frame in _stream_subprocess(i, parts, timeout):
+            if frame["type"] == "exit":
+                returncodes.append(frame["returncode"])
+                record_exec(frame["returncode"], prepared.to_dict(), False)
+                observe_stage("exec_command", frame["duration_ms"] / 1000)
+            yield frame
+    yield {"type": "done", "returncodes": returncodes}
 
-        res = _run_subprocess(parts)
-        results.append(res)
-    return results
+
+def execute_safe(commands: List[str], confirm: bool = False, dry_run: bool = True) -> List[ExecResult]:
+    """Blocking wrapper around execute_safe_async for sync callers (not for use inside a running loop)."""
+    return asyncio.run(execute_safe_async(commands, confirm=confirm, dry_run=dry_run))
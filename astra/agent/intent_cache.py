@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .config import config
+from .executor import WHITELIST
+from .intent_parser import Intent
+
+
+def normalize_transcript(text: str) -> str:
+    # Same normalization as skills.open_app._sanitize_app: case, edge punctuation, spaces.
+    # A leading "!" is kept because it selects the run_command shorthand.
+    text = text.strip().lower()
+    text = text.strip(" .?,;:'\"()[]{}").rstrip("!")
+    return " ".join(text.split())
+
+
+# Entities copied verbatim into commands: "cat Notes.txt" and "cat notes.txt." are different requests
+CASE_SENSITIVE_ENTITIES = frozenset({"cmd", "service"})
+
+
+def _key(text: str, intent: Optional[Intent] = None, exact: bool = False) -> tuple[bool, str]:
+    # The LLM returns every entity key, mostly empty: only non-empty values count
+    if exact or (intent is not None and any(intent.entities.get(k) for k in CASE_SENSITIVE_ENTITIES)):
+        return True, " ".join(text.split())
+    return False, normalize_transcript(text)
+
+
+def _whitelist_fingerprint() -> int:
+    return hash(tuple(sorted((k, frozenset(v)) for k, v in WHITELIST.items())))
+
+
+class IntentCache:
+    """Bounded LRU+TTL cache of resolved intents keyed on the normalized transcript.
+
+    Intents with case-sensitive entities (a command line, a unit name) are keyed
+    on the exact transcript instead, so a variant that differs in case or edge
+    punctuation is parsed again rather than served someone else's entities.
+
+    Entries are dropped wholesale whenever WHITELIST changes, since both the
+    regex heuristics and the skills depend on it.
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[bool, str], tuple[float, Intent]] = OrderedDict()
+        self._fingerprint = _whitelist_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_whitelist(self) -> None:
+        fp = _whitelist_fingerprint()
+        if fp != self._fingerprint:
+            self._entries.clear()
+            self._fingerprint = fp
+            self.invalidations += 1
+
+    def get(self, text: str) -> Optional[Intent]:
+        if self.max_entries <= 0:
+            return None
+        keys = (_key(text, exact=True), _key(text))
+        now = time.monotonic()
+        with self._lock:
+            self._check_whitelist()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self._entries[key]
+                    entry = None
+                if entry is not None:
+                    break
+            else:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            intent = entry[1]
+        return Intent(intent.name, dict(intent.entities), intent.confidence)
+
+    def put(self, text: str, intent: Intent) -> None:
+        if self.max_entries <= 0:
+            return
+        key = _key(text, intent)
+        stored = Intent(intent.name, dict(intent.entities), intent.confidence)
+        with self._lock:
+            self._check_whitelist()
+            self._entries[key] = (time.monotonic() + self.ttl_sec, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+intent_cache = IntentCache(config.intent_cache_size, config.intent_cache_ttl_sec)
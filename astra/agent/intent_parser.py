@@ -5,8 +5,7 @@ import re
 from dataclasses import dataclass
 from typing import Optional
 
-from .config import config
-from ..models.local_mistral_adapter import LocalAdapter
+from .model_router import local_adapter
 from .utils import extract_json_object
 from .executor import WHITELIST
 
@@ -18,74 +17,135 @@ class Intent:
     confidence: float
 
 
-INTENTS = {
-    "open_app": [
+@dataclass(frozen=True)
+class IntentRule:
+    name: str
+    pattern: re.Pattern
+    # Lowercase words, one of which must appear in the text for the pattern to be able to match
+    triggers: tuple[str, ...] = ()
+    # Literal prefixes of the stripped text that can make the pattern match
+    prefixes: tuple[str, ...] = ()
+    confidence: float = 0.78
+
+
+# Order is precedence: the first rule (in list order) whose pattern matches wins
+INTENT_RULES: list[IntentRule] = [
+    IntentRule(
+        "open_app",
         re.compile(r"\b(open|launch|start)\s+(?P<app>[a-z0-9\-_. ]+)", re.I),
-    ],
-    "manage_service": [
+        triggers=("open", "launch", "start"),
+    ),
+    IntentRule(
+        "manage_service",
         re.compile(
             r"\b(systemctl\s+(?P<action>start|stop|restart|status)\s+(?P<service>[a-z0-9\-_.@]+))",
             re.I,
         ),
+        triggers=("systemctl",),
+    ),
+    IntentRule(
+        "manage_service",
         re.compile(
             r"\b(service)\s+(?P<action>start|stop|restart|status)\s+(?P<service>[a-z0-9\-_.@]+)",
             re.I,
         ),
-    ],
-    "run_command": [
+        triggers=("service",),
+    ),
+    IntentRule(
+        "run_command",
         re.compile(r"\b(run|execute)\s+(?P<cmd>.+)", re.I),
-        re.compile(r"^!(?P<cmd>.+)$", re.I),
-    ],
-}
+        triggers=("run", "execute"),
+    ),
+    IntentRule("run_command", re.compile(r"^!(?P<cmd>.+)$", re.I), prefixes=("!",)),
+]
+
+# Pattern view kept for callers that inspect the intent table directly
+INTENTS: dict[str, list[re.Pattern]] = {}
+for _rule in INTENT_RULES:
+    INTENTS.setdefault(_rule.name, []).append(_rule.pattern)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# casefold() plus the two dotted/dotless i forms re.I also treats as "i", so trigger
+# words are found wherever a case-insensitive pattern could match
+_FOLD = str.maketrans({"\u0131": "i", "\u0307": ""})
+_APP_TOKEN_RE = re.compile(r"[a-z0-9\-_.]+")
+
+
+class IntentMatcher:
+    """Resolve the winning rule with one tokenization pass over the text.
+
+    Words are looked up in a trigger table, so only rules whose keyword occurs
+    in the utterance have their pattern evaluated, in precedence order. Cost per
+    utterance depends on its length and the candidate rules, not on how many
+    intents are registered.
+    """
+
+    def __init__(self, rules: list[IntentRule]):
+        self.rules = list(rules)
+        by_trigger: dict[str, list[int]] = {}
+        by_first_char: dict[str, list[tuple[str, int]]] = {}
+        for i, rule in enumerate(self.rules):
+            for word in rule.triggers:
+                by_trigger.setdefault(word.casefold(), []).append(i)
+            for prefix in rule.prefixes:
+                by_first_char.setdefault(prefix[:1], []).append((prefix, i))
+        self._by_trigger = {k: tuple(v) for k, v in by_trigger.items()}
+        self._by_first_char = {k: tuple(v) for k, v in by_first_char.items()}
+
+    def match(self, text: str) -> Optional[tuple[IntentRule, re.Match]]:
+        s = text.strip()
+        candidates: set[int] = set()
+        for prefix, i in self._by_first_char.get(s[:1], ()):
+            if s.startswith(prefix):
+                candidates.add(i)
+        by_trigger = self._by_trigger
+        for word in _WORD_RE.findall(s.casefold().translate(_FOLD)):
+            hit = by_trigger.get(word)
+            if hit:
+                candidates.update(hit)
+        for i in sorted(candidates):
+            m = self.rules[i].pattern.search(s)
+            if m:
+                return self.rules[i], m
+        return None
+
+
+_matcher = IntentMatcher(INTENT_RULES)
 
 
 def parse_intent(text: str) -> Optional[Intent]:
     s = text.strip()
-    for name, patterns in INTENTS.items():
-        for p in patterns:
-            m = p.search(s)
-            if m:
-                entities = {k: v for k, v in m.groupdict().items() if v}
-                return Intent(name=name, entities=entities, confidence=0.78)
-    # heuristic: "open firefox"
-    m = re.search(r"\bopen\s+(?P<app>[a-z0-9\-_. ]+)", s, re.I)
-    if m:
-        return Intent("open_app", {"app": m.group("app")}, confidence=0.6)
+    found = _matcher.match(s)
+    if found:
+        rule, m = found
+        entities = {k: v for k, v in m.groupdict().items() if v}
+        return Intent(name=rule.name, entities=entities, confidence=rule.confidence)
+    # The former "open <app>" heuristic is subsumed by the open_app rule, which
+    # matches every text it did, so it could never fire.
     # heuristic: single known app name like "firefox"
-    tokens = re.findall(r"[a-z0-9\-_.]+", s.lower())
+    tokens = _APP_TOKEN_RE.findall(s.lower())
     if len(tokens) == 1 and tokens[0] in WHITELIST.get("apps", set()):
         return Intent("open_app", {"app": tokens[0]}, confidence=0.7)
     return None
 
 
-def llm_parse_intent(text: str) -> Optional[Intent]:
-    """Use local Ollama (Mistral) to extract intent and entities as JSON.
+_LLM_INTENT_SYSTEM = (
+    "You are an intent extractor for a Linux desktop assistant."
+    " Output only JSON with keys: intent, entities, confidence, reason."
+    " allowed intents: open_app, run_command, manage_service, none."
+    " entities can include: app, cmd, action, service."
+    " Confidence is 0.0 to 1.0. No extra commentary."
+)
 
-    The model must return ONLY a JSON object of the form:
-    {
-      "intent": "open_app|run_command|manage_service|none",
-      "entities": {"app": "", "cmd": "", "action": "", "service": ""},
-      "confidence": 0.0-1.0,
-      "reason": "..."
+
+def _llm_intent_request(text: str) -> tuple[str, dict]:
+    return f"Text: {text.strip()}", {
+        "system_prompt_override": _LLM_INTENT_SYSTEM,
+        "gen_options_override": {"temperature": 0.1},
     }
-    """
-    system = (
-        "You are an intent extractor for a Linux desktop assistant."
-        " Output only JSON with keys: intent, entities, confidence, reason."
-        " allowed intents: open_app, run_command, manage_service, none."
-        " entities can include: app, cmd, action, service."
-        " Confidence is 0.0 to 1.0. No extra commentary."
-    )
-    user = f"Text: {text.strip()}"
-
-    adapter = LocalAdapter(config)
-    out = adapter.predict(
-        user,
-        {
-            "system_prompt_override": system,
-            "gen_options_override": {"temperature": 0.1},
-        },
-    )
+
+
+def _intent_from_output(out: dict) -> Optional[Intent]:
     raw = out.get("text", "").strip()
     if not raw:
         return None
@@ -107,3 +167,24 @@ def llm_parse_intent(text: str) -> Optional[Intent]:
     if conf < 0.45:
         return None
     return Intent(name=intent_name, entities=entities, confidence=conf)
+
+
+def llm_parse_intent(text: str) -> Optional[Intent]:
+    """Use local Ollama (Mistral) to extract intent and entities as JSON.
+
+    The model must return ONLY a JSON object of the form:
+    {
+      "intent": "open_app|run_command|manage_service|none",
+      "entities": {"app": "", "cmd": "", "action": "", "service": ""},
+      "confidence": 0.0-1.0,
+      "reason": "..."
+    }
+    """
+    prompt, ctx = _llm_intent_request(text)
+    return _intent_from_output(local_adapter.predict(prompt, ctx))
+
+
+async def llm_parse_intent_async(text: str) -> Optional[Intent]:
+    """Same as llm_parse_intent, without holding a thread while the model generates."""
+    prompt, ctx = _llm_intent_request(text)
+    return _intent_from_output(await local_adapter.predict_async(prompt, ctx))
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .config import config
+
+
+class _LeaderGone(Exception):
+    """Set on a shared call whose leader was cancelled; waiters retry instead of inheriting it."""
+
+
+class DiskTier:
+    """SQLite table of cached completions, trimmed least-recently-used first past ``max_bytes``."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self.bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logging.warning("LLM cache disk read failed: %s", e)
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode()) + len(key)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses(key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, size, time.time()),
+            )
+            self.bytes += size - (old[0] if old else 0)
+            while self.bytes > self.max_bytes:
+                victims = self._db.execute(
+                    "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+                ).fetchall()
+                if not victims:
+                    break
+                for victim, victim_size in victims:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (victim,))
+                    self.bytes -= victim_size
+                    self.evictions += 1
+                    if self.bytes <= self.max_bytes:
+                        break
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                rows = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            rows = None
+        return {"entries": rows, "bytes": self.bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class ResponseCache:
+    """Completions keyed on (backend, model, system prompt, options, prompt).
+
+    An in-memory LRU sits in front of an optional SQLite tier. Identical
+    requests that arrive while the first is still upstream wait for its result
+    instead of issuing their own call; only error-free responses are stored.
+    """
+
+    def __init__(self, max_entries: int, disk: Optional[DiskTier] = None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Dict] = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(backend: str, model: str, system_prompt: str, options: Dict, prompt: str) -> str:
+        raw = json.dumps([backend, model, system_prompt, options, prompt], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, key: str) -> tuple[Optional[Dict], Optional[Future], bool]:
+        """Return ``(cached, future, leader)``.
+
+        On a hit ``cached`` is set. Otherwise ``future`` is the in-flight call
+        for this key; the caller owns it (and must ``complete``/``fail`` it)
+        when ``leader`` is True, and should wait on it when False.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return dict(value), None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+        value = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if value is not None:
+                self.disk_hits += 1
+                self._store(key, value)
+                return dict(value), None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            future = self._inflight[key] = Future()
+            self.misses += 1
+            return None, future, True
+
+    def peek(self, key: str) -> Optional[Dict]:
+        """Cached value for ``key`` without joining or starting an in-flight call."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return dict(value)
+        value = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value)
+            return dict(value)
+
+    def _store(self, key: str, value: Dict) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def complete(self, key: str, future: Future, value: Dict) -> None:
+        if not value.get("error"):
+            with self._lock:
+                self._store(key, dict(value))
+            if self.disk is not None:
+                try:
+                    self.disk.put(key, value)
+                except sqlite3.Error as e:
+                    logging.warning("LLM cache disk write failed: %s", e)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def fail(self, key: str, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        # A cancelled leader (client gone, timeout) says nothing about the call: the next waiter leads a retry
+        future.set_exception(error if isinstance(error, Exception) else _LeaderGone())
+
+    def count_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits + self.coalesced
+            lookups = hits + self.misses
+            out = {
+                "size": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+
+def _shared(out: Dict) -> Dict:
+    # A coalesced caller got the leader's response; errors are passed on unmarked
+    return out if out.get("error") else {**out, "cached": True}
+
+
+class CachingAdapter:
+    """Adapter wrapper that answers deterministic requests from ``cache``.
+
+    A request is cacheable when ``context["cache"]`` is True, or when it is not
+    False and the effective temperature is at most the configured threshold.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        model: str,
+        adapter: Any,
+        cache: ResponseCache,
+        system_prompt: str = "",
+        default_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.backend = backend
+        self.model = model
+        self.adapter = adapter
+        self.cache = cache
+        self.system_prompt = system_prompt
+        self.default_options = dict(default_options or {})
+
+    def _key(self, prompt: str, context: Dict) -> Optional[str]:
+        if not self.cache.enabled:
+            return None
+        options = dict(self.default_options)
+        options.update({k: v for k, v in (context.get("gen_options_override") or {}).items() if v is not None})
+        flag = context.get("cache")
+        if flag is None:
+            try:
+                flag = float(options.get("temperature", 1.0)) <= config.llm_cache_max_temperature
+            except (TypeError, ValueError):
+                # Not a number: the backend decides what it means, so don't assume it is deterministic
+                flag = False
+        if not flag:
+            self.cache.count_bypass()
+            return None
+        system = context.get("system_prompt_override") or self.system_prompt
+        return ResponseCache.make_key(self.backend, self.model, system, options, prompt)
+
+    def predict(self, prompt: str, context: Dict) -> Dict:
+        key = self._key(prompt, context)
+        if key is None:
+            return self.adapter.predict(prompt, context)
+        while True:
+            cached, future, leader = self.cache.lookup(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+            if leader:
+                break
+            try:
+                return _shared(future.result())
+            except _LeaderGone:
+                continue
+        try:
+            out = self.adapter.predict(prompt, context)
+        except BaseException as e:
+            self.cache.fail(key, future, e)
+            raise
+        self.cache.complete(key, future, out)
+        return out
+
+    async def predict_async(self, prompt: str, context: Dict) -> Dict:
+        key = self._key(prompt, context)
+        if key is None:
+            return await self.adapter.predict_async(prompt, context)
+        while True:
+            if self.cache.disk is not None:
+                cached, future, leader = await asyncio.to_thread(self.cache.lookup, key)
+            else:
+                cached, future, leader = self.cache.lookup(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+            if leader:
+                break
+            try:
+                # Shielded: a waiter's own cancellation must not cancel the shared future
+                return _shared(await asyncio.shield(asyncio.wrap_future(future)))
+            except _LeaderGone:
+                continue
+        try:
+            out = await self.adapter.predict_async(prompt, context)
+        except BaseException as e:
+            self.cache.fail(key, future, e)
+            raise
+        if self.cache.disk is not None:
+            await asyncio.to_thread(self.cache.complete, key, future, out)
+        else:
+            self.cache.complete(key, future, out)
+        return out
+
+    async def stream(self, prompt: str, context: Dict) -> AsyncIterator[str]:
+        key = self._key(prompt, context)
+        cached = None
+        if key is not None:
+            cached = await asyncio.to_thread(self.cache.peek, key) if self.cache.disk else self.cache.peek(key)
+        if cached is not None:
+            # A hit is replayed as one chunk; misses stream from the backend uncached
+            if cached.get("text"):
+                yield cached["text"]
+            return
+        async for token in self.adapter.stream(prompt, context):
+            yield token
+
+
+def _build_cache() -> ResponseCache:
+    disk = None
+    if config.llm_cache_size > 0 and config.llm_cache_db:
+        try:
+            disk = DiskTier(Path(config.llm_cache_db), config.llm_cache_db_max_mb * 1024 * 1024)
+        except sqlite3.Error as e:
+            logging.warning("LLM cache disk tier disabled: %s", e)
+    return ResponseCache(config.llm_cache_size, disk)
+
+
+llm_cache = _build_cache()
@@ -1,24 +1,120 @@
 from __future__ import annotations
 
-from typing import Any, List
-
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+# First, so the startup report's time to ready includes every import below
+from .startup import report, timed
+
+import asyncio
+import hmac
+import json
+import logging
+import math
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 
 from .config import config
+from .admission import Overloaded, Slot, stages
+from .metrics import MetricsMiddleware, intent_sources, registry, stage
+from .profiler import ProfilerBusy, profiler
+from .tracing import Trace, TraceMiddleware
 from .audit import audit
-from .model_router import route_request
+from .model_router import backend_stats, route_request
 from .privacy import scrub_text
-from .intent_parser import parse_intent, llm_parse_intent
-from .executor import execute_safe, ExecResult
+from .intent_parser import Intent, parse_intent, llm_parse_intent_async
+from .intent_cache import intent_cache
+from .semantic_cache import semantic_cache
+from .executor import execute_safe_async, execute_stream, ExecResult
+from .command_policy import command_policy
+from .exec_cache import exec_cache
+from .llm_cache import llm_cache
+from ..models.local_mistral_adapter import LocalAdapter
+from ..models.ollama_client import ollama_pool
+from ..models.ollama_health import ollama_breaker, ollama_prober
+from ..skills.app_index import app_index
 from ..skills.open_app import build_open_app_plan
 from ..skills.run_command import build_run_command_plan
 from ..skills.manage_service import build_manage_service_plan
 from ..tts.tts_engine import tts
-from ..stt.whisper_service import stt_health, transcribe_bytes
+from ..stt.whisper_service import registry as stt_registry, stt_health, transcribe_bytes
+from ..stt.streaming import StreamingTranscriber
+from ..stt.worker_pool import STTOverloaded, stt_pool
+
+
+def _timed_hook(name: str, fn: Callable[[], Any]) -> Callable[[], None]:
+    def run() -> None:
+        with timed(name):
+            fn()
+
+    return run
+
 
+def warm_hooks() -> List[tuple[str, Callable[[], None]]]:
+    """Initializations lazy startup leaves to first use; each records its time in the startup report."""
+    models = [m.strip() for m in (config.whisper_preload or config.whisper_model).split(",") if m.strip()]
+    return [
+        # preload() logs a model that fails and goes on with the rest
+        ("stt.models", _timed_hook("stt.models", lambda: stt_registry.preload(models))),
+        ("tts.init", tts.warm),
+        ("llm.model", _timed_hook("llm.model", LocalAdapter(config).warm)),
+        ("semantic_cache.load", _timed_hook("semantic_cache.load", semantic_cache.load)),
+        ("app_index.refresh", _timed_hook("app_index.refresh", app_index.refresh)),
+    ]
 
-app = FastAPI(title=config.app_name)
+
+async def _warm(hooks: List[tuple[str, Callable[[], None]]]) -> None:
+    async def run(name: str, hook: Callable[[], None]) -> None:
+        try:
+            await asyncio.to_thread(hook)
+        except Exception as e:
+            # A subsystem that cannot warm (no Ollama yet, no Whisper download) still starts lazily
+            logging.warning("Startup warm-up of %s failed: %s", name, e)
+
+    await asyncio.gather(*(run(name, hook) for name, hook in hooks))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Not deferred: an audit dir or key that cannot be used must stop startup, not drop records later
+    await asyncio.to_thread(audit.open)
+    if config.startup_mode == "eager":
+        await _warm(warm_hooks())
+    elif config.whisper_preload:
+        # Explicitly listed Whisper models are loaded and warmed even in lazy mode
+        await _warm([hook for hook in warm_hooks() if hook[0] == "stt.models"])
+    ollama_prober.start()
+    report.mark_ready(config.startup_mode)
+    yield
+    await ollama_prober.stop()
+    await ollama_pool.aclose()
+    stt_pool.shutdown()
+    llm_cache.close()
+    semantic_cache.save()
+    audit.close()
+
+
+async def _audit_trace(trace: Trace, scope: dict[str, Any]) -> None:
+    if config.trace_audit and trace.spans:
+        await audit.write_async({"event": "trace", "method": scope.get("method"), "route": getattr(scope.get("route"), "path", None),
+                     **trace.to_dict()})
+
+
+app = FastAPI(title=config.app_name, lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TraceMiddleware, on_complete=_audit_trace)
+
+
+@app.exception_handler(Overloaded)
+async def _shed_load(_: Request, e: Overloaded):
+    # A stage had no free slot within the queue-wait budget: tell the client when to retry
+    busy = _too_busy(e)
+    return JSONResponse(
+        {"detail": busy.detail, "stage": e.stage}, status_code=busy.status_code, headers=busy.headers
+    )
 
 
 class TranscriptIn(BaseModel):
@@ -29,24 +125,136 @@ class TranscriptIn(BaseModel):
     confirm: bool = False
 
 
+class TranscriptBatchIn(BaseModel):
+    transcripts: List[str] = Field(..., min_length=1)
+    context: dict[str, Any] = Field(default_factory=dict)
+    user_prefs: dict[str, Any] = Field(default_factory=dict)
+    dry_run: bool = True
+    confirm: bool = False
+
+
 class ExecuteIn(BaseModel):
     commands: List[str]
     dry_run: bool = True
     confirm: bool = False
 
 
+class PolicyCheckIn(BaseModel):
+    commands: List[str]
+
+
+class PolicyDecisionOut(BaseModel):
+    command: str
+    action: str
+    rule: str | None = None
+    reason: str
+    argv: List[str]
+
+
 class ExecResultOut(BaseModel):
     command: str
     stdout: str
     stderr: str
     returncode: int
+    duration_ms: float = 0.0
+    truncated: bool = False
+    timed_out: bool = False
+    cached: bool = False
+    policy: dict[str, Any] | None = None
+
+    @classmethod
+    def from_result(cls, r: ExecResult) -> "ExecResultOut":
+        return cls(
+            command=r.command,
+            stdout=r.stdout,
+            stderr=r.stderr,
+            returncode=r.returncode,
+            duration_ms=r.duration_ms,
+            truncated=r.truncated,
+            timed_out=r.timed_out,
+            cached=r.cached,
+            policy=r.policy,
+        )
 
 
-def plan_from_intent(text: str) -> List[str]:
-    intent = parse_intent(text)
-    if not intent:
-        # Fallback to LLM-based intent extraction
-        intent = llm_parse_intent(text)
+class TranscriptBatchItemOut(BaseModel):
+    index: int
+    transcript: str
+    status_code: int = 200
+    error: str | None = None
+    intent: str | None = None
+    model: str | None = None
+    reason: str | None = None
+    plan: List[str] = Field(default_factory=list)
+    results: List[ExecResultOut] = Field(default_factory=list)
+
+
+class TranscriptBatchOut(BaseModel):
+    items: List[TranscriptBatchItemOut]
+    failed: int
+    llm_fallbacks: int
+    duration_ms: float
+
+
+def _cached_or_parsed(text: str) -> Optional[Intent]:
+    intent = intent_cache.get(text)
+    if intent:
+        intent_sources.labels("cache").inc()
+        return intent
+    with stage("intent_parse"):
+        intent = parse_intent(text)
+    if intent:
+        intent_sources.labels("rules").inc()
+        intent_cache.put(text, intent)
+    return intent
+
+
+def _semantic_intent(text: str) -> Optional[Intent]:
+    # A paraphrase of a transcript the LLM already resolved needs no generation call
+    with stage("semantic_lookup"):
+        intent = semantic_cache.lookup(text)
+    if intent:
+        intent_sources.labels("semantic").inc()
+        intent_cache.put(text, intent)
+    return intent
+
+
+def _known_intent(text: str) -> Optional[Intent]:
+    """Intent from the caches or the rule parser, without calling the LLM."""
+    return _cached_or_parsed(text) or _semantic_intent(text)
+
+
+def _llm_unavailable() -> Optional[HTTPException]:
+    if ollama_breaker.state != "open":
+        return None
+    # Ollama is known to be down: fail now instead of waiting out the HTTP timeout
+    return HTTPException(
+        status_code=503,
+        detail="Could not parse intent and the local LLM fallback is unavailable (circuit open)",
+        headers={"Retry-After": str(max(1, round(ollama_breaker.retry_after())))},
+    )
+
+
+def _too_busy(e: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after_sec))}
+    )
+
+
+async def _llm_intent(text: str) -> Optional[Intent]:
+    """LLM intent extraction within the LLM stage limit; successes are cached."""
+    async with stages["llm"].admit():
+        with stage("llm_intent"):
+            intent = await llm_parse_intent_async(text)
+    intent_sources.labels("llm" if intent else "none").inc()
+    if intent:
+        with stage("semantic_store"):
+            await asyncio.to_thread(semantic_cache.add, text, intent)
+        intent_cache.put(text, intent)
+    return intent
+
+
+def plan_for_intent(intent: Optional[Intent]) -> List[str]:
     if not intent:
         raise HTTPException(status_code=400, detail="Could not parse intent")
     if intent.name == "open_app":
@@ -60,49 +268,287 @@ def plan_from_intent(text: str) -> List[str]:
     raise HTTPException(status_code=400, detail=f"Unsupported intent: {intent.name}")
 
 
+async def plan_from_intent(text: str) -> List[str]:
+    # The semantic lookup may call the embedding model, so it runs off the event loop
+    intent = _cached_or_parsed(text) or await asyncio.to_thread(_semantic_intent, text)
+    if not intent:
+        unavailable = _llm_unavailable()
+        if unavailable is not None:
+            raise unavailable
+        # Fallback to LLM-based intent extraction
+        intent = await _llm_intent(text)
+    # Skills may rescan installed apps; keep that off the event loop
+    with stage("plan_build"):
+        return await asyncio.to_thread(plan_for_intent, intent)
+
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "intent_cache": intent_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "audit": audit.stats(),
+        "exec_cache": exec_cache.stats(),
+        "command_policy": command_policy.stats(),
+        "admission": {name: stage.stats() for name, stage in stages.items()},
+        "profiler": profiler.stats(),
+        "startup": report.to_dict(),
+        "llm_cache": llm_cache.stats(),
+        "app_index": app_index.stats(),
+        "ollama": {"breaker": ollama_breaker.stats(), "probe": ollama_prober.stats()},
+        "routing": {
+            "mode": config.routing_mode,
+            "backends": {name: s.snapshot() for name, s in backend_stats.items()},
+        },
+    }
+
+
+def _runtime_metrics():
+    """Families read from the components' own counters at scrape time."""
+    caches = {
+        "intent": intent_cache.stats(),
+        "semantic_intent": semantic_cache.stats(),
+        "llm": llm_cache.stats(),
+        "exec": exec_cache.stats(),
+    }
+    llm = caches["llm"]
+    llm["hits"] = llm["memory_hits"] + llm["disk_hits"]
+    hits = [({"cache": name}, st["hits"] + st.get("coalesced", 0)) for name, st in caches.items()]
+    policy = command_policy.stats()
+    hits.append(({"cache": "command_policy"}, policy["memo_hits"]))
+    misses = [({"cache": name}, st["misses"]) for name, st in caches.items()]
+    misses.append(({"cache": "command_policy"}, policy["memo_misses"]))
+    yield "astra_cache_hits_total", "counter", "Cache hits (incl. coalesced requests)", hits
+    yield "astra_cache_misses_total", "counter", "Cache misses", misses
+    yield "astra_cache_hit_ratio", "gauge", "Hits / lookups since start", [
+        ({"cache": name}, st["hit_ratio"]) for name, st in caches.items()
+    ]
+    admission = {name: limiter.stats() for name, limiter in stages.items()}
+    yield "astra_admission_in_use", "gauge", "Requests holding an admission slot", [
+        ({"stage": name}, st["in_use"]) for name, st in admission.items()
+    ]
+    yield "astra_admission_waiting", "gauge", "Requests queued for an admission slot", [
+        ({"stage": name}, st["waiting"]) for name, st in admission.items()
+    ]
+    yield "astra_admission_rejected_total", "counter", "Requests shed with 429", [
+        ({"stage": name}, st["rejected"]) for name, st in admission.items()
+    ]
+    yield "astra_llm_in_flight", "gauge", "Model calls in progress", [
+        ({"backend": name}, s.snapshot()["in_flight"]) for name, s in backend_stats.items()
+    ]
+    pool = stt_pool.stats()
+    yield "astra_stt_busy_workers", "gauge", "STT workers decoding", [({}, pool["busy"])]
+    yield "astra_stt_queued_jobs", "gauge", "STT jobs waiting for a worker", [({}, pool["queued"])]
+    yield "astra_ollama_circuit_open", "gauge", "1 while the Ollama breaker is open", [
+        ({}, 1 if ollama_breaker.state == "open" else 0)
+    ]
+
+
+registry.add_collector(_runtime_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post("/v1/ingress/transcript", response_model=list[ExecResultOut])
-def handle_transcript(payload: TranscriptIn):
+async def handle_transcript(payload: TranscriptIn):
     routed = route_request(payload.transcript, payload.context, payload.user_prefs)
 
     # For MVP, skip LLM planning and rely on deterministic intent parsing
     try:
-        plan = plan_from_intent(payload.transcript)
+        plan = await plan_from_intent(payload.transcript)
     except HTTPException as e:
-        audit.write({"event": "intent_failed", "text": payload.transcript, "error": str(e.detail)})
+        await audit.write_async({"event": "intent_failed", "text": payload.transcript, "error": str(e.detail)})
         raise
 
-    audit.write(
+    await audit.write_async(
         {
             "event": "route",
             "model": routed.name,
             "reason": routed.reason,
+            "routing_stats": routed.stats,
             "text": payload.transcript,
             "plan": plan,
             "dry_run": payload.dry_run,
         }
     )
 
-    results: List[ExecResult] = execute_safe(plan, confirm=payload.confirm, dry_run=payload.dry_run)
-    tts.say("Done. Check your terminal output.")
-    return [
-        ExecResultOut(command=r.command, stdout=r.stdout, stderr=r.stderr, returncode=r.returncode)
-        for r in results
-    ]
+    async with stages["exec"].admit():
+        results = await execute_safe_async(plan, confirm=payload.confirm, dry_run=payload.dry_run)
+    with stage("tts"):
+        # The first reply initializes the speech engine
+        await asyncio.to_thread(tts.say, "Done. Check your terminal output.")
+    return [ExecResultOut.from_result(r) for r in results]
+
+
+@app.post("/v1/ingress/transcripts:batch", response_model=TranscriptBatchOut)
+async def handle_transcript_batch(payload: TranscriptBatchIn):
+    """Plan (and, unless dry-run, execute) many transcripts in one request.
+
+    Rule/cache resolution runs for every item first; the remaining LLM
+    fallbacks run concurrently, at most ``ASTRA_BATCH_LLM_CONCURRENCY`` at a
+    time, and identical transcripts share one call. Plans then execute in
+    input order. Items fail individually; one audit record covers the batch.
+    """
+    if len(payload.transcripts) > config.batch_max_items:
+        raise HTTPException(status_code=413, detail=f"At most {config.batch_max_items} transcripts per batch")
+    start = time.perf_counter()
+    texts = payload.transcripts
+    known = await asyncio.to_thread(lambda: [_known_intent(t) for t in texts])
+
+    pending = sorted({t for t, intent in zip(texts, known) if not intent})
+    llm: dict[str, Optional[Intent]] = {}
+    errors: dict[str, HTTPException] = {}
+    if pending:
+        unavailable = _llm_unavailable()
+        if unavailable is not None:
+            errors = {t: unavailable for t in pending}
+        else:
+            sem = asyncio.Semaphore(max(1, config.batch_llm_concurrency))
+
+            async def fallback(text: str) -> None:
+                try:
+                    async with sem:
+                        llm[text] = await _llm_intent(text)
+                except Overloaded as e:
+                    errors[text] = _too_busy(e)
+
+            await asyncio.gather(*(fallback(t) for t in pending))
+
+    items: List[TranscriptBatchItemOut] = []
+    audit_items: List[dict[str, Any]] = []
+    for i, text in enumerate(texts):
+        item = TranscriptBatchItemOut(index=i, transcript=text)
+        routed = route_request(text, payload.context, payload.user_prefs)
+        item.model, item.reason = routed.name, routed.reason
+        intent = known[i] or llm.get(text)
+        item.intent = intent.name if intent else None
+        try:
+            if text in errors:
+                raise errors[text]
+            with stage("plan_build"):
+                item.plan = await asyncio.to_thread(plan_for_intent, intent)
+        except HTTPException as e:
+            item.status_code, item.error = e.status_code, str(e.detail)
+        except ValueError as e:
+            # Skills reject apps, services and commands outside the whitelist
+            item.status_code, item.error = 400, str(e)
+        except PermissionError as e:
+            # Allowed but not enabled, e.g. restarting a whitelisted service
+            item.status_code, item.error = 403, str(e)
+        except Exception as e:
+            logging.exception("Planning batch item %d failed", i)
+            item.status_code, item.error = 500, f"{type(e).__name__}: {e}"
+        if item.error is None:
+            try:
+                async with stages["exec"].admit():
+                    results = await execute_safe_async(item.plan, confirm=payload.confirm, dry_run=payload.dry_run)
+            except Overloaded as e:
+                item.status_code, item.error = 429, str(e)
+                results = []
+            item.results = [ExecResultOut.from_result(r) for r in results]
+        if item.error is None:
+            audit_items.append({"text": text, "model": routed.name, "reason": routed.reason, "plan": item.plan})
+        else:
+            audit_items.append({"text": text, "error": item.error})
+        items.append(item)
+
+    await audit.write_async(
+        {
+            "event": "route_batch",
+            "dry_run": payload.dry_run,
+            "routing_stats": {name: s.snapshot() for name, s in backend_stats.items()},
+            "items": audit_items,
+        }
+    )
+    return TranscriptBatchOut(
+        items=items,
+        failed=sum(1 for item in items if item.error),
+        llm_fallbacks=len(pending),
+        duration_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
 
 
 @app.post("/v1/execute", response_model=list[ExecResultOut])
-def handle_execute(payload: ExecuteIn):
-    audit.write({"event": "execute_request", "commands": payload.commands, "dry_run": payload.dry_run})
-    results: List[ExecResult] = execute_safe(payload.commands, confirm=payload.confirm, dry_run=payload.dry_run)
-    return [
-        ExecResultOut(command=r.command, stdout=r.stdout, stderr=r.stderr, returncode=r.returncode)
-        for r in results
-    ]
+async def handle_execute(payload: ExecuteIn):
+    await audit.write_async({"event": "execute_request", "commands": payload.commands, "dry_run": payload.dry_run})
+    async with stages["exec"].admit():
+        results = await execute_safe_async(payload.commands, confirm=payload.confirm, dry_run=payload.dry_run)
+    return [ExecResultOut.from_result(r) for r in results]
+
+
+def _require_admin(authorization: str | None) -> None:
+    if not config.admin_token:
+        raise HTTPException(status_code=404, detail="admin endpoints are disabled (set ASTRA_ADMIN_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), config.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="admin token required", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/v1/admin/profile", response_class=PlainTextResponse)
+async def admin_profile(
+    seconds: float = Query(10.0, gt=0, le=config.profile_max_sec),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    idle: bool = False,
+    authorization: str | None = Header(None),
+):
+    """Sample every thread's stack for ``seconds``; returns collapsed stacks for flame graphs."""
+    _require_admin(authorization)
+    try:
+        # The sampler runs in its own thread, so the event loop keeps serving (and shows up in the profile)
+        out = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(out, headers={"X-Profile-Samples": str(profiler.last_samples)})
+
+
+@app.post("/v1/policy/check", response_model=list[PolicyDecisionOut])
+def policy_check(payload: PolicyCheckIn):
+    """What the executor would decide for each command, without running anything."""
+    out = []
+    for raw in payload.commands:
+        decision = command_policy.evaluate(raw)
+        out.append(PolicyDecisionOut(command=raw, argv=list(decision.argv), **decision.to_dict()))
+    return out
+
+
+@app.post("/v1/execute/stream")
+async def handle_execute_stream(payload: ExecuteIn, request: Request):
+    """Same policy as /v1/execute, but output lines are streamed as NDJSON frames."""
+    # Admitted before the response starts, so overload is still a plain 429
+    slot = await stages["exec"].acquire()
+    try:
+        await audit.write_async({
+            "event": "execute_request",
+            "commands": payload.commands,
+            "dry_run": payload.dry_run,
+            "stream": True,
+        })
+    except BaseException:
+        slot.release()
+        raise
+
+    async def frames() -> AsyncIterator[str]:
+        stream = execute_stream(payload.commands, confirm=payload.confirm, dry_run=payload.dry_run)
+        # aclosing() kills a still-running command as soon as we stop iterating
+        try:
+            async with aclosing(stream):
+                last_check = time.monotonic()
+                async for frame in stream:
+                    yield json.dumps(frame, ensure_ascii=False) + "\n"
+                    # Writes to a dropped connection are silently discarded, so poll for it
+                    if time.monotonic() - last_check > 0.25:
+                        if await request.is_disconnected():
+                            return
+                        last_check = time.monotonic()
+        finally:
+            slot.release()
+
+    # The background task also runs when the client is gone before the body starts
+    return StreamingResponse(frames(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
 
 
 class LLMIn(BaseModel):
@@ -112,52 +558,109 @@ class LLMIn(BaseModel):
     scrub_privacy: bool = True
     system_prompt: str | None = None
     options: dict[str, Any] | None = None
+    stream: bool = False
+    # None: cache only deterministic requests (low temperature); True/False force it on/off
+    cache: bool | None = None
 
 
 class LLMOut(BaseModel):
     model: str
     reason: str
+    routing: dict[str, Any] = Field(default_factory=dict)  # per-backend stats seen by the router
+    cached: bool = False
     text: str
     confidence: float
     error: str | None = None
 
 
+def _stream_completion(routed, prompt: str, ctx: dict[str, Any], slot: Slot) -> StreamingResponse:
+    """Forward tokens as NDJSON lines: {"token": ...} per chunk, then a final {"done": true, ...}."""
+
+    async def lines() -> AsyncIterator[str]:
+        error = None
+        try:
+            async for token in routed.adapter.stream(prompt, ctx):
+                yield json.dumps({"token": token}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            error = str(e)
+            await audit.write_async({"event": "llm_error", "model": routed.name, "error": error})
+        else:
+            await audit.write_async({
+                "event": "llm_complete",
+                "model": routed.name,
+                "reason": routed.reason,
+                "stream": True,
+            })
+        finally:
+            # Also runs when the client disconnects mid-stream
+            slot.release()
+        yield json.dumps({
+            "done": True,
+            "model": routed.name,
+            "reason": routed.reason,
+            "routing": routed.stats,
+            "error": error,
+        }) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+
+
 @app.post("/v1/llm/complete", response_model=LLMOut)
-def llm_complete(payload: LLMIn):
+async def llm_complete(payload: LLMIn):
     routed = route_request(payload.prompt, payload.context, payload.user_prefs)
     prompt = payload.prompt
     # Scrub only for cloud uploads
     if routed.name == "cloud" and payload.scrub_privacy:
-        prompt = scrub_text(prompt)
+        prompt = scrub_text(prompt, routed.pii)
+
+    # Pass through optional overrides if the adapter supports them
+    ctx = dict(payload.context)
+    if payload.system_prompt:
+        ctx["system_prompt_override"] = payload.system_prompt
+    if payload.options:
+        ctx["gen_options_override"] = payload.options
+    if payload.cache is not None:
+        ctx["cache"] = payload.cache
+    slot = await stages["llm"].acquire()
+    try:
+        if payload.stream:
+            return _stream_completion(routed, prompt, ctx, slot)
+    except BaseException:
+        slot.release()
+        raise
 
     try:
-        # Pass through optional overrides if the adapter supports them
-        ctx = dict(payload.context)
-        if payload.system_prompt:
-            ctx["system_prompt_override"] = payload.system_prompt
-        if payload.options:
-            ctx["gen_options_override"] = payload.options
-        out = routed.adapter.predict(prompt, ctx)
+        out = await routed.adapter.predict_async(prompt, ctx)
     except Exception as e:
-        audit.write({"event": "llm_error", "model": routed.name, "error": str(e)})
+        await audit.write_async({"event": "llm_error", "model": routed.name, "error": str(e)})
         raise HTTPException(status_code=500, detail="LLM call failed")
+    finally:
+        slot.release()
 
     text = out.get("text", "")
     confidence = float(out.get("confidence", 0.0))
     error = out.get("error")
-    audit.write({
+    await audit.write_async({
         "event": "llm_complete",
         "model": routed.name,
         "reason": routed.reason,
         "confidence": confidence,
         "error": error,
     })
-    return LLMOut(model=routed.name, reason=routed.reason, text=text, confidence=confidence, error=error)
+    return LLMOut(
+        model=routed.name,
+        reason=routed.reason,
+        routing=routed.stats,
+        cached=bool(out.get("cached")),
+        text=text,
+        confidence=confidence,
+        error=error,
+    )
 
 
 @app.get("/v1/stt/health")
 def stt_health_check():
-    return stt_health()
+    return {**stt_health(), "pool": stt_pool.stats()}
 
 
 class STTOut(BaseModel):
@@ -165,15 +668,95 @@ class STTOut(BaseModel):
     language: str | None = None
     duration: float | None = None
     segments: list[dict] | None = None
+    model: str | None = None
+    decode_path: str | None = None
+    decode_ms: float | None = None
+    queue_wait_ms: float | None = None
+    compute_ms: float | None = None
+
+
+def _stt_overloaded(e: STTOverloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
 
 
 @app.post("/v1/stt/transcribe", response_model=STTOut)
-async def stt_transcribe(file: UploadFile = File(...), language: str | None = Form(None)):
+async def stt_transcribe(
+    file: UploadFile = File(...),
+    language: str | None = Form(None),
+    sample_rate: int | None = Form(None, gt=0),
+    model: str | None = Form(None),
+):
+    try:
+        model = stt_registry.resolve(model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     data = await file.read()
-    result = transcribe_bytes(data, language=language)
+    try:
+        async with stages["stt"].admit():
+            result, timing = await stt_pool.run(
+                transcribe_bytes, data, language=language, sample_rate=sample_rate, model=model
+            )
+    except STTOverloaded as e:
+        raise _stt_overloaded(e)
     return STTOut(
         text=result.get("text", ""),
         language=result.get("language"),
         duration=result.get("duration"),
         segments=result.get("segments"),
+        model=result.get("model"),
+        decode_path=result.get("decode_path"),
+        decode_ms=result.get("decode_ms"),
+        queue_wait_ms=timing.queue_wait_ms,
+        compute_ms=timing.compute_ms,
     )
+
+
+@app.websocket("/v1/stt/stream")
+async def stt_stream(ws: WebSocket, language: str | None = None, model: str | None = None):
+    """Streaming STT over a WebSocket.
+
+    Client sends binary frames of raw 16 kHz mono int16 PCM while recording, then
+    the text frame {"type": "end"}. Server replies with {"type": "partial"|"final", ...}
+    events as audio is decoded and a closing {"type": "done", "text": ...}.
+    """
+    await ws.accept()
+    try:
+        model = stt_registry.resolve(model)
+    except ValueError as e:
+        await ws.send_json({"type": "error", "error": str(e)})
+        await ws.close(code=1008)
+        return
+    stream = StreamingTranscriber(language=language, model=model)
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                return
+            if msg.get("bytes") is not None:
+                if stream.append(msg["bytes"]):
+                    try:
+                        events, _ = await stt_pool.run(stream.decode)
+                    except STTOverloaded:
+                        # Skip this partial; the next step re-decodes the same window
+                        continue
+                    for event in events:
+                        await ws.send_json(event)
+            elif msg.get("text") is not None:
+                try:
+                    control = json.loads(msg["text"])
+                except json.JSONDecodeError:
+                    control = {}
+                if isinstance(control, dict) and control.get("type") == "end":
+                    break
+        events, _ = await stt_pool.run(stream.finish)
+        for event in events:
+            await ws.send_json(event)
+        await ws.close()
+    except WebSocketDisconnect:
+        return
+    except STTOverloaded as e:
+        await ws.send_json({"type": "error", "error": str(e)})
+        await ws.close(code=1013)  # try again later
+    except Exception as e:
+        await ws.send_json({"type": "error", "error": str(e)})
+        await ws.close(code=1011)
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .tracing import Trace, add_span
+
+# Latency buckets in seconds: 100 us (regex parsing, cache hits) up to 30 s (LLM, long commands)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# name, type, help, [(labels, value)]; a collector's samples are computed at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Timer:
+    """``with histogram.labels(...).time():`` observes the block's wall time in seconds."""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self.child = child
+
+    def __enter__(self) -> _Timer:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self, out: List[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for key, child in self._items():
+            out.append(f"{self.name}{_labels(self.label_names, key)} {_number(child.value)}")
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def render(self, out: List[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} histogram")
+        for key, child in self._items():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                out.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            out.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+
+
+class Registry:
+    """Metrics rendered in the Prometheus text exposition format (0.0.4)."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        out: List[str] = []
+        for metric in self._metrics:
+            metric.render(out)
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                out.append(f"# HELP {name} {help}")
+                out.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    out.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(float(value))}")
+        out.append("")
+        return "\n".join(out)
+
+
+registry = Registry()
+
+stage_seconds: Histogram = registry.register(Histogram(
+    "astra_stage_duration_seconds",
+    "Wall time of one pipeline stage (stt_decode, intent_parse, llm_intent, plan_build, exec_command, ...)",
+    ["stage"],
+))
+http_seconds: Histogram = registry.register(Histogram(
+    "astra_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+))
+http_in_flight: Gauge = registry.register(Gauge(
+    "astra_http_requests_in_flight", "HTTP requests being handled"
+))
+llm_seconds: Histogram = registry.register(Histogram(
+    "astra_llm_request_duration_seconds", "Model backend call latency", ["backend", "outcome"]
+))
+routing_decisions: Counter = registry.register(Counter(
+    "astra_routing_decisions_total", "Router decisions by backend and reason", ["backend", "reason"]
+))
+exec_commands: Counter = registry.register(Counter(
+    "astra_exec_commands_total", "Commands settled by the executor", ["returncode", "policy", "cached"]
+))
+intent_sources: Counter = registry.register(Counter(
+    "astra_intent_resolutions_total", "Where a transcript's intent came from", ["source"]
+))
+
+
+class _StageTimer(_Timer):
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        super().__init__(stage_seconds.labels(name))
+        self.name = name
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.child.observe(elapsed)
+        add_span(self.name, self.start, elapsed)
+
+
+def stage(name: str) -> _Timer:
+    """``with stage("plan_build"):`` records the block under astra_stage_duration_seconds
+    and as a span of the current request's trace."""
+    return _StageTimer(name)
+
+
+def observe_stage(name: str, seconds: float, start: Optional[float] = None, trace: Optional[Trace] = None) -> None:
+    """Record a stage timed elsewhere; ``start`` is a perf_counter value (default: ``seconds`` ago)."""
+    stage_seconds.labels(name).observe(seconds)
+    add_span(name, time.perf_counter() - seconds if start is None else start, seconds, trace)
+
+
+_DIGITS = re.compile(r"\d+(?:\.\d+)?")
+
+
+def record_route(backend: str, reason: str) -> None:
+    # Reasons embed numbers ("complexity 812 > threshold"); keep the label set bounded
+    routing_decisions.labels(backend, _DIGITS.sub("N", reason)).inc()
+
+
+def record_exec(returncode: int, policy: Optional[Dict[str, Any]], cached: bool) -> None:
+    action = policy.get("action", "") if policy else ""
+    exec_commands.labels(returncode, action, "true" if cached else "false").inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by route template (not raw path)."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        in_flight = http_in_flight.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # Routing stores the matched route in the scope; its template keeps cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_seconds.labels(scope.get("method", ""), route, status["code"]).observe(time.perf_counter() - start)
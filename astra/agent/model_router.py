@@ -1,30 +1,213 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List
 
 from .config import config
-from .utils import estimate_token_count, is_privacy_sensitive, intent_is_system_action
+from .llm_cache import CachingAdapter, llm_cache
+from .metrics import llm_seconds, record_route, stage
+from .privacy import PIISpan, pii
+from .tracing import add_span
+from .utils import estimate_token_count, intent_is_system_action
 from ..models.local_mistral_adapter import LocalAdapter
 from ..models.cloud_adapter import CloudAdapter
 
 
+class BackendStats:
+    """Exponentially weighted latency, error rate and throughput of one backend.
+
+    The error rate also halves every ``error_half_life_sec`` without a request,
+    so a backend that routing avoids for its errors is eventually tried again.
+    """
+
+    def __init__(self, alpha: float, name: str = "", error_half_life_sec: float = 0.0):
+        self.alpha = alpha
+        self.name = name
+        self.error_half_life_sec = error_half_life_sec
+        self._lock = threading.Lock()
+        self.latency_ms: float | None = None
+        self._error_rate = 0.0
+        self._error_at = time.monotonic()
+        self.tokens_per_sec: float | None = None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    def _ewma(self, old: float | None, new: float) -> float:
+        return new if old is None else old + self.alpha * (new - old)
+
+    def _decayed_error_rate(self, now: float) -> float:
+        if self.error_half_life_sec <= 0 or not self._error_rate:
+            return self._error_rate
+        return self._error_rate * 0.5 ** ((now - self._error_at) / self.error_half_life_sec)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._decayed_error_rate(time.monotonic())
+
+    def start(self) -> float:
+        with self._lock:
+            self.in_flight += 1
+        return time.perf_counter()
+
+    def finish(self, started: float, tokens: int, error: bool) -> None:
+        elapsed = time.perf_counter() - started
+        llm_seconds.labels(self.name, "error" if error else "ok").observe(elapsed)
+        add_span(f"llm_{self.name}", started, elapsed)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.errors += int(error)
+            now = time.monotonic()
+            self._error_rate = self._ewma(self._decayed_error_rate(now), 1.0 if error else 0.0)
+            self._error_at = now
+            if not error:
+                self.latency_ms = self._ewma(self.latency_ms, elapsed * 1000)
+                if tokens and elapsed > 0:
+                    self.tokens_per_sec = self._ewma(self.tokens_per_sec, tokens / elapsed)
+
+    def expected_ms(self) -> float | None:
+        """Latency a new request should expect, counting the ones already queued ahead of it."""
+        if self.latency_ms is None:
+            return None
+        return self.latency_ms * (1 + self.in_flight)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 1),
+                "error_rate": round(self._decayed_error_rate(time.monotonic()), 3),
+                "tokens_per_sec": None if self.tokens_per_sec is None else round(self.tokens_per_sec, 1),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+            }
+
+
+class TrackedAdapter:
+    """Adapter wrapper that feeds every call's outcome into the backend's stats."""
+
+    def __init__(self, adapter: Any, stats: BackendStats):
+        self.adapter = adapter
+        self.stats = stats
+
+    def predict(self, prompt: str, context: Dict) -> Dict:
+        started = self.stats.start()
+        out: Dict = {}
+        try:
+            out = self.adapter.predict(prompt, context)
+            return out
+        finally:
+            self.stats.finish(started, estimate_token_count(out.get("text", "")), not out or bool(out.get("error")))
+
+    async def predict_async(self, prompt: str, context: Dict) -> Dict:
+        started = self.stats.start()
+        out: Dict = {}
+        try:
+            out = await self.adapter.predict_async(prompt, context)
+            return out
+        finally:
+            self.stats.finish(started, estimate_token_count(out.get("text", "")), not out or bool(out.get("error")))
+
+    async def stream(self, prompt: str, context: Dict) -> AsyncIterator[str]:
+        started = self.stats.start()
+        chunks = 0
+        ok = False
+        try:
+            async for token in self.adapter.stream(prompt, context):
+                chunks += 1
+                yield token
+            ok = True
+        finally:
+            # One streamed chunk is roughly one model token
+            self.stats.finish(started, chunks, not ok)
+
+
+# Long-lived adapters: they share the pooled HTTP clients and accumulate routing stats
+backend_stats = {
+    "local": BackendStats(config.routing_ewma_alpha, "local", config.routing_error_half_life_sec),
+    "cloud": BackendStats(config.routing_ewma_alpha, "cloud", config.routing_error_half_life_sec),
+}
+# Cache hits are answered before the tracked adapter, so they do not skew backend latency
+local_adapter = CachingAdapter(
+    "local",
+    config.ollama_model,
+    TrackedAdapter(LocalAdapter(config), backend_stats["local"]),
+    llm_cache,
+    system_prompt=config.local_system_prompt,
+    default_options={
+        "temperature": config.ollama_temperature,
+        "top_p": config.ollama_top_p,
+        "repeat_penalty": config.ollama_repeat_penalty,
+    },
+)
+cloud_adapter = CachingAdapter(
+    "cloud", "default", TrackedAdapter(CloudAdapter(config), backend_stats["cloud"]), llm_cache
+)
+_ADAPTERS = {"local": local_adapter, "cloud": cloud_adapter}
+
+
 @dataclass
 class RoutedModel:
     name: str
     adapter: object
     reason: str
+    stats: Dict[str, Any] = field(default_factory=dict)
+    # PII found in the routed text; reused to scrub it for cloud uploads
+    pii: List[PIISpan] = field(default_factory=list)
+
+
+def _routed(name: str, reason: str, spans: List[PIISpan]) -> RoutedModel:
+    record_route(name, reason)
+    stats = {backend: s.snapshot() for backend, s in backend_stats.items()}
+    return RoutedModel(name, _ADAPTERS[name], reason=reason, stats=stats, pii=spans)
+
+
+def _adaptive_choice(complexity: int) -> tuple[str, str] | None:
+    """Pick a backend from observed performance, or None to fall back to the static policy."""
+    local, cloud = backend_stats["local"], backend_stats["cloud"]
+    cloud_errors, local_errors = cloud.error_rate, local.error_rate
+    if cloud_errors > config.routing_max_error_rate:
+        return "local", f"cloud error rate {cloud_errors:.2f} too high"
+    if local_errors > config.routing_max_error_rate:
+        return "cloud", f"local error rate {local_errors:.2f} too high"
+    if local.in_flight >= config.routing_local_max_inflight:
+        return "cloud", f"local saturated ({local.in_flight} in flight)"
+    if complexity > config.complexity_threshold_tokens:
+        local_ms, cloud_ms = local.expected_ms(), cloud.expected_ms()
+        if local_ms is not None and cloud_ms is not None:
+            if local_ms <= cloud_ms:
+                return "local", f"complexity {complexity}: local expected {local_ms:.0f} ms <= cloud {cloud_ms:.0f} ms"
+            return "cloud", f"complexity {complexity}: cloud expected {cloud_ms:.0f} ms < local {local_ms:.0f} ms"
+        return None
+    return "local", "local healthy"
 
 
 def route_request(transcript: str, context: dict, user_prefs: dict | None = None) -> RoutedModel:
-    user_prefs = user_prefs or {}
+    with stage("route"):
+        return _route(transcript, user_prefs or {})
+
+
+def _route(transcript: str, user_prefs: dict) -> RoutedModel:
+    spans = pii.find(transcript)
     if user_prefs.get("force_cloud") or config.force_cloud:
-        return RoutedModel("cloud", CloudAdapter(config), reason="user override: force cloud")
+        return _routed("cloud", "user override: force cloud", spans)
 
-    if is_privacy_sensitive(transcript) or intent_is_system_action(transcript):
-        return RoutedModel("local", LocalAdapter(config), reason="privacy/system-action -> local")
+    # Never relaxed by adaptive routing: sensitive text and system actions stay on-device
+    if spans or intent_is_system_action(transcript):
+        return _routed("local", "privacy/system-action -> local", spans)
 
     complexity = estimate_token_count(transcript)
+    if config.routing_mode == "adaptive" and config.allow_cloud_uploads:
+        choice = _adaptive_choice(complexity)
+        if choice is not None:
+            name, why = choice
+            return _routed(name, f"adaptive: {why}", spans)
+
     if complexity > config.complexity_threshold_tokens and config.allow_cloud_uploads:
-        return RoutedModel("cloud", CloudAdapter(config), reason=f"complexity {complexity} > threshold")
+        return _routed("cloud", f"complexity {complexity} > threshold", spans)
 
-    return RoutedModel("local", LocalAdapter(config), reason="default local policy")
+    return _routed("local", "default local policy", spans)
@@ -1,19 +1,190 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
 
+_CARD = r"\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b"
 
-REDACTIONS = [
-    # Simple patterns for demo purposes; can be extended with more robust PII detection
-    (re.compile(r"\b\d{3}-\d{2}-\d{4}\b"), "[SSN]"),
-    (re.compile(r"\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b"), "[CARD]"),
-    (re.compile(r"\b(?:pass(word)?|pwd)\b[:=]?\s*\S+", re.I), "[PASSWORD]"),
-    (re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", re.I), "[EMAIL]"),
+
+@dataclass(frozen=True)
+class PIIRule:
+    kind: str
+    pattern: str
+    # Replacement used by redaction; None marks text that is sensitive but kept as-is
+    token: Optional[str]
+    # Regex for the text every match starts with, or (with ``lead``) contains
+    trigger: str
+    # Character class a match may cover before its trigger, e.g. an email's local part
+    lead: str = ""
+
+
+# Simple patterns for demo purposes; can be extended with more robust PII detection.
+# Rules match case-insensitively; earlier rules win when two match at the same position.
+PII_RULES: List[PIIRule] = [
+    PIIRule("ssn", r"\b\d{3}-\d{2}-\d{4}\b", "[SSN]", trigger=r"\d+"),
+    PIIRule("card", _CARD, "[CARD]", trigger=r"\d+"),
+    # A card number given as the password is consumed whole rather than up to its first space
+    PIIRule(
+        "password",
+        rf"\b(?:pass(?:word)?|pwd)\b[:=]?\s*(?:{_CARD}|\S+)",
+        "[PASSWORD]",
+        trigger=r"p(?:ass|wd)",
+    ),
+    PIIRule(
+        "email",
+        r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+        "[EMAIL]",
+        trigger="@",
+        lead=r"[A-Za-z0-9._%+-]",
+    ),
+    # Talking about a password with no value attached still keeps the request local
+    PIIRule("password_mention", r"\bpassword\b", None, trigger=r"p(?:ass|wd)"),
 ]
 
 
-def scrub_text(text: str) -> str:
-    cleaned = text
-    for pattern, token in REDACTIONS:
-        cleaned = pattern.sub(token, cleaned)
-    return cleaned
+@dataclass(frozen=True)
+class PIISpan:
+    kind: str
+    start: int
+    end: int
+    text: str
+    token: Optional[str]
+
+
+class PIIDetector:
+    """Single-pass PII detection that returns typed, non-overlapping spans.
+
+    Spans are what ``re.finditer`` over the alternation of all rule patterns
+    would return (leftmost match, earlier rule on ties), but found without
+    trying every pattern at every character: one scan locates the cheap
+    triggers (digit runs, "pass"/"pwd", "@") and rule patterns are only
+    matched there. Both the routing check and redaction reuse the spans;
+    ``stream``/``redact_stream`` work over an iterable of chunks.
+    """
+
+    def __init__(self, rules: Sequence[PIIRule]):
+        self.rules = list(rules)
+        self._patterns = [re.compile(rule.pattern, re.I) for rule in self.rules]
+        by_trigger: dict[str, list[int]] = {}
+        for i, rule in enumerate(self.rules):
+            by_trigger.setdefault(rule.trigger, []).append(i)
+        self._trigger_rules = [tuple(idx) for idx in by_trigger.values()]
+        self._triggers = re.compile("|".join(f"(?P<t{j}>{t})" for j, t in enumerate(by_trigger)), re.I)
+        # Rules whose match can begin before the trigger position
+        self._lead = [
+            (i, re.compile(rule.lead, re.I), re.compile(f"{rule.lead}*", re.I), re.compile(rule.trigger, re.I))
+            for i, rule in enumerate(self.rules)
+            if rule.lead
+        ]
+
+    def _lead_match(self, j: int, text: str, at: int, floor: int,
+                    runs: dict[int, tuple[int, int]]) -> Optional[re.Match]:
+        # Find the lead run containing ``at`` (not before ``floor``), then require it to
+        # end in this rule's trigger and the whole pattern to match from its start.
+        # ``runs`` remembers the last run per rule so a run with many triggers is walked once.
+        i, lead, run, trigger = self._lead[j]
+        start, end = runs.get(j, (at, -1))
+        if not start <= at < end:
+            start = at
+            while start > floor and lead.match(text, start - 1):
+                start -= 1
+            end = run.match(text, at).end()
+            runs[j] = (start, end)
+        if not trigger.match(text, end):
+            return None
+        return self._patterns[i].match(text, max(start, floor))
+
+    def _iter(self, text: str, pos: int = 0) -> Iterator[tuple[re.Match, int]]:
+        floor = pos  # a lead run may extend back past triggers that matched nothing
+        runs: dict[int, tuple[int, int]] = {}
+        while True:
+            t = self._triggers.search(text, pos)
+            if t is None:
+                return
+            at = t.start()
+            best: Optional[tuple[int, int, re.Match]] = None
+            for i in self._trigger_rules[int(t.lastgroup[1:])]:
+                if self.rules[i].lead:
+                    continue
+                m = self._patterns[i].match(text, at)
+                if m:
+                    best = (at, i, m)
+                    break
+            for j, (i, *_) in enumerate(self._lead):
+                m = self._lead_match(j, text, at, floor, runs)
+                if m and (best is None or (m.start(), i) < best[:2]):
+                    best = (m.start(), i, m)
+            if best is None:
+                pos = t.end()
+                continue
+            _, i, m = best
+            yield m, i
+            pos = floor = max(m.end(), at + 1)
+
+    def _span(self, m: re.Match, i: int, offset: int = 0) -> PIISpan:
+        rule = self.rules[i]
+        return PIISpan(rule.kind, offset + m.start(), offset + m.end(), m.group(), rule.token)
+
+    def find(self, text: str) -> List[PIISpan]:
+        return [self._span(m, i) for m, i in self._iter(text)]
+
+    def contains(self, text: str) -> bool:
+        return next(self._iter(text), None) is not None
+
+    @staticmethod
+    def redact(text: str, spans: Iterable[PIISpan], offset: int = 0) -> str:
+        """Replace ``spans`` (absolute offsets, ``offset`` = position of ``text``) with their tokens."""
+        out: List[str] = []
+        pos = 0
+        for span in spans:
+            if span.token is None:
+                continue
+            out.append(text[pos : span.start - offset])
+            out.append(span.token)
+            pos = span.end - offset
+        out.append(text[pos:])
+        return "".join(out)
+
+    def stream(self, chunks: Iterable[str], overlap: int = 512) -> Iterator[tuple[str, List[PIISpan]]]:
+        """Yield ``(segment, spans)`` pairs covering the concatenated chunks in order.
+
+        Matches that end within ``overlap`` characters of the data received so
+        far are held back until more arrives, since they might still grow; a
+        span that is longer than ``overlap`` and straddles a chunk boundary
+        can be missed.
+        """
+        buf = ""
+        base = 0  # absolute offset of buf[0]
+        pos = 0  # start of the unscanned part; buf[pos - 1] is kept as \b context
+        for chunk in chunks:
+            buf += chunk
+            limit = len(buf) - overlap
+            if limit <= pos:
+                continue
+            spans: List[PIISpan] = []
+            cut = limit
+            for m, i in self._iter(buf, pos):
+                if m.end() >= limit:
+                    cut = m.start()
+                    break
+                spans.append(self._span(m, i, base))
+            if cut > pos:
+                yield buf[pos:cut], spans
+                keep = cut - 1
+                buf, base, pos = buf[keep:], base + keep, 1
+        yield buf[pos:], [self._span(m, i, base) for m, i in self._iter(buf, pos)]
+
+    def redact_stream(self, chunks: Iterable[str], overlap: int = 512) -> Iterator[str]:
+        offset = 0
+        for segment, spans in self.stream(chunks, overlap):
+            yield self.redact(segment, spans, offset)
+            offset += len(segment)
+
+
+pii = PIIDetector(PII_RULES)
+
+
+def scrub_text(text: str, spans: Optional[Sequence[PIISpan]] = None) -> str:
+    """Redact PII; pass ``spans`` from an earlier ``pii.find(text)`` to skip rescanning."""
+    return pii.redact(text, pii.find(text) if spans is None else spans)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional
+
+# Leaf frames of a thread that is blocked waiting rather than running Python code
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures pool thread waiting for work
+}
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile is already running."""
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    short = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    # ";" separates frames in the collapsed format
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    out: List[str] = []
+    while frame is not None:
+        out.append(_label(frame))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+def _idle(frame: FrameType) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for the running process.
+
+    A background thread snapshots every thread's Python stack with
+    ``sys._current_frames`` at a fixed interval; nothing is installed in the
+    profiled code, so it can be pointed at a live server. Output is the
+    collapsed-stack format read by flamegraph.pl, speedscope and inferno:
+    one ``thread;outer;...;inner count`` line per distinct stack.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.last_samples = 0
+
+    def sample(self, seconds: float, interval_sec: float = 0.005, include_idle: bool = False) -> str:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+        try:
+            return self._sample(seconds, interval_sec, include_idle)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval_sec: float, include_idle: bool) -> str:
+        me = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (not include_idle and _idle(frame)):
+                    continue
+                thread = names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_")
+                stacks[";".join([thread, *_stack(frame)])] += 1
+            samples += 1
+            time.sleep(interval_sec)
+        self.runs += 1
+        self.last_samples = samples
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def stats(self) -> Dict[str, int | bool]:
+        return {"running": self._lock.locked(), "runs": self.runs, "last_samples": self.last_samples}
+
+
+profiler = SamplingProfiler()
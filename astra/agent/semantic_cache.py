@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional, Protocol
+
+import numpy as np
+
+from .config import config
+from .executor import WHITELIST
+from .intent_cache import normalize_transcript
+from .intent_parser import Intent
+from ..models.circuit_breaker import CircuitBreaker
+from ..models.ollama_client import ollama_pool
+from ..models.ollama_health import ollama_breaker
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Only intents whose entities come from closed sets (apps, services, actions). A
+# command line is free text: "run df -h /home" must never reuse "df -h".
+SEMANTIC_INTENTS = {"open_app", "manage_service"}
+
+
+def _whitelist_fingerprint() -> str:
+    # Stable across processes (unlike hash()), since it is persisted with the index
+    canonical = json.dumps({k: sorted(v) for k, v in WHITELIST.items()}, sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class Embedder(Protocol):
+    name: str
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return a float32 array of shape (len(texts), dim)."""
+
+
+class HashingEmbedder:
+    """Dependency-free embedder: hashed word and character-trigram counts.
+
+    It captures shared words and spelling slips, not synonyms; use the Ollama
+    embedder for real paraphrase matching.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD_RE.findall(text.lower()):
+                out[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+                padded = f" {word} "
+                for i in range(len(padded) - 2):
+                    out[row, zlib.crc32(padded[i : i + 3].encode()) % self.dim] += 0.5
+        return out
+
+
+class OllamaEmbedder:
+    """Embeddings from Ollama's /api/embed on the shared pooled client.
+
+    Embedding errors (a missing OLLAMA_EMBED_MODEL, a slow endpoint) go to the
+    embedder's own breaker, so they never open the chat breaker or use up its
+    half-open trial. Calls are skipped while the chat breaker finds Ollama down.
+    """
+
+    def __init__(self, cfg: Any):
+        self.cfg = cfg
+        self.name = f"ollama-{cfg.ollama_embed_model}"
+        self.breaker = CircuitBreaker(
+            "ollama-embed",
+            failure_threshold=cfg.ollama_breaker_failures,
+            reset_timeout_sec=cfg.ollama_breaker_reset_sec,
+            half_open_max_calls=cfg.ollama_breaker_half_open_calls,
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if ollama_breaker.state == "open" or not self.breaker.allow():
+            raise RuntimeError("Ollama circuit open")
+        try:
+            resp = ollama_pool.sync_client(self.cfg).post(
+                "/api/embed", json={"model": self.cfg.ollama_embed_model, "input": texts}
+            )
+            resp.raise_for_status()
+            vectors = np.asarray(resp.json()["embeddings"], dtype=np.float32)
+        except Exception as e:
+            self.breaker.record_failure(str(e))
+            raise
+        except BaseException:
+            self.breaker.record_neutral()
+            raise
+        self.breaker.record_success()
+        return vectors
+
+
+def _entity_words(intent: Intent) -> set[str]:
+    words: set[str] = set()
+    for value in intent.entities.values():
+        if isinstance(value, str):
+            words.update(_WORD_RE.findall(value.casefold()))
+    return words
+
+
+class SemanticIntentCache:
+    """Cosine-similarity index over embeddings of transcripts resolved by the LLM.
+
+    Vectors are L2-normalized rows of one preallocated matrix. A cached intent
+    is only reused if all of its entity words were said in the new transcript
+    (a neighbour in embedding space may name a different app or action, e.g.
+    "restart sshd" vs "stop sshd"), so rows are also indexed by entity word
+    and a lookup scores just the rows that can pass that check: one
+    matrix-vector product over the candidates plus a partial sort. Once ``max_entries`` is
+    reached the least recently used entry is overwritten. The index is saved to
+    ``path`` (.npz) every ``save_every`` additions and on close, and dropped
+    when WHITELIST or the embedder changes.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        path: Optional[Path],
+        max_entries: int,
+        threshold: float,
+        save_every: int = 32,
+    ):
+        self.embedder = embedder
+        self.path = path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._last_used = np.zeros(0, dtype=np.float64)
+        self._texts: List[str] = []
+        self._intents: List[Intent] = []
+        self._rows_by_word: dict[str, set[int]] = {}
+        self._fingerprint = _whitelist_fingerprint()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.errors = 0
+        self.evictions = 0
+        self.search_ms = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._intents)
+
+    def _reset(self, dim: int = 0) -> None:
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._last_used = np.zeros(0, dtype=np.float64)
+        self._texts = []
+        self._intents = []
+        self._rows_by_word = {}
+
+    def _index_row(self, slot: int) -> None:
+        for word in _entity_words(self._intents[slot]):
+            self._rows_by_word.setdefault(word, set()).add(slot)
+
+    def _unindex_row(self, slot: int) -> None:
+        for word in _entity_words(self._intents[slot]):
+            rows = self._rows_by_word.get(word)
+            if rows is not None:
+                rows.discard(slot)
+                if not rows:
+                    del self._rows_by_word[word]
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("embedder") != self.embedder.name or meta.get("whitelist") != self._fingerprint:
+                    return
+                vectors = data["vectors"].astype(np.float32)
+            self._texts = list(meta["texts"])
+            self._intents = [Intent(i["name"], i["entities"], i["confidence"]) for i in meta["intents"]]
+            self._vectors = vectors
+            self._last_used = np.zeros(len(self._intents), dtype=np.float64)
+            for slot in range(len(self._intents)):
+                self._index_row(slot)
+        except Exception as e:
+            logging.warning("Semantic intent cache at %s not loaded: %s", self.path, e)
+            self._reset()
+
+    def _check_whitelist(self) -> None:
+        fp = _whitelist_fingerprint()
+        if fp != self._fingerprint:
+            self._fingerprint = fp
+            self._reset(self._vectors.shape[1])
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            vec = self.embedder.embed([text])[0].astype(np.float32)
+        except Exception as e:
+            self.errors += 1
+            logging.debug("Embedding failed: %s", e)
+            return None
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+
+    def _search(self, query: np.ndarray, words: set[str], k: int) -> tuple[np.ndarray, np.ndarray]:
+        n = self.size
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if n == 0 or self._vectors.shape[1] != query.shape[0]:
+            return empty
+        # Superset of the rows whose entity words all occur in the transcript
+        rows: set[int] = set()
+        for word in words:
+            rows |= self._rows_by_word.get(word, set())
+        if not rows:
+            return empty
+        cand = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        if len(cand) * 2 >= n:
+            # Contiguous product beats gathering most of the matrix
+            scores = (self._vectors[:n] @ query)[cand]
+        else:
+            scores = self._vectors[cand] @ query
+        k = min(k, len(cand))
+        top = np.argpartition(scores, len(cand) - k)[len(cand) - k :]
+        top = top[np.argsort(scores[top])[::-1]]
+        return cand[top], scores[top]
+
+    def load(self) -> None:
+        """Read the saved index now instead of on the first lookup."""
+        with self._lock:
+            self._ensure_loaded()
+
+    def lookup(self, text: str) -> Optional[Intent]:
+        if self.max_entries <= 0:
+            return None
+        key = normalize_transcript(text)
+        words = set(_WORD_RE.findall(key.casefold()))
+        with self._lock:
+            self._ensure_loaded()
+            self._check_whitelist()
+            if not any(w in self._rows_by_word for w in words):
+                # No cached intent could pass the entity check: skip the embedding call
+                self.misses += 1
+                return None
+        query = self._embed(key)
+        if query is None:
+            return None
+        with self._lock:
+            start = time.perf_counter()
+            idx, scores = self._search(query, words, k=5)
+            self.search_ms = round((time.perf_counter() - start) * 1000, 3)
+            for i, score in zip(idx, scores):
+                if score < self.threshold:
+                    break
+                intent = self._intents[i]
+                if _entity_words(intent) <= words:
+                    self._last_used[i] = time.monotonic()
+                    self.hits += 1
+                    return Intent(intent.name, dict(intent.entities), intent.confidence)
+                self.rejected += 1
+            self.misses += 1
+            return None
+
+    def add(self, text: str, intent: Intent) -> None:
+        if self.max_entries <= 0 or intent.name not in SEMANTIC_INTENTS:
+            return
+        key = normalize_transcript(text)
+        vec = self._embed(key)
+        if vec is None:
+            return
+        stored = Intent(intent.name, dict(intent.entities), intent.confidence)
+        with self._lock:
+            self._ensure_loaded()
+            self._check_whitelist()
+            if self._vectors.shape[1] != vec.shape[0]:
+                # First entry, or the embedding model changed its dimension
+                self._reset(vec.shape[0])
+            n = self.size
+            if n < self.max_entries:
+                if n == len(self._vectors):
+                    grown = np.zeros((min(self.max_entries, max(64, 2 * n)), vec.shape[0]), dtype=np.float32)
+                    grown[:n] = self._vectors[:n]
+                    self._vectors = grown
+                    self._last_used = np.resize(self._last_used, len(grown))
+                slot = n
+                self._texts.append(key)
+                self._intents.append(stored)
+            else:
+                slot = int(np.argmin(self._last_used[:n]))
+                self._unindex_row(slot)
+                self._texts[slot] = key
+                self._intents[slot] = stored
+                self.evictions += 1
+            self._vectors[slot] = vec
+            self._last_used[slot] = time.monotonic()
+            self._index_row(slot)
+            self._unsaved += 1
+            due = self.path is not None and self._unsaved >= self.save_every
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            n = self.size
+            meta = {
+                "embedder": self.embedder.name,
+                "whitelist": self._fingerprint,
+                "texts": self._texts,
+                "intents": [
+                    {"name": i.name, "entities": i.entities, "confidence": i.confidence} for i in self._intents
+                ],
+            }
+            vectors = self._vectors[:n].copy()
+            self._unsaved = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp.npz")
+            np.savez(tmp, vectors=vectors, meta=np.array(json.dumps(meta)))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning("Semantic intent cache not saved: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset(self._vectors.shape[1])
+            self._unsaved += 1
+
+    def stats(self) -> dict[str, Any]:
+        breaker = getattr(self.embedder, "breaker", None)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "embedder": self.embedder.name,
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "rejected": self.rejected,
+                "embed_errors": self.errors,
+                "evictions": self.evictions,
+                "last_search_ms": self.search_ms,
+                "embed_breaker": breaker.stats() if breaker else None,
+            }
+
+
+def _make_embedder() -> Embedder:
+    if config.semantic_cache_embedder == "hashing":
+        return HashingEmbedder()
+    return OllamaEmbedder(config)
+
+
+semantic_cache = SemanticIntentCache(
+    _make_embedder(),
+    path=config.semantic_cache_path,
+    max_entries=config.semantic_cache_size,
+    threshold=config.semantic_cache_threshold,
+)
@@ -0,0 +1,160 @@
+"""Startup timing and the ``--startup-profile`` report.
+
+Only the standard library is imported here, so main can import it first and
+time everything after it. Subsystems that initialize on first use record that
+cost through ``timed``; it counts as startup when it happens before the app
+is ready (eager mode) and as first use afterwards.
+
+    python -m astra.agent.startup                      # serve, like uvicorn astra.agent.main:app
+    python -m astra.agent.startup --startup-profile    # report import and init time per subsystem, then exit
+    python -m astra.agent.startup --startup-profile --eager --first-use --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_T0 = time.perf_counter()
+
+# Import order matters: a module shared by two subsystems is charged to the first
+SUBSYSTEMS = [
+    ("framework", ["fastapi", "pydantic", "httpx", "numpy"]),
+    ("config", ["astra.agent.config"]),
+    ("audit", ["astra.agent.audit"]),
+    ("tts", ["astra.tts.tts_engine"]),
+    ("stt", ["astra.stt.whisper_service", "astra.stt.streaming", "astra.stt.worker_pool"]),
+    ("models", ["astra.agent.model_router", "astra.models.ollama_health"]),
+    ("intent", ["astra.agent.intent_parser", "astra.agent.intent_cache", "astra.agent.semantic_cache"]),
+    ("executor", ["astra.agent.executor", "astra.agent.command_policy", "astra.agent.exec_cache"]),
+    ("skills", ["astra.skills.app_index", "astra.skills.open_app", "astra.skills.run_command",
+                "astra.skills.manage_service"]),
+    ("app", ["astra.agent.main"]),
+]
+
+
+class StartupReport:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.steps: List[Dict[str, Any]] = []
+        self.mode = ""
+        self.ready_ms: Optional[float] = None
+
+    def record(self, name: str, ms: float, error: Optional[str] = None) -> None:
+        step = {"name": name, "phase": "startup" if self.ready_ms is None else "first_use", "ms": round(ms, 3)}
+        if error:
+            step["error"] = error
+        with self._lock:
+            self.steps.append(step)
+
+    def mark_ready(self, mode: str) -> None:
+        self.mode = mode
+        self.ready_ms = round((time.perf_counter() - _T0) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = list(self.steps)
+        return {"mode": self.mode, "time_to_ready_ms": self.ready_ms, "steps": steps}
+
+
+report = StartupReport()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        raise
+    finally:
+        report.record(name, (time.perf_counter() - start) * 1000, error)
+
+
+def _import_times() -> List[Dict[str, Any]]:
+    out = []
+    for subsystem, modules in SUBSYSTEMS:
+        start = time.perf_counter()
+        for name in modules:
+            importlib.import_module(name)
+        out.append({"subsystem": subsystem, "ms": round((time.perf_counter() - start) * 1000, 3)})
+    return out
+
+
+async def _profile(first_use: bool) -> Dict[str, Any]:
+    imports = _import_times()
+    from .main import app, warm_hooks
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        lifespan_ms = (time.perf_counter() - start) * 1000
+        if first_use and report.mode == "lazy":
+            # What lazy mode defers: the same hooks, now charged to first use
+            for _, hook in warm_hooks():
+                try:
+                    await asyncio.to_thread(hook)  # each hook records itself
+                except Exception:
+                    pass
+        out = report.to_dict()
+    out["imports"] = imports
+    out["import_ms"] = round(sum(i["ms"] for i in imports), 3)
+    out["lifespan_ms"] = round(lifespan_ms, 3)
+    return out
+
+
+def _print(profile: Dict[str, Any]) -> None:
+    print(f"mode: {profile['mode']}   time to ready: {profile['time_to_ready_ms']:.1f} ms "
+          f"(imports {profile['import_ms']:.1f} ms, lifespan {profile['lifespan_ms']:.1f} ms)")
+    print(f"\n{'import':<24} {'ms':>9}")
+    for item in profile["imports"]:
+        print(f"{item['subsystem']:<24} {item['ms']:>9.1f}")
+    for phase in ("startup", "first_use"):
+        steps = [s for s in profile["steps"] if s["phase"] == phase]
+        if not steps:
+            continue
+        print(f"\n{phase.replace('_', ' ') + ' init':<24} {'ms':>9}")
+        for s in steps:
+            print(f"{s['name']:<24} {s['ms']:>9.1f}" + (f"  {s['error']}" if "error" in s else ""))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Run Astra, or report where startup time goes")
+    ap.add_argument("--startup-profile", action="store_true", help="time imports and startup hooks, then exit")
+    ap.add_argument("--eager", action="store_true", help="warm every subsystem at startup (ASTRA_STARTUP=eager)")
+    ap.add_argument("--first-use", action="store_true", help="with lazy startup, also time each deferred init")
+    ap.add_argument("--json", action="store_true", help="print the profile as JSON")
+    args = ap.parse_args(argv)
+    if "astra.agent.config" in sys.modules:
+        raise SystemExit("astra.agent.startup must be run as its own process")
+    if args.eager:
+        os.environ["ASTRA_STARTUP"] = "eager"
+
+    if args.startup_profile:
+        profile = asyncio.run(_profile(args.first_use))
+        if args.json:
+            print(json.dumps(profile, indent=2))
+        else:
+            _print(profile)
+        return
+
+    import uvicorn
+
+    from .config import config
+
+    uvicorn.run("astra.agent.main:app", host=config.host, port=config.port)
+
+
+if __name__ == "__main__":
+    # Run the importable module, not this __main__ copy, so main.py records into the same report
+    from astra.agent.startup import main as _main
+
+    _main()
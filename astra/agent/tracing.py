@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_MAX_SPANS = 512
+_TRACE_ID = re.compile(r"[0-9A-Za-z-]{8,64}")
+
+
+class Trace:
+    """Stage spans recorded while one request is handled.
+
+    Spans are appended from the request's task, from threads started with
+    ``asyncio.to_thread`` (which copy the context) and from STT workers that
+    were handed the trace, so the list is only ever appended to.
+    """
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []  # name, start offset, duration (seconds)
+        self.dropped = 0
+
+    def add(self, name: str, start: float, seconds: float) -> None:
+        if len(self.spans) >= _MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append((name, start - self.start, seconds))
+
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        out: Dict[str, Tuple[float, int]] = {}
+        for name, _, seconds in list(self.spans):
+            total, count = out.get(name, (0.0, 0))
+            out[name] = (total + seconds, count + 1)
+        return out
+
+    def server_timing(self) -> str:
+        # One entry per stage; repeated stages (a plan's commands, batch items) are summed
+        parts = []
+        for name, (seconds, count) in self.totals().items():
+            entry = f"{name};dur={seconds * 1000:.3f}"
+            if count > 1:
+                entry += f';desc="x{count}"'
+            parts.append(entry)
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": [
+                {"name": name, "start_ms": round(offset * 1000, 3), "duration_ms": round(seconds * 1000, 3)}
+                for name, offset, seconds in list(self.spans)
+            ],
+            "dropped_spans": self.dropped,
+        }
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("astra_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def add_span(name: str, start: float, seconds: float, trace: Optional[Trace] = None) -> None:
+    """Record a span on ``trace`` (default: the current request's trace, if any)."""
+    trace = trace or _current.get()
+    if trace is not None:
+        trace.add(name, start, seconds)
+
+
+class TraceMiddleware:
+    """ASGI middleware giving each HTTP request a trace.
+
+    The ID comes from an ``X-Trace-Id`` request header when it looks like one,
+    otherwise it is generated. Responses carry ``X-Trace-Id`` and a
+    ``Server-Timing`` header with the spans finished before the response
+    started (for streaming responses, those before the first chunk).
+    ``on_complete(trace, scope)`` is called (and awaited, if it returns an
+    awaitable) once the request is done.
+    """
+
+    def __init__(self, app: Any, on_complete: Optional[Callable[[Trace, Dict[str, Any]], Optional[Awaitable[None]]]] = None):
+        self.app = app
+        self.on_complete = on_complete
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope.get("headers") or []).get(b"x-trace-id", b"").decode("latin-1")
+        trace = Trace(incoming if _TRACE_ID.fullmatch(incoming) else None)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode()))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if self.on_complete is not None:
+                done = self.on_complete(trace, scope)
+                if done is not None:
+                    await done
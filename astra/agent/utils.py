@@ -4,6 +4,9 @@ import re
 import json
 from typing import Any, Optional
 
+from .command_policy import command_policy
+from .privacy import pii
+
 
 def estimate_token_count(text: str) -> int:
     # very rough heuristic: ~0.75 tokens per word
@@ -12,13 +15,8 @@ def estimate_token_count(text: str) -> int:
 
 
 def is_privacy_sensitive(text: str) -> bool:
-    # basic PII patterns
-    patterns = [
-        r"\b\d{3}-\d{2}-\d{4}\b",  # SSN-like
-        r"\b\d{16}\b",  # credit-card-like
-        r"\bpassword\b",
-    ]
-    return any(re.search(p, text, re.I) for p in patterns)
+    # Same detector (and patterns) the redaction uses, see privacy.PII_RULES
+    return pii.contains(text)
 
 
 def intent_is_system_action(text: str) -> bool:
@@ -26,15 +24,8 @@ def intent_is_system_action(text: str) -> bool:
 
 
 def requires_confirmation(cmd: str) -> bool:
-    risky = [
-        r"\brm\s+-rf\b",
-        r"\bdd\b",
-        r"\bmkfs\b",
-        r"\bparted\b",
-        r"\bsudo\b",
-        r"\bchown\b\s+/.+",
-    ]
-    return any(re.search(p, cmd) for p in risky)
+    # Anything the command policy does not plainly allow (confirm or deny)
+    return not command_policy.evaluate(cmd).allowed
 
 
 def extract_json_object(text: str) -> Optional[dict[str, Any]]:
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised (or reported) instead of calling a backend whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around calls to one backend.
+
+    ``failure_threshold`` consecutive failures open the circuit; calls are then
+    refused until ``reset_timeout_sec`` has passed, after which up to
+    ``half_open_max_calls`` trial calls go through. A successful trial closes
+    the circuit, a failed one re-opens it for another timeout. A trial that
+    ends without an outcome (``record_neutral``) frees its slot; slots taken by
+    trials that never report are reclaimed after another timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout_sec: float = 15.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_sec = reset_timeout_sec
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_at = 0.0
+        self.last_error: Optional[str] = None
+        self.opens = 0
+        self.rejected = 0
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout_sec:
+            self._state = HALF_OPEN
+            self._trials = 0
+        elif (self._state == HALF_OPEN and self._trials >= self.half_open_max_calls
+              and now - self._trial_at >= self.reset_timeout_sec):
+            # The trials never reported back; don't stay half-open with no slot forever
+            self._trials = 0
+
+    def _open(self, error: Optional[str]) -> None:
+        if self._state != OPEN:
+            self.opens += 1
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.last_error = error
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed (0 unless open)."""
+        with self._lock:
+            self._refresh()
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout_sec - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; callers must report its outcome."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                self._trial_at = time.monotonic()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._failures += 1
+            self.last_error = error
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open(error)
+
+    def record_neutral(self) -> None:
+        """The call ended without saying anything about the backend (cancelled, or a 4xx for a bad request)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def trip(self, error: Optional[str] = None) -> None:
+        """Open immediately, e.g. when a health probe finds the backend down."""
+        with self._lock:
+            self._failures = max(self._failures, self.failure_threshold)
+            self._open(error)
+
+    def probe_ok(self) -> None:
+        """The backend answered a health probe: let a trial call through without waiting out the timeout."""
+        with self._lock:
+            if self._state in (OPEN, HALF_OPEN):
+                self._state = HALF_OPEN
+                self._trials = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            retry = 0.0
+            if self._state == OPEN:
+                retry = max(0.0, self.reset_timeout_sec - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "retry_after_sec": round(retry, 1),
+                "last_error": self.last_error,
+            }
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 
 
 @dataclass
@@ -14,3 +14,14 @@ class CloudAdapter:
             return {"text": "", "confidence": 0.0, "error": "CLOUD_DISABLED"}
         # Implement OpenAI/Anthropic call here with PII scrubbing before upload
         return {"text": "", "confidence": 0.6}
+
+    async def predict_async(self, prompt: str, context: Dict) -> Dict:
+        return self.predict(prompt, context)
+
+    async def stream(self, prompt: str, context: Dict) -> AsyncIterator[str]:
+        # No token streaming in the stub; emit the whole completion as one chunk
+        out = await self.predict_async(prompt, context)
+        if out.get("error"):
+            raise RuntimeError(out["error"])
+        if out.get("text"):
+            yield out["text"]
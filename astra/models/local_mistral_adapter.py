@@ -1,21 +1,50 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict
 
-import requests
+from .circuit_breaker import CircuitOpenError
+from .ollama_client import ollama_pool
+from .ollama_health import ollama_breaker
+
+
+def _extract_text(data: Any) -> str:
+    # Ollama chat returns {"message": {"content": "..."}} or {"messages": [...]} depending on version
+    if isinstance(data, dict):
+        if "message" in data and isinstance(data["message"], dict):
+            return data["message"].get("content", "") or ""
+        if "messages" in data and isinstance(data["messages"], list) and data["messages"]:
+            return data["messages"][-1].get("content", "") or ""
+    return ""
+
+
+class OllamaClientError(RuntimeError):
+    """Ollama refused the request itself (4xx: bad options, unknown model)."""
+
+
+def _http_error(status: int) -> Dict:
+    if status < 500:
+        # About this request, not Ollama's health
+        ollama_breaker.record_neutral()
+    else:
+        ollama_breaker.record_failure(f"HTTP {status}")
+    return {"text": "", "confidence": 0.0, "error": f"HTTP {status}"}
+
+
+def _circuit_open() -> Dict:
+    return {
+        "text": "",
+        "confidence": 0.0,
+        "error": f"OLLAMA_UNAVAILABLE: circuit open, retry in {ollama_breaker.retry_after():.0f}s",
+    }
 
 
 @dataclass
 class LocalAdapter:
     cfg: Any
 
-    def predict(self, prompt: str, context: Dict) -> Dict:
-        """Call Ollama /api/chat with a system prompt and user prompt.
-
-        Returns a dict with keys: text, confidence, error (optional).
-        """
-        url = f"{self.cfg.ollama_url}/api/chat"
+    def _build_body(self, prompt: str, context: Dict, stream: bool) -> Dict:
         # Allow overrides via context
         system_prompt = context.get("system_prompt_override", self.cfg.local_system_prompt)
         options_override = context.get("gen_options_override", {})
@@ -25,7 +54,7 @@ class LocalAdapter:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt},
             ],
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": self.cfg.ollama_temperature,
                 "top_p": self.cfg.ollama_top_p,
@@ -34,18 +63,92 @@ class LocalAdapter:
         }
         # Merge option overrides
         body["options"].update({k: v for k, v in options_override.items() if v is not None})
+        return body
+
+    def warm(self) -> None:
+        """Have Ollama load the model (a chat with no messages only loads it) on the pooled client."""
+        resp = ollama_pool.sync_client(self.cfg).post(
+            "/api/chat", json={"model": self.cfg.ollama_model, "messages": []}
+        )
+        resp.raise_for_status()
+
+    def predict(self, prompt: str, context: Dict) -> Dict:
+        """Call Ollama /api/chat with a system prompt and user prompt.
+
+        Returns a dict with keys: text, confidence, error (optional).
+        """
+        if not ollama_breaker.allow():
+            return _circuit_open()
+        body = self._build_body(prompt, context, stream=False)
+        try:
+            resp = ollama_pool.sync_client(self.cfg).post("/api/chat", json=body)
+            if not resp.is_success:
+                return _http_error(resp.status_code)
+            out = {"text": _extract_text(resp.json()), "confidence": 0.65}
+        except Exception as e:
+            ollama_breaker.record_failure(str(e))
+            return {"text": "", "confidence": 0.0, "error": str(e)}
+        except BaseException:
+            # Cancelled: no outcome, but a half-open trial slot must be given back
+            ollama_breaker.record_neutral()
+            raise
+        ollama_breaker.record_success()
+        return out
+
+    async def predict_async(self, prompt: str, context: Dict) -> Dict:
+        """Async variant of predict() on the shared pooled client."""
+        if not ollama_breaker.allow():
+            return _circuit_open()
+        body = self._build_body(prompt, context, stream=False)
         try:
-            resp = requests.post(url, json=body, timeout=self.cfg.http_timeout_sec)
-            if not resp.ok:
-                return {"text": "", "confidence": 0.0, "error": f"HTTP {resp.status_code}"}
-            data = resp.json()
-            # Ollama chat returns {"message": {"content": "..."}} or {"messages": [...]} depending on version
-            text = ""
-            if isinstance(data, dict):
-                if "message" in data and isinstance(data["message"], dict):
-                    text = data["message"].get("content", "")
-                elif "messages" in data and isinstance(data["messages"], list) and data["messages"]:
-                    text = data["messages"][-1].get("content", "")
-            return {"text": text or "", "confidence": 0.65}
+            resp = await ollama_pool.async_client(self.cfg).post("/api/chat", json=body)
+            if not resp.is_success:
+                return _http_error(resp.status_code)
+            out = {"text": _extract_text(resp.json()), "confidence": 0.65}
         except Exception as e:
+            ollama_breaker.record_failure(str(e))
             return {"text": "", "confidence": 0.0, "error": str(e)}
+        except BaseException:
+            # Cancelled: no outcome, but a half-open trial slot must be given back
+            ollama_breaker.record_neutral()
+            raise
+        ollama_breaker.record_success()
+        return out
+
+    async def stream(self, prompt: str, context: Dict) -> AsyncIterator[str]:
+        """Yield content tokens as Ollama produces them.
+
+        Raises RuntimeError on HTTP errors (OllamaClientError for a 4xx,
+        CircuitOpenError while the breaker is open); transport errors propagate as-is.
+        """
+        if not ollama_breaker.allow():
+            raise CircuitOpenError(_circuit_open()["error"])
+        body = self._build_body(prompt, context, stream=True)
+        client = ollama_pool.async_client(self.cfg)
+        try:
+            async with client.stream("POST", "/api/chat", json=body) as resp:
+                if not resp.is_success:
+                    error = OllamaClientError if resp.status_code < 500 else RuntimeError
+                    raise error(f"HTTP {resp.status_code}")
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(str(chunk["error"]))
+                    token = _extract_text(chunk)
+                    if token:
+                        yield token
+                    if chunk.get("done"):
+                        break
+        except OllamaClientError:
+            ollama_breaker.record_neutral()
+            raise
+        except Exception as e:
+            ollama_breaker.record_failure(str(e))
+            raise
+        except BaseException:
+            # Consumer went away mid-stream, or the task was cancelled; says nothing about Ollama's health
+            ollama_breaker.record_neutral()
+            raise
+        ollama_breaker.record_success()
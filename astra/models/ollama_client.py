@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+
+import httpx
+
+
+class OllamaClientPool:
+    """Process-wide pooled HTTP clients for the Ollama API.
+
+    One sync client serves the threadpool handlers and one async client serves
+    coroutines on the running event loop, so keep-alive connections are reused
+    across requests instead of paying a TCP handshake per completion.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sync: httpx.Client | None = None
+        self._async: httpx.AsyncClient | None = None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    def _options(cfg: Any) -> dict[str, Any]:
+        limits = httpx.Limits(
+            max_connections=cfg.ollama_max_connections,
+            max_keepalive_connections=cfg.ollama_max_connections,
+        )
+        # Read timeout applies per chunk, so long streams are fine as long as tokens keep flowing
+        timeout = httpx.Timeout(cfg.http_timeout_sec, connect=min(cfg.http_timeout_sec, 5))
+        return {"base_url": cfg.ollama_url, "limits": limits, "timeout": timeout}
+
+    def sync_client(self, cfg: Any) -> httpx.Client:
+        with self._lock:
+            if self._sync is None:
+                self._sync = httpx.Client(**self._options(cfg))
+            return self._sync
+
+    def async_client(self, cfg: Any) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # An AsyncClient is bound to the loop it first ran on (e.g. a new loop per test run)
+            if self._async is None or self._async_loop is not loop:
+                self._async = httpx.AsyncClient(**self._options(cfg))
+                self._async_loop = loop
+            return self._async
+
+    async def aclose(self) -> None:
+        with self._lock:
+            sync_client, self._sync = self._sync, None
+            async_client, self._async = self._async, None
+            self._async_loop = None
+        if sync_client is not None:
+            sync_client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+
+ollama_pool = OllamaClientPool()
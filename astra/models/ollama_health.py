@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from ..agent.config import config
+from .circuit_breaker import CircuitBreaker
+from .ollama_client import ollama_pool
+
+
+class OllamaProber:
+    """Background task that polls Ollama's /api/tags and drives the breaker.
+
+    A failed probe opens the circuit at once, so requests fail fast without
+    first timing out against a dead endpoint; a successful probe moves an open
+    circuit to half-open so recovery does not wait for the full reset timeout.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, interval_sec: float, timeout_sec: float):
+        self.breaker = breaker
+        self.interval_sec = interval_sec
+        self.timeout_sec = timeout_sec
+        self._task: Optional[asyncio.Task] = None
+        self.last_ok: Optional[bool] = None
+        self.last_probe_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.probes = 0
+
+    async def probe(self) -> bool:
+        start = time.perf_counter()
+        try:
+            resp = await ollama_pool.async_client(config).get("/api/tags", timeout=self.timeout_sec)
+            ok = resp.is_success
+            error = None if ok else f"HTTP {resp.status_code}"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        self.probes += 1
+        self.last_probe_ms = round((time.perf_counter() - start) * 1000, 1)
+        if ok:
+            self.breaker.probe_ok()
+        else:
+            if self.last_ok is not False:
+                logging.warning("Ollama health probe failed: %s", error)
+            self.breaker.trip(f"probe: {error}")
+        self.last_ok, self.last_error = ok, error
+        return ok
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval_sec)
+
+    def start(self) -> None:
+        if self.interval_sec > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_sec": self.interval_sec,
+            "probes": self.probes,
+            "last_ok": self.last_ok,
+            "last_probe_ms": self.last_probe_ms,
+            "last_error": self.last_error,
+        }
+
+
+ollama_breaker = CircuitBreaker(
+    "ollama",
+    failure_threshold=config.ollama_breaker_failures,
+    reset_timeout_sec=config.ollama_breaker_reset_sec,
+    half_open_max_calls=config.ollama_breaker_half_open_calls,
+)
+ollama_prober = OllamaProber(
+    ollama_breaker,
+    interval_sec=config.ollama_probe_interval_sec,
+    timeout_sec=config.ollama_probe_timeout_sec,
+)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection, Dict, FrozenSet, List, Optional, Tuple
+
+from ..agent.config import config
+from ..agent.executor import WHITELIST
+
+# Spoken names that differ from the binary name
+ALIASES = {
+    "terminal": "gnome-terminal",
+    "files": "nautilus",
+    "file manager": "nautilus",
+    "vs code": "code",
+    "visual studio code": "code",
+}
+
+# Desktop entry IDs per app, most specific first
+DESKTOP_IDS = {
+    "firefox": ("org.mozilla.firefox", "firefox"),
+    "gnome-terminal": ("org.gnome.Terminal",),
+    "nautilus": ("org.gnome.Nautilus",),
+    "code": ("code",),  # VS Code's desktop ID is usually 'code'
+}
+
+# Flatpak application IDs per app (common on Fedora Silverblue/Workstation)
+FLATPAK_IDS = {
+    "firefox": ("org.mozilla.firefox",),
+    "gnome-terminal": ("org.gnome.Terminal",),
+    "nautilus": ("org.gnome.Nautilus",),
+    "code": ("com.visualstudio.code",),
+}
+
+
+def squash(name: str) -> str:
+    """Lowercase alphanumerics only, so "Fire fox" and "gnome terminal" hit their index keys."""
+    return "".join(c for c in name.lower() if c.isalnum())
+
+
+def levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over edit distance for near-miss lookups."""
+
+    def __init__(self, words: List[str] = ()):
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        for w in words:
+            self.add(w)
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            d = levenshtein(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_dist: int) -> List[Tuple[int, str]]:
+        """All stored words within ``max_dist`` edits, nearest first."""
+        found: List[Tuple[int, str]] = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node_word, children = stack.pop()
+            d = levenshtein(word, node_word)
+            if d <= max_dist:
+                found.append((d, node_word))
+            # Triangle inequality: only subtrees at distance d±max_dist can hold matches
+            for cd, child in children.items():
+                if d - max_dist <= cd <= d + max_dist:
+                    stack.append(child)
+        return sorted(found)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    binaries: FrozenSet[str]
+    desktop_ids: FrozenSet[str]
+    flatpak_ids: FrozenSet[str]
+    plans: Dict[str, List[str]]
+    signature: Tuple[Tuple[str, float], ...]
+    build_ms: float
+
+
+def _path_dirs() -> List[Path]:
+    return [Path(p) for p in os.environ.get("PATH", "").split(os.pathsep) if p]
+
+
+def _application_dirs() -> List[Path]:
+    data_home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    roots = [data_home, *data_dirs.split(":"), "/var/lib/flatpak/exports/share",
+             str(Path.home() / ".local/share/flatpak/exports/share")]
+    seen: List[Path] = []
+    for root in roots:
+        p = Path(root) / "applications"
+        if root and p not in seen:
+            seen.append(p)
+    return seen
+
+
+def _signature(dirs: List[Path]) -> Tuple[Tuple[str, float], ...]:
+    # A directory's mtime changes whenever an entry is added or removed in it
+    sig = []
+    for d in dirs:
+        try:
+            sig.append((str(d), d.stat().st_mtime))
+        except OSError:
+            sig.append((str(d), -1.0))
+    return tuple(sig)
+
+
+def _scan_binaries(dirs: List[Path]) -> FrozenSet[str]:
+    names = set()
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return frozenset(names)
+
+
+def _scan_desktop_ids(dirs: List[Path]) -> FrozenSet[str]:
+    ids = set()
+    for d in dirs:
+        try:
+            ids.update(p.name[: -len(".desktop")] for p in d.glob("*.desktop"))
+        except OSError:
+            continue
+    return frozenset(ids)
+
+
+def _list_flatpaks() -> FrozenSet[str]:
+    try:
+        out = subprocess.run(
+            ["flatpak", "list", "--app", "--columns=application"],
+            capture_output=True, text=True, timeout=10, check=False,
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.warning("flatpak list failed: %s", e)
+        return frozenset()
+    return frozenset(line.strip() for line in out.splitlines() if line.strip())
+
+
+class AppIndex:
+    """Launch plans for whitelisted apps, built once from PATH, XDG desktop entries and Flatpak.
+
+    Resolution is a dict lookup on the squashed spoken name; names that miss
+    fall back to a BK-tree search over whitelisted names and aliases only, so
+    STT slips like "nautilis" resolve while nothing outside the whitelist can.
+    After ``ttl_sec`` the next lookup starts a background re-stat of the
+    scanned directories (rebuilding only if one changed) and is answered from
+    the current index meanwhile; only the very first build is waited for. ``apps`` is read on every
+    lookup, so an app removed from the whitelist stops resolving at once.
+    """
+
+    def __init__(self, apps: Callable[[], Collection[str]], aliases: Dict[str, str], ttl_sec: float,
+                 max_distance: int):
+        self.ttl_sec = ttl_sec
+        self.max_distance = max_distance
+        self._apps = apps
+        self._aliases = dict(aliases)
+        self._names_for: Tuple[FrozenSet[str], Dict[str, str], BKTree] = (frozenset(), {}, BKTree())
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked = 0.0
+        # Separate from _lock, which a running rebuild holds
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self.builds = 0
+        self.fuzzy_hits = 0
+
+    def _whitelisted(self) -> Tuple[Dict[str, str], BKTree]:
+        """Squashed name -> app and the fuzzy tree, rebuilt when the whitelist changes."""
+        apps = frozenset(self._apps())
+        allowed, names, tree = self._names_for
+        if apps != allowed:
+            names = {squash(a): a for a in apps}
+            names.update({squash(k): v for k, v in self._aliases.items() if v in apps})
+            tree = BKTree(sorted(names))
+            self._names_for = (apps, names, tree)
+        return names, tree
+
+    def _build(self, signature: Tuple[Tuple[str, float], ...]) -> _Snapshot:
+        start = time.perf_counter()
+        binaries = _scan_binaries(_path_dirs())
+        desktop_ids = _scan_desktop_ids(_application_dirs())
+        flatpak_ids = _list_flatpaks() if "flatpak" in binaries else frozenset()
+        plans: Dict[str, List[str]] = {}
+        for app in set(self._whitelisted()[0].values()):
+            plans[app] = self._plan_for(app, binaries, desktop_ids, flatpak_ids)
+        self.builds += 1
+        return _Snapshot(
+            binaries, desktop_ids, flatpak_ids, plans, signature,
+            build_ms=round((time.perf_counter() - start) * 1000, 1),
+        )
+
+    @staticmethod
+    def _plan_for(app: str, binaries: FrozenSet[str], desktop_ids: FrozenSet[str], flatpak_ids: FrozenSet[str]) -> List[str]:
+        # Prefer launching via the binary if available; it's more portable across desktops
+        if app in binaries:
+            return [app]
+        if "gtk-launch" in binaries:
+            for desktop_id in DESKTOP_IDS.get(app, ()):
+                if desktop_id in desktop_ids:
+                    return [f"gtk-launch {desktop_id}"]
+        if "flatpak" in binaries:
+            for flatpak_id in FLATPAK_IDS.get(app, ()):
+                if flatpak_id in flatpak_ids:
+                    return [f"flatpak run {flatpak_id}"]
+        # Last resort: attempt direct name anyway
+        return [app]
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            signature = _signature(_path_dirs() + _application_dirs())
+            if force or self._snapshot is None or signature != self._snapshot.signature:
+                self._snapshot = self._build(signature)
+            self._checked = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logging.warning("App index refresh failed: %s", e)
+        finally:
+            self._refreshing = False
+
+    def _current(self) -> _Snapshot:
+        snap = self._snapshot
+        if snap is None:
+            self.refresh()
+            return self._snapshot
+        if time.monotonic() - self._checked > self.ttl_sec:
+            with self._refresh_lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh_in_background, name="astra-app-index", daemon=True).start()
+        return snap
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Whitelisted app for a spoken name, or None when nothing is close enough."""
+        names, tree = self._whitelisted()
+        key = squash(name)
+        app = names.get(key)
+        if app is not None or not key:
+            return app
+        # Short names get no slack: one edit turns "mode" into "code"
+        max_dist = min(self.max_distance, len(key) // 5)
+        if max_dist <= 0:
+            return None
+        matches = tree.search(key, max_dist)
+        if not matches:
+            return None
+        best = matches[0][0]
+        apps = {names[w] for d, w in matches if d == best}
+        if len(apps) != 1:
+            # Equally close to two different apps: refuse to guess
+            return None
+        self.fuzzy_hits += 1
+        return apps.pop()
+
+    def plan(self, app: str) -> List[str]:
+        snap = self._current()
+        plan = snap.plans.get(app)
+        if plan is None:
+            # Whitelisted after the last build
+            plan = self._plan_for(app, snap.binaries, snap.desktop_ids, snap.flatpak_ids)
+        return list(plan)
+
+    def stats(self) -> Dict[str, object]:
+        snap = self._snapshot
+        return {
+            "built": snap is not None,
+            "builds": self.builds,
+            "build_ms": snap.build_ms if snap else None,
+            "binaries": len(snap.binaries) if snap else 0,
+            "desktop_entries": len(snap.desktop_ids) if snap else 0,
+            "flatpaks": len(snap.flatpak_ids) if snap else 0,
+            "fuzzy_hits": self.fuzzy_hits,
+        }
+
+
+app_index = AppIndex(
+    lambda: WHITELIST["apps"],
+    ALIASES,
+    ttl_sec=config.app_index_ttl_sec,
+    max_distance=config.app_fuzzy_max_distance,
+)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import shutil
 from typing import List
 
-from ..agent.executor import WHITELIST
+from .app_index import app_index
 
 
 def _sanitize_app(name: str) -> str:
@@ -16,39 +15,9 @@ def _sanitize_app(name: str) -> str:
 
 
 def build_open_app_plan(app_name: str) -> List[str]:
-    app = _sanitize_app(app_name)
-    # normalize
-    mapping = {
-        "terminal": "gnome-terminal",
-        "files": "nautilus",
-    }
-    app = mapping.get(app, app)
-    if app not in WHITELIST["apps"]:
-        raise ValueError(f"App '{app}' not allowed (whitelist).")
-
-    # Prefer launching via the binary if available; it's more portable across desktops
-    if shutil.which(app):
-        return [app]
-
-    # Fallback to gtk-launch with known desktop IDs
-    desktop_ids = {
-        "firefox": "org.mozilla.firefox",
-        "gnome-terminal": "org.gnome.Terminal",
-        "nautilus": "org.gnome.Nautilus",
-        "code": "code",  # VS Code's desktop ID is usually 'code'
-    }
-    if shutil.which("gtk-launch") and app in desktop_ids:
-        return [f"gtk-launch {desktop_ids[app]}"]
-
-    # Flatpak fallback if binary not present (common on Fedora Silverblue/Workstation)
-    flatpak_ids = {
-        "firefox": "org.mozilla.firefox",
-        "gnome-terminal": "org.gnome.Terminal",
-        "nautilus": "org.gnome.Nautilus",
-        "code": "com.visualstudio.code",  # sometimes 'com.visualstudio.code'
-    }
-    if shutil.which("flatpak") and app in flatpak_ids:
-        return [f"flatpak run {flatpak_ids[app]}"]
-
-    # Last resort: attempt direct name anyway
-    return [app]
+    # Exact (or spacing/punctuation-insensitive) names are a dict hit; near misses
+    # from STT are matched against whitelisted names only
+    app = app_index.resolve(_sanitize_app(app_name))
+    if app is None:
+        raise ValueError(f"App '{_sanitize_app(app_name)}' not allowed (whitelist).")
+    return app_index.plan(app)
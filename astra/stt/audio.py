@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# faster-whisper decodes 16 kHz mono float32 in [-1, 1]
+SAMPLE_RATE = 16000
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass
+class DecodedAudio:
+    samples: Optional[np.ndarray]  # None when the input needs the ffmpeg path
+    path: str  # "wav_pcm16" | "raw_pcm16" | "ffmpeg"
+    decode_ms: float
+
+
+def pcm16_to_float32(data: bytes | memoryview, channels: int = 1) -> np.ndarray:
+    """Convert little-endian int16 PCM to mono float32 samples.
+
+    np.frombuffer views the input without copying; the dtype conversion is the only copy.
+    """
+    pcm = np.frombuffer(data, dtype="<i2")
+    if channels > 1:
+        pcm = pcm[: len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1)
+    out = pcm.astype(np.float32)
+    out *= 1.0 / 32768.0
+    return out
+
+
+def resample_linear(samples: np.ndarray, rate: int) -> np.ndarray:
+    if rate == SAMPLE_RATE or not len(samples):
+        return samples
+    n_out = int(round(len(samples) * SAMPLE_RATE / rate))
+    positions = np.arange(n_out, dtype=np.float64) * (rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def parse_pcm_wav(data: bytes) -> Optional[tuple[memoryview, int, int]]:
+    """Locate the sample data of a 16-bit PCM WAV without copying it.
+
+    Returns (payload view, sample rate, channels), or None for anything else
+    (compressed or float WAV, other containers, malformed headers).
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    view = memoryview(data)
+    pos = 12
+    fmt: Optional[tuple[int, int, int]] = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt " and size >= 16:
+            if body + 16 > len(data):
+                return None  # truncated header
+            audio_format, channels, rate = struct.unpack_from("<HHI", data, body)
+            (bits,) = struct.unpack_from("<H", data, body + 14)
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                if body + 26 > len(data):
+                    return None
+                # First two bytes of the SubFormat GUID carry the real format code
+                (audio_format,) = struct.unpack_from("<H", data, body + 24)
+            fmt = (audio_format, channels, rate) if bits == 16 else (0, channels, rate)
+        elif chunk_id == b"data":
+            if fmt is None or fmt[0] != _WAVE_FORMAT_PCM or fmt[1] < 1 or fmt[2] == 0:
+                return None
+            # Streaming writers may leave a placeholder size; clamp to what we have,
+            # in whole frames, since a truncated upload can end mid-sample
+            end = min(body + size, len(data))
+            end -= (end - body) % (2 * fmt[1])
+            return view[body:end], fmt[2], fmt[1]
+        pos = body + size + (size & 1)
+    return None
+
+
+def decode_audio(data: bytes, sample_rate: int | None = None) -> DecodedAudio:
+    """Decode PCM input in memory; anything else is left for the ffmpeg path.
+
+    16-bit PCM WAV is recognized from its header. Headerless input is treated as
+    raw mono int16 PCM only when the caller declares ``sample_rate``.
+    """
+    start = time.perf_counter()
+    wav = parse_pcm_wav(data)
+    if wav is not None:
+        payload, rate, channels = wav
+        samples = resample_linear(pcm16_to_float32(payload, channels), rate)
+        return DecodedAudio(samples, "wav_pcm16", (time.perf_counter() - start) * 1000)
+    if sample_rate and data[:4] != b"RIFF":
+        payload = memoryview(data)[: len(data) - len(data) % 2]
+        samples = resample_linear(pcm16_to_float32(payload), sample_rate)
+        return DecodedAudio(samples, "raw_pcm16", (time.perf_counter() - start) * 1000)
+    return DecodedAudio(None, "ffmpeg", 0.0)
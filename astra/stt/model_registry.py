@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MiB (Linux); 0.0 when unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    model: Any
+    device: str
+    compute_type: str
+    load_ms: float
+    rss_mb: float  # process RSS growth measured across the load
+    warm_ms: Optional[float] = None
+    uses: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ModelRegistry:
+    """Loaded Whisper models by size name, with warm-up and LRU eviction.
+
+    ``loader(name)`` returns ``(model, device, compute_type)``. Models that have
+    been idle longer than ``idle_evict_sec``, or the least recently used ones
+    once the summed load footprint exceeds ``memory_budget_mb``, are dropped.
+    The default model is never evicted.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], tuple[Any, str, str]],
+        warmup: Callable[[Any], None],
+        default: str,
+        allowed: Iterable[str],
+        memory_budget_mb: float = 0.0,
+        idle_evict_sec: float = 0.0,
+    ):
+        self._loader = loader
+        self._warmup = warmup
+        self.default = default
+        self.allowed = {m for m in allowed if m} | {default}
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_evict_sec = idle_evict_sec
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._models: Dict[str, LoadedModel] = {}
+        self.evictions = 0
+
+    def resolve(self, name: Optional[str]) -> str:
+        name = (name or self.default).strip()
+        if name not in self.allowed:
+            raise ValueError(f"Whisper model '{name}' not allowed; choose from {sorted(self.allowed)}")
+        return name
+
+    def get(self, name: Optional[str] = None, warm: bool = False) -> LoadedModel:
+        name = self.resolve(name)
+        self._evict_idle()
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                load_lock = self._load_locks.setdefault(name, threading.Lock())
+        if entry is None:
+            # Per-name lock: concurrent requests for one size load it once, other sizes stay available
+            with load_lock:
+                with self._lock:
+                    entry = self._models.get(name)
+                if entry is None:
+                    entry = self._load(name, warm)
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+        return entry
+
+    def _load(self, name: str, warm: bool) -> LoadedModel:
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        model, device, compute_type = self._loader(name)
+        entry = LoadedModel(
+            name=name,
+            model=model,
+            device=device,
+            compute_type=compute_type,
+            load_ms=round((time.perf_counter() - start) * 1000, 1),
+            rss_mb=round(max(0.0, _rss_mb() - rss_before), 1),
+        )
+        if warm:
+            start = time.perf_counter()
+            self._warmup(model)
+            entry.warm_ms = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self._models[name] = entry
+            self._enforce_budget(keep=name)
+        logging.info("Loaded Whisper model '%s' on %s in %.0f ms", name, device, entry.load_ms)
+        return entry
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self.memory_budget_mb <= 0:
+            return
+        while sum(m.rss_mb for m in self._models.values()) > self.memory_budget_mb:
+            victims = [m for m in self._models.values() if m.name not in {keep, self.default}]
+            if not victims:
+                return
+            victim = min(victims, key=lambda m: m.last_used)
+            del self._models[victim.name]
+            self.evictions += 1
+
+    def _evict_idle(self) -> None:
+        if self.idle_evict_sec <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_evict_sec
+        with self._lock:
+            for name in [n for n, m in self._models.items() if n != self.default and m.last_used < cutoff]:
+                del self._models[name]
+                self.evictions += 1
+
+    def preload(self, names: Iterable[str]) -> None:
+        """Load and warm each model; failures are logged so startup still completes."""
+        for name in names:
+            try:
+                self.get(name, warm=True)
+            except Exception as e:
+                logging.warning("Whisper preload of '%s' failed: %s", name, e)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                m.name: {
+                    "device": m.device,
+                    "compute_type": m.compute_type,
+                    "load_ms": m.load_ms,
+                    "warm_ms": m.warm_ms,
+                    "rss_mb": m.rss_mb,
+                    "uses": m.uses,
+                    "idle_sec": round(now - m.last_used, 1),
+                }
+                for m in self._models.values()
+            }
+        return {
+            "default": self.default,
+            "allowed": sorted(self.allowed),
+            "loaded": models,
+            "resident_mb": round(sum(m["rss_mb"] for m in models.values()), 1),
+            "memory_budget_mb": self.memory_budget_mb or None,
+            "evictions": self.evictions,
+        }
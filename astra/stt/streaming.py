@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from ..agent.config import config
+from .audio import SAMPLE_RATE, pcm16_to_float32
+from .whisper_service import transcribe_array
+
+# Whisper attends to 30 s at most; force a commit well before the buffer reaches that
+_MAX_WINDOW_SEC = 25.0
+# Audio kept after trimming a window with no recognizable speech
+_KEEP_SEC = 1.0
+
+
+class StreamingTranscriber:
+    """Incremental transcription of raw 16 kHz mono int16 PCM.
+
+    Audio is accumulated in an uncommitted buffer that is re-decoded every
+    ``step_sec`` of new audio, producing ``partial`` events. Once the buffer
+    grows past ``window_sec`` every segment except the last (which may still
+    be growing) is committed as ``final`` and dropped from the buffer, so each
+    decode covers a bounded sliding window. ``finish()`` decodes the rest with
+    the full beam size.
+    """
+
+    def __init__(
+        self,
+        language: str | None = None,
+        model: str | None = None,
+        transcribe: Callable[..., Dict[str, Any]] = transcribe_array,
+        step_sec: float | None = None,
+        window_sec: float | None = None,
+    ):
+        self.language = language
+        self.model = model
+        self._transcribe = transcribe
+        self.step_samples = int((step_sec or config.whisper_stream_step_sec) * SAMPLE_RATE)
+        self.window_sec = min(window_sec or config.whisper_stream_window_sec, _MAX_WINDOW_SEC)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._chunks: List[np.ndarray] = []  # frames not yet merged into _buffer
+        self._offset = 0.0  # absolute stream time of _buffer[0], in seconds
+        self._odd_byte = b""
+        self._since_decode = 0
+        self._finals: List[str] = []
+
+    def append(self, data: bytes) -> bool:
+        """Add a PCM frame; returns True when enough new audio arrived for a decode."""
+        if self._odd_byte:
+            data = self._odd_byte + data
+            self._odd_byte = b""
+        if len(data) % 2:
+            # A frame can end mid-sample; carry the byte over to the next one
+            data, self._odd_byte = data[:-1], data[-1:]
+        samples = pcm16_to_float32(data)
+        self._chunks.append(samples)
+        self._since_decode += len(samples)
+        return self._since_decode >= self.step_samples
+
+    def _final_event(self, seg: Dict[str, Any]) -> Dict[str, Any]:
+        text = seg["text"].strip()
+        self._finals.append(text)
+        return {
+            "type": "final",
+            "text": text,
+            "start": round(self._offset + seg["start"], 3),
+            "end": round(self._offset + seg["end"], 3),
+        }
+
+    def _consolidate(self) -> None:
+        # Merge pending frames once per decode instead of copying the buffer per frame
+        if self._chunks:
+            self._buffer = np.concatenate([self._buffer, *self._chunks])
+            self._chunks = []
+
+    def _trim(self, seconds: float) -> None:
+        cut = min(len(self._buffer), int(seconds * SAMPLE_RATE))
+        self._buffer = self._buffer[cut:].copy()
+        self._offset += cut / SAMPLE_RATE
+
+    def decode(self) -> List[Dict[str, Any]]:
+        """Re-decode the uncommitted window and return partial/final events."""
+        self._since_decode = 0
+        self._consolidate()
+        if not len(self._buffer):
+            return []
+        # Greedy search keeps partials cheap; finish() uses the configured beam
+        result = self._transcribe(
+            self._buffer, language=self.language, beam_size=1, model=self.model
+        )
+        if self.language is None and result.get("language"):
+            # Keep later windows from flipping languages mid-utterance
+            self.language = result["language"]
+        segs = result.get("segments") or []
+        buf_sec = len(self._buffer) / SAMPLE_RATE
+        events: List[Dict[str, Any]] = []
+        base = self._offset  # segment times are relative to the buffer before trimming
+        if buf_sec >= self.window_sec:
+            if len(segs) > 1:
+                committed, segs = segs[:-1], segs[-1:]
+            elif buf_sec >= _MAX_WINDOW_SEC:
+                committed, segs = segs, []
+            else:
+                committed = []
+            if committed:
+                events.extend(self._final_event(seg) for seg in committed)
+                self._trim(committed[-1]["end"])
+            elif not segs:
+                self._trim(buf_sec - _KEEP_SEC)
+        text = " ".join(seg["text"].strip() for seg in segs).strip()
+        if text:
+            events.append({
+                "type": "partial",
+                "text": text,
+                "start": round(base + segs[0]["start"], 3),
+                "end": round(base + segs[-1]["end"], 3),
+            })
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Decode whatever is left, commit it and close the utterance."""
+        events: List[Dict[str, Any]] = []
+        self._consolidate()
+        if len(self._buffer):
+            result = self._transcribe(self._buffer, language=self.language, model=self.model)
+            self.language = self.language or result.get("language")
+            events.extend(self._final_event(seg) for seg in result.get("segments") or [])
+            self._trim(len(self._buffer) / SAMPLE_RATE)
+        events.append({
+            "type": "done",
+            "text": " ".join(t for t in self._finals if t),
+            "language": self.language,
+            "duration": round(self._offset, 3),
+        })
+        return events
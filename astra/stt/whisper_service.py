@@ -1,96 +1,159 @@
 from __future__ import annotations
 
-import io
 import tempfile
-from functools import lru_cache
+import time
 import logging
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
 from ..agent.config import config
+from ..agent.startup import timed
+from .audio import SAMPLE_RATE, decode_audio
+from .model_registry import ModelRegistry
 
 
-try:
-    from faster_whisper import WhisperModel  # type: ignore
-except Exception:  # pragma: no cover
-    WhisperModel = None  # type: ignore
+@lru_cache(maxsize=None)
+def _faster_whisper() -> Any:
+    """faster-whisper (with CTranslate2 and PyAV), imported on first use; None if it is not installed."""
+    try:
+        with timed("stt.import"):
+            import faster_whisper  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return faster_whisper
 
 
-_backend_used: str | None = None
-_compute_type_used: str | None = None
+def _require_faster_whisper() -> Any:
+    fw = _faster_whisper()
+    if fw is None:
+        raise RuntimeError("faster-whisper is not installed. Please install it in your environment.")
+    return fw
 
 
-@lru_cache(maxsize=1)
-def _load_model() -> Any:
-    global _backend_used, _compute_type_used
-    if WhisperModel is None:
-        raise RuntimeError("faster-whisper is not installed. Please install it in your environment.")
+def _create_model(name: str) -> Tuple[Any, str, str]:
+    WhisperModel = _require_faster_whisper().WhisperModel
     preferred_device = config.whisper_device if config.whisper_device in {"cpu", "cuda"} else "auto"
     try:
         model = WhisperModel(
-            model_size_or_path=config.whisper_model,
+            model_size_or_path=name,
             device=preferred_device,
             compute_type=config.whisper_compute_type,
+            cpu_threads=config.whisper_cpu_threads,
+            num_workers=config.whisper_workers,
         )
-        _backend_used = preferred_device
-        _compute_type_used = config.whisper_compute_type
-        return model
+        return model, preferred_device, config.whisper_compute_type
     except Exception as e:
         # Transparent CPU fallback if CUDA/cuDNN is not available
         logging.warning("Whisper init failed on device '%s' (%s). Falling back to CPU.", preferred_device, e)
         model = WhisperModel(
-            model_size_or_path=config.whisper_model,
+            model_size_or_path=name,
             device="cpu",
             compute_type="int8",
+            cpu_threads=config.whisper_cpu_threads,
+            num_workers=config.whisper_workers,
         )
-        _backend_used = "cpu"
-        _compute_type_used = "int8"
-        return model
+        return model, "cpu", "int8"
+
+
+def _warm_model(model: Any) -> None:
+    # One second of silence without VAD still runs the encoder and a decoder step
+    segments, _ = model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), vad_filter=False, beam_size=1)
+    list(segments)
+
+
+registry = ModelRegistry(
+    loader=_create_model,
+    warmup=_warm_model,
+    default=config.whisper_model,
+    allowed=config.whisper_allowed_models.split(","),
+    memory_budget_mb=config.whisper_memory_budget_mb,
+    idle_evict_sec=config.whisper_idle_evict_sec,
+)
+
+
+def _load_model(name: str | None = None) -> Any:
+    return registry.get(name).model
 
 
 def stt_health() -> Dict[str, Any]:
     try:
-        _ = _load_model()
+        default = registry.get()
         return {
             "ready": True,
             "model": config.whisper_model,
             "device_config": config.whisper_device,
-            "device_used": _backend_used,
-            "compute_type_used": _compute_type_used,
+            "device_used": default.device,
+            "compute_type_used": default.compute_type,
+            "models": registry.stats(),
         }
     except Exception as e:
-        return {"ready": False, "error": str(e)}
+        return {"ready": False, "error": str(e), "models": registry.stats()}
+
+
+def _collect(segments: Any, info: Any) -> Dict[str, Any]:
+    segs: List[Dict[str, Any]] = []
+    text_parts: List[str] = []
+    for seg in segments:
+        segs.append({
+            "start": seg.start,
+            "end": seg.end,
+            "text": seg.text,
+        })
+        text_parts.append(seg.text)
+    return {
+        "language": info.language,
+        "duration": getattr(info, "duration", None),
+        "text": " ".join(text_parts).strip(),
+        "segments": segs,
+    }
 
 
-def transcribe_bytes(data: bytes, language: str | None = None) -> Dict[str, Any]:
+def transcribe_bytes(
+    data: bytes,
+    language: str | None = None,
+    sample_rate: int | None = None,
+    model: str | None = None,
+) -> Dict[str, Any]:
     """Transcribe an audio file given as bytes using faster-whisper.
 
-    Requirements: system ffmpeg for decoding many formats.
+    16-bit PCM WAV (and raw PCM with a declared ``sample_rate``) is decoded in
+    memory. Other formats go through a temp file and ffmpeg.
+    The result reports ``decode_path`` and ``decode_ms``.
     """
-    model = _load_model()
-    # Write to a temp file to let ffmpeg handle formats
-    with tempfile.NamedTemporaryFile(suffix=".audio", delete=True) as tmp:
-        tmp.write(data)
-        tmp.flush()
-        segments, info = model.transcribe(
-            tmp.name,
-            vad_filter=config.whisper_vad,
-            language=language or config.whisper_language,
-            beam_size=config.whisper_beam_size,
-            initial_prompt=config.whisper_initial_prompt,
-        )
-        segs: List[Dict[str, Any]] = []
-        text_parts: List[str] = []
-        for seg in segments:
-            segs.append({
-                "start": seg.start,
-                "end": seg.end,
-                "text": seg.text,
-            })
-            text_parts.append(seg.text)
-        return {
-            "language": info.language,
-            "duration": getattr(info, "duration", None),
-            "text": " ".join(text_parts).strip(),
-            "segments": segs,
-        }
+    decoded = decode_audio(data, sample_rate)
+    if decoded.samples is None:
+        ffmpeg_decode = _require_faster_whisper().decode_audio
+        start = time.perf_counter()
+        # Write to a temp file to let ffmpeg handle formats
+        with tempfile.NamedTemporaryFile(suffix=".audio", delete=True) as tmp:
+            tmp.write(data)
+            tmp.flush()
+            samples = ffmpeg_decode(tmp.name, sampling_rate=SAMPLE_RATE)
+        decoded.samples = samples
+        decoded.decode_ms = (time.perf_counter() - start) * 1000
+    result = transcribe_array(decoded.samples, language=language, model=model)
+    result["decode_path"] = decoded.path
+    result["decode_ms"] = round(decoded.decode_ms, 3)
+    return result
+
 
+def transcribe_array(
+    audio: np.ndarray,
+    language: str | None = None,
+    beam_size: int | None = None,
+    model: str | None = None,
+) -> Dict[str, Any]:
+    """Transcribe 16 kHz mono float32 samples already in memory with the named model."""
+    whisper = _load_model(model)
+    segments, info = whisper.transcribe(
+        audio,
+        vad_filter=config.whisper_vad,
+        language=language or config.whisper_language,
+        beam_size=beam_size or config.whisper_beam_size,
+        initial_prompt=config.whisper_initial_prompt,
+    )
+    result = _collect(segments, info)
+    result["model"] = registry.resolve(model)
+    return result
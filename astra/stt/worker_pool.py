@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from ..agent.config import config
+from ..agent.metrics import observe_stage
+from ..agent.tracing import Trace, current_trace
+
+
+class STTOverloaded(RuntimeError):
+    """Raised when the STT job queue is full; callers should shed the request."""
+
+
+@dataclass
+class JobTiming:
+    queue_wait_ms: float
+    compute_ms: float
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    future: Future
+    enqueued: float
+    trace: Trace | None = None  # the submitting request's trace; worker threads do not inherit it
+
+
+class STTWorkerPool:
+    """Fixed set of transcription threads fed from a bounded queue.
+
+    The threads share one WhisperModel loaded with ``num_workers`` equal to the
+    pool size, so CTranslate2 can run that many decodes in parallel on separate
+    cores. Submitting to a full queue raises STTOverloaded right away instead of
+    letting latency grow without bound.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self._queue: queue.Queue[_Job | None] = queue.Queue(maxsize=max(1, queue_size))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"astra-stt-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            with self._lock:
+                self.busy += 1
+            try:
+                value = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                done = time.perf_counter()
+                observe_stage("stt_queue_wait", started - job.enqueued, job.enqueued, job.trace)
+                observe_stage("stt_decode", done - started, started, job.trace)
+                timing = JobTiming(
+                    queue_wait_ms=round((started - job.enqueued) * 1000, 3),
+                    compute_ms=round((done - started) * 1000, 3),
+                )
+                job.future.set_result((value, timing))
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self.completed += 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``fn``; the future resolves to ``(result, JobTiming)``."""
+        if not self._threads:
+            self._start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait(_Job(fn, args, kwargs, future, time.perf_counter(), current_trace()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise STTOverloaded(f"STT queue full ({self._queue.maxsize} jobs waiting)")
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> tuple[Any, JobTiming]:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+stt_pool = STTWorkerPool(config.whisper_workers, config.whisper_queue_size)
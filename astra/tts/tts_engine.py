@@ -1,21 +1,41 @@
 from __future__ import annotations
 
 import threading
+from typing import Any
 
-try:
-    import pyttsx3
-except Exception:  # pragma: no cover
-    pyttsx3 = None
+from ..agent.startup import timed
 
 
 class TTS:
+    """Speech output; the pyttsx3 engine is created on first use (or by ``warm``)."""
+
     def __init__(self) -> None:
-        self.engine = None
-        if pyttsx3:
-            try:
-                self.engine = pyttsx3.init()
-            except Exception:
-                self.engine = None
+        self._engine: Any = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _init_engine(self) -> Any:
+        try:
+            import pyttsx3
+        except Exception:  # pragma: no cover
+            return None
+        try:
+            return pyttsx3.init()
+        except Exception:
+            return None
+
+    @property
+    def engine(self) -> Any:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    with timed("tts.init"):
+                        self._engine = self._init_engine()
+                    self._ready = True
+        return self._engine
+
+    def warm(self) -> None:
+        self.engine
 
     def say(self, text: str) -> None:
         if not self.engine:
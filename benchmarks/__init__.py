@@ -0,0 +1 @@
+"""Offline microbenchmarks for Astra hot paths (run with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,73 @@
+"""Latency of resolving a spoken app name to a launch plan.
+
+Compares the prebuilt AppIndex with the previous resolver, which called
+shutil.which (a stat per PATH directory) up to three times per request and
+rebuilt its ID tables on every call. Names the previous resolver rejects are
+STT near misses that only the index resolves.
+
+    python -m benchmarks.bench_app_index
+"""
+from __future__ import annotations
+
+import shutil
+import time
+from typing import List
+
+from astra.agent.executor import WHITELIST
+from astra.skills.app_index import app_index
+from astra.skills.open_app import _sanitize_app, build_open_app_plan
+
+from .common import per_call_us
+
+NAMES = ["firefox", "terminal", "code", "nautilus", "Fire fox", "nautilis", "gnome terminal"]
+
+
+def _legacy_plan(app_name: str) -> List[str]:
+    app = _sanitize_app(app_name)
+    mapping = {"terminal": "gnome-terminal", "files": "nautilus"}
+    app = mapping.get(app, app)
+    if app not in WHITELIST["apps"]:
+        raise ValueError(f"App '{app}' not allowed (whitelist).")
+    if shutil.which(app):
+        return [app]
+    desktop_ids = {
+        "firefox": "org.mozilla.firefox",
+        "gnome-terminal": "org.gnome.Terminal",
+        "nautilus": "org.gnome.Nautilus",
+        "code": "code",
+    }
+    if shutil.which("gtk-launch") and app in desktop_ids:
+        return [f"gtk-launch {desktop_ids[app]}"]
+    flatpak_ids = {
+        "firefox": "org.mozilla.firefox",
+        "gnome-terminal": "org.gnome.Terminal",
+        "nautilus": "org.gnome.Nautilus",
+        "code": "com.visualstudio.code",
+    }
+    if shutil.which("flatpak") and app in flatpak_ids:
+        return [f"flatpak run {flatpak_ids[app]}"]
+    return [app]
+
+
+def _try(fn, name):
+    try:
+        return fn(name)
+    except ValueError:
+        return None
+
+
+def main() -> None:
+    start = time.perf_counter()
+    app_index.refresh(force=True)
+    print(f"index build: {(time.perf_counter() - start) * 1000:.1f} ms {app_index.stats()}")
+    print(f"{'name':<16} {'legacy plan':<22} {'index plan':<22} {'legacy us':>10} {'index us':>9}")
+    for name in NAMES:
+        legacy = _try(_legacy_plan, name)
+        indexed = _try(build_open_app_plan, name)
+        legacy_us = per_call_us(_try, _legacy_plan, name, number=500)
+        index_us = per_call_us(_try, build_open_app_plan, name, number=500)
+        print(f"{name:<16} {str(legacy):<22} {str(indexed):<22} {legacy_us:>10.2f} {index_us:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
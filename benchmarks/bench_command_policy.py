@@ -0,0 +1,139 @@
+"""Throughput of the executor's pre-flight policy check on large plans.
+
+The previous check ran ``"sudo" in raw``, six uncompiled regexes over the raw
+string (requires_confirmation) and a separate shlex.split for every command.
+The policy engine tokenizes once and only tries the rules for that binary;
+"cold" clears the decision memo before every plan (all commands in a plan
+are distinct); "memoized" replays a plan whose decisions are already cached.
+
+    python -m benchmarks.bench_command_policy
+"""
+from __future__ import annotations
+
+import random
+import re
+import shlex
+from typing import List
+
+from astra.agent.command_policy import ALLOW, CONFIRM, CommandPolicy, DEFAULT_POLICY
+
+from .common import per_call_us
+
+_OLD_RISKY = [
+    r"\brm\s+-rf\b",
+    r"\bdd\b",
+    r"\bmkfs\b",
+    r"\bparted\b",
+    r"\bsudo\b",
+    r"\bchown\b\s+/.+",
+]
+
+COMMANDS = [
+    "ls -la /home/user/projects",
+    "cat /etc/os-release",
+    "df -h",
+    "free -m",
+    "uname -a",
+    "du -sh ~/Downloads",
+    "echo pseudocode",
+    "head -n 20 notes.txt",
+    "tail -f /var/log/messages",
+    "cp report.pdf ~/Documents/report-final.pdf",
+    "mv 'old name.txt' 'new name.txt'",
+    "systemctl status sshd",
+    "flatpak run org.mozilla.firefox",
+    "rm -rf build",
+    "sudo dnf upgrade",
+    "dd if=/dev/zero of=/tmp/blob bs=1M count=4",
+]
+
+# Escalation behind a command runner or inside an argument: the old substring check denied all of these
+RUNNER_ESCALATIONS = [
+    "find . -exec sudo rm -rf / ;",
+    "find . -execdir sudo chmod 777 {} +",
+    "find . -ok sh -c 'sudo id' ;",
+    "chroot /mnt sudo ls",
+    "sg wheel 'sudo ls'",
+    "unshare -r sudo ls",
+    "systemd-run --user sudo ls",
+    "script -c 'sudo ls' /dev/null",
+    "watch 'sudo ls'",
+    "flock /tmp/lock sudo ls",
+    # Interpreters, runners that are not wrappers, and option values
+    "python3 -c \"import os; os.system('sudo reboot')\"",
+    'perl -e "system q(sudo id)"',
+    'awk "BEGIN{system(\\"sudo id\\")}"',
+    "strace sudo id",
+    "gdb -ex run --args sudo id",
+    "ssh host sudo id",
+    'git -c core.pager="sudo id" log',
+    "flatpak run --command=sudo org.x",
+    'tar --to-command="sudo id" -xf a.tar',
+]
+
+
+def _old_preflight(raw: str) -> str:
+    if "sudo" in raw:
+        return "deny"
+    if any(re.search(p, raw) for p in _OLD_RISKY):
+        return "confirm"
+    try:
+        parts = shlex.split(raw)
+    except ValueError:
+        return "deny"
+    return "allow" if parts else "deny"
+
+
+def _plan(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    # Every command distinct, so a cold run gets no memo hits within the plan
+    return [f"{rng.choice(COMMANDS)} ./file-{i}" for i in range(n)]
+
+
+def check_equivalence(policy: CommandPolicy) -> None:
+    expected = {
+        "echo pseudocode": ALLOW,  # blocked before: "sudo" is a substring of "pseudocode"
+        "rm -rf build": CONFIRM,
+        "sudo dnf upgrade": "deny",
+        "dd if=/dev/zero of=/tmp/blob bs=1M count=4": CONFIRM,
+    }
+    for raw in COMMANDS:
+        old = _old_preflight(raw)
+        new = policy.evaluate(raw)
+        assert new.action == expected.get(raw, old), (raw, old, new)
+        assert list(new.argv) == shlex.split(raw), raw
+    for raw in RUNNER_ESCALATIONS:
+        assert _old_preflight(raw) == "deny" and policy.evaluate(raw).action == "deny", raw
+    print(f"equivalence: {len(COMMANDS) + len(RUNNER_ESCALATIONS)} commands decide as before "
+          "(except 'echo pseudocode', now allowed)")
+
+
+def main() -> None:
+    policy = CommandPolicy(DEFAULT_POLICY)
+    check_equivalence(policy)
+
+    def old(plan: List[str]) -> None:
+        for raw in plan:
+            _old_preflight(raw)
+
+    def cold(plan: List[str]) -> None:
+        policy.evaluate.cache_clear()
+        for raw in plan:
+            policy.evaluate(raw)
+
+    def memoized(plan: List[str]) -> None:
+        for raw in plan:
+            policy.evaluate(raw)
+
+    print(f"{'commands':>9} {'previous us':>12} {'cold us':>9} {'memoized us':>12} {'cold cmd/s':>11}")
+    for n in (10, 100, 1000, 10000):
+        plan = _plan(n)
+        number = max(3, 20000 // n)
+        old_us = per_call_us(old, plan, number=number)
+        cold_us = per_call_us(cold, plan, number=number)
+        memo_us = per_call_us(memoized, plan, number=number)
+        print(f"{n:>9} {old_us:>12.1f} {cold_us:>9.1f} {memo_us:>12.1f} {n / cold_us * 1e6:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""End-to-end latency and throughput of the FastAPI app against a fake Ollama.
+
+Each scenario sends ``--requests`` requests with ``--concurrency`` in flight,
+in process through httpx's ASGI transport, with the app's lifespan running.
+Per scenario it reports p50/p95/p99 latency and requests per second. Model
+latency and token rate come from the fake server (see fake_ollama.py), so
+results isolate Astra's own overhead for a given model speed.
+
+Scenarios:
+    transcript_rules   transcripts the rule parser resolves (dry run)
+    transcript_llm     distinct transcripts that need the LLM intent fallback
+    llm_complete       distinct prompts through /v1/llm/complete
+    execute            one real read-only command per request
+    stt_transcribe     a 3 s synthetic WAV (only with --stt-model)
+
+    python -m benchmarks.bench_e2e [--requests 200] [--concurrency 16] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .audio import synthetic_wav
+from .common import Result, isolate_environment, percentiles, write_results
+from .fake_ollama import FakeOllama
+
+RULE_TRANSCRIPTS = ["open firefox", "check disk usage", "restart bluetooth", "show memory usage",
+                    "systemctl status sshd", "open code"]
+
+# Request number -> keyword arguments for httpx.AsyncClient.request
+Scenario = Callable[[int], Dict[str, Any]]
+
+
+def _scenarios(stt_model: Optional[str]) -> Dict[str, tuple[str, str, Scenario]]:
+    scenarios: Dict[str, tuple[str, str, Scenario]] = {
+        "transcript_rules": ("POST", "/v1/ingress/transcript",
+                             lambda i: {"json": {"transcript": RULE_TRANSCRIPTS[i % len(RULE_TRANSCRIPTS)]}}),
+        "transcript_llm": ("POST", "/v1/ingress/transcript",
+                           lambda i: {"json": {"transcript": f"get me the browser going, attempt {i}"}}),
+        "llm_complete": ("POST", "/v1/llm/complete",
+                         lambda i: {"json": {"prompt": f"Write one line about request {i}."}}),
+        "execute": ("POST", "/v1/execute",
+                    lambda i: {"json": {"commands": [f"echo bench-{i}"], "dry_run": False}}),
+    }
+    if stt_model:
+        clip = synthetic_wav(3.0)
+        scenarios["stt_transcribe"] = ("POST", "/v1/stt/transcribe", lambda i: {
+            "files": {"file": ("clip.wav", clip, "audio/wav")}, "data": {"model": stt_model}})
+    return scenarios
+
+
+async def _drive(client: Any, method: str, path: str, make: Scenario, requests: int,
+                 concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            r = await client.request(method, path, **make(i))
+            latencies.append(time.perf_counter() - start)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"latencies": latencies, "elapsed": elapsed, "statuses": statuses}
+
+
+async def _run(requests: int, concurrency: int, stt_model: Optional[str],
+               only: Optional[List[str]]) -> List[Result]:
+    import httpx
+
+    from astra.agent.main import app
+
+    results: List[Result] = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://astra", timeout=60) as client:
+            for name, (method, path, make) in _scenarios(stt_model).items():
+                if only and name not in only:
+                    continue
+                # TTS falls back to printing when no speech engine is available
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await _drive(client, method, path, make, concurrency, concurrency)  # warm up
+                    run = await _drive(client, method, path, make, requests, concurrency)
+                ok = run["statuses"].get(200, 0)
+                pct = percentiles([s * 1000 for s in run["latencies"]])
+                print(f"{name:<18} {pct['p50']:>9.2f} {pct['p95']:>9.2f} {pct['p99']:>9.2f} "
+                      f"{requests / run['elapsed']:>9.1f}  {ok}/{requests} ok")
+                if ok < requests:
+                    print(f"{'':<18} statuses: {run['statuses']}")
+                results += [Result(f"e2e.{name}.{p}_ms", v, "ms") for p, v in pct.items()]
+                results.append(Result(f"e2e.{name}.rps", requests / run["elapsed"], "req/s", better="higher"))
+                results.append(Result(f"e2e.{name}.error_rate", 1 - ok / requests, "ratio"))
+    return results
+
+
+def run(requests: int = 200, concurrency: int = 16, stt_model: Optional[str] = None,
+        only: Optional[List[str]] = None) -> List[Result]:
+    print(f"{'scenario':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    return asyncio.run(_run(requests, concurrency, stt_model, only))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Astra end-to-end benchmark against a fake Ollama")
+    ap.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="fake model time to first token")
+    ap.add_argument("--tokens-per-sec", type=float, default=200.0, help="fake model generation speed")
+    ap.add_argument("--stt-model", help="include STT with this Whisper model (must be available)")
+    ap.add_argument("--only", nargs="*", help="run just these scenarios")
+    ap.add_argument("--json", help="write results here")
+    args = ap.parse_args()
+    with FakeOllama(args.latency_ms, args.tokens_per_sec) as fake:
+        isolate_environment(fake.url)
+        results = run(args.requests, args.concurrency, args.stt_model, args.only)
+    if args.json:
+        write_results(args.json, results, suite="e2e", requests=args.requests, concurrency=args.concurrency,
+                      fake_latency_ms=args.latency_ms, fake_tokens_per_sec=args.tokens_per_sec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Microbenchmarks for the functions every request goes through.
+
+Covers intent parsing, routing (which includes the PII scan), prompt
+scrubbing, the executor (dry-run plans and a real subprocess), audit writes
+and the STT path (in-memory WAV decode; transcription too when a Whisper
+model can be loaded). State goes to a temp dir, so nothing touches the
+repo's data directory or the network.
+
+    python -m benchmarks.bench_hot_paths [--json out.json] [--stt-model tiny]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import List, Optional
+
+from .audio import synthetic_wav
+from .common import Result, isolate_environment, per_call_us, write_results
+
+UTTERANCES = [
+    "open firefox",
+    "could you run df -h for me",
+    "systemctl status sshd",
+    "restart bluetooth",
+    "what is the weather like in the mountains this weekend",
+]
+PLAN = ["ls -la", "uname -a", "df -h", "free -m", "cat /etc/os-release", "systemctl status sshd",
+        "flatpak run org.mozilla.firefox", "rm -rf build"]
+
+
+def _prompt(kib: int) -> str:
+    para = ("Summarize the release notes for the team and mail them to ops@example.com. "
+            "The staging password: hunter2 must not leak, nor card 4111 1111 1111 1111. ")
+    return (para * (kib * 1024 // len(para) + 1))[: kib * 1024]
+
+
+def micro(scale: float = 1.0) -> List[Result]:
+    from astra.agent.intent_parser import parse_intent
+    from astra.agent.model_router import route_request
+    from astra.agent.privacy import scrub_text
+
+    n = lambda base: max(5, int(base * scale))  # noqa: E731
+    out = [
+        Result("micro.parse_intent", per_call_us(lambda: [parse_intent(u) for u in UTTERANCES], number=n(2000))
+               / len(UTTERANCES), "us"),
+        Result("micro.route_request", per_call_us(route_request, "open firefox and check my mail", {},
+                                                  number=n(2000)), "us"),
+    ]
+    for kib in (1, 16):
+        prompt = _prompt(kib)
+        out.append(Result(f"micro.scrub_text.{kib}kib", per_call_us(scrub_text, prompt, number=n(200)), "us"))
+    return out
+
+
+def executor(scale: float = 1.0) -> List[Result]:
+    from astra.agent.executor import execute_safe_async
+
+    loop = asyncio.new_event_loop()
+    counter = itertools.count()
+
+    def dry_run() -> None:
+        loop.run_until_complete(execute_safe_async(PLAN, dry_run=True))
+
+    def spawn() -> None:
+        # A distinct argument per call, so the read-only result cache never answers
+        loop.run_until_complete(execute_safe_async([f"echo bench-{next(counter)}"], dry_run=False))
+
+    try:
+        return [
+            Result("exec.dry_run_plan", per_call_us(dry_run, number=max(5, int(500 * scale))), "us"),
+            Result("exec.spawn_echo", per_call_us(spawn, number=max(3, int(50 * scale)), repeat=3), "us"),
+        ]
+    finally:
+        loop.close()
+
+
+def audit_log(scale: float = 1.0) -> List[Result]:
+    from astra.agent.audit import SecureAuditLog
+    from astra.agent.config import config
+
+    log = SecureAuditLog(config.audit_dir / "bench", config.audit_key_file)
+    record = {"event": "route", "model": "local", "reason": "default local policy", "text": "open firefox",
+              "plan": ["flatpak run org.mozilla.firefox"], "dry_run": True}
+    count = max(100, int(5000 * scale))
+    log.write(record)
+    log.flush()
+    start = time.perf_counter()
+    for _ in range(count):
+        log.write(record)
+    enqueued = time.perf_counter() - start
+    log.flush()
+    committed = time.perf_counter() - start
+    log.close()
+    return [
+        Result("audit.write_enqueue", enqueued / count * 1e6, "us"),
+        Result("audit.committed_records_per_sec", count / committed, "records/s", better="higher"),
+    ]
+
+
+def stt(scale: float = 1.0, model: Optional[str] = None) -> List[Result]:
+    from astra.stt.audio import decode_audio
+
+    mono = synthetic_wav(10.0)
+    stereo = synthetic_wav(10.0, sample_rate=44100, channels=2)
+    number = max(5, int(100 * scale))
+    out = [
+        Result("stt.decode_wav_16k_mono_10s", per_call_us(decode_audio, mono, number=number) / 1000, "ms"),
+        Result("stt.decode_wav_44k_stereo_10s", per_call_us(decode_audio, stereo, number=number) / 1000, "ms"),
+    ]
+    if not model:
+        return out
+    from astra.stt.whisper_service import transcribe_bytes
+
+    try:
+        transcribe_bytes(synthetic_wav(1.0), model=model)  # load and warm
+    except Exception as e:
+        print(f"stt: skipping transcription, cannot load Whisper model {model!r}: {e}")
+        return out
+    clip = synthetic_wav(5.0, seed=1)
+    ms = per_call_us(transcribe_bytes, clip, None, None, model, number=3, repeat=2) / 1000
+    out.append(Result(f"stt.transcribe_5s.{model}", ms, "ms"))
+    out.append(Result(f"stt.realtime_factor.{model}", ms / 5000, "x"))
+    return out
+
+
+def run(scale: float = 1.0, stt_model: Optional[str] = None) -> List[Result]:
+    return micro(scale) + executor(scale) + audit_log(scale) + stt(scale, stt_model)
+
+
+def print_results(results: List[Result]) -> None:
+    width = max(len(r.name) for r in results)
+    for r in results:
+        print(f"{r.name:<{width}} {r.value:>12.3f} {r.unit}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Astra hot-path microbenchmarks")
+    ap.add_argument("--json", help="write results here")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    ap.add_argument("--stt-model", help="also time transcription with this Whisper model (must be available)")
+    args = ap.parse_args()
+    isolate_environment()
+    results = run(args.scale, args.stt_model)
+    print_results(results)
+    if args.json:
+        write_results(args.json, results, suite="hot_paths", scale=args.scale)
+
+
+if __name__ == "__main__":
+    main()
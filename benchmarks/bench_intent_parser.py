@@ -0,0 +1,62 @@
+"""Per-utterance cost of intent matching as the number of registered intents grows.
+
+Compares the trigger-indexed IntentMatcher with the previous approach of
+searching every pattern in turn. Synthetic intents use distinct trigger verbs,
+so the real utterances below never match them; a flat column for the matcher
+means adding intents does not slow down existing ones.
+
+    python -m benchmarks.bench_intent_parser
+"""
+from __future__ import annotations
+
+import re
+
+from astra.agent.intent_parser import INTENT_RULES, IntentMatcher, IntentRule
+
+from .common import per_call_us
+
+UTTERANCES = [
+    "open firefox",
+    "could you run df -h for me",
+    "systemctl status sshd",
+    "what is the weather like in the mountains this weekend",
+]
+
+
+def _synthetic_rules(n: int) -> list[IntentRule]:
+    return [
+        IntentRule(f"synthetic_{i}", re.compile(rf"\bverb{i}\s+(?P<arg>\w+)", re.I), (f"verb{i}",))
+        for i in range(n)
+    ]
+
+
+def _linear_match(rules: list[IntentRule], text: str):
+    s = text.strip()
+    for rule in rules:
+        m = rule.pattern.search(s)
+        if m:
+            return rule, m
+    return None
+
+
+def main() -> None:
+    print(f"{'intents':>8} {'utterance':<56} {'linear us':>10} {'matcher us':>11}")
+    for extra in (0, 30, 300, 3000):
+        # New intents registered ahead of the built-ins are the linear scan's worst case
+        rules = _synthetic_rules(extra) + INTENT_RULES
+        matcher = IntentMatcher(rules)
+        for text in UTTERANCES:
+            expected = _linear_match(rules, text)
+            got = matcher.match(text)
+            assert (expected and expected[0].name, expected and expected[1].groupdict()) == (
+                got and got[0].name,
+                got and got[1].groupdict(),
+            ), text
+            number = 200 if extra >= 300 else 2000
+            linear = per_call_us(_linear_match, rules, text, number=number)
+            fast = per_call_us(matcher.match, text, number=number)
+            print(f"{len(rules):>8} {text[:56]:<56} {linear:>10.2f} {fast:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
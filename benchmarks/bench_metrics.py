@@ -0,0 +1,94 @@
+"""Cost of the metrics instrumentation on the request path.
+
+Each stage timer is two perf_counter calls, one bisect and a locked add; the
+HTTP middleware adds one timer plus the in-flight gauge per request. Inside a
+request the same timer also appends a span to the request's trace. The
+script times these against the work they wrap (rule-based intent parsing of
+a short transcript) and the cost of rendering /metrics with every stage and
+route populated. Before timing it checks that histogram counts and sums add
+up and that bucket counts are cumulative.
+
+    python -m benchmarks.bench_metrics
+"""
+from __future__ import annotations
+
+import re
+
+from astra.agent.intent_parser import parse_intent
+from astra.agent.metrics import Counter, Histogram, Registry, _Timer, stage
+from astra.agent.tracing import Trace, _current
+
+from .common import per_call_us
+
+STAGES = ["stt_decode", "stt_queue_wait", "intent_parse", "semantic_lookup", "llm_intent",
+          "plan_build", "exec_command", "tts", "audit_encrypt", "audit_write"]
+ROUTES = ["/health", "/v1/ingress/transcript", "/v1/ingress/transcripts:batch", "/v1/llm/complete",
+          "/v1/stt/transcribe", "/v1/policy/check", "/metrics", "unmatched"]
+
+
+def check_consistency() -> None:
+    registry = Registry()
+    hist: Histogram = registry.register(Histogram("h", "test", ["stage"]))
+    values = [0.00005, 0.0003, 0.0003, 0.02, 0.7, 12.0, 99.0]
+    for v in values:
+        hist.labels("x").observe(v)
+    text = registry.render()
+    buckets = [int(n) for n in re.findall(r'h_bucket\{stage="x",le="[^"]+"\} (\d+)', text)]
+    assert buckets == sorted(buckets) and buckets[-1] == len(values), buckets
+    assert f'h_count{{stage="x"}} {len(values)}' in text
+    total = float(re.search(r'h_sum\{stage="x"\} (\S+)', text).group(1))
+    assert abs(total - sum(values)) < 1e-9, total
+    print(f"consistency: {len(values)} observations, cumulative buckets, sum matches")
+
+
+def main() -> None:
+    check_consistency()
+    registry = Registry()
+    stage_seconds: Histogram = registry.register(Histogram("stage_seconds", "per stage", ["stage"]))
+    http_seconds: Histogram = registry.register(Histogram("http_seconds", "per route", ["method", "route", "status"]))
+    counter: Counter = registry.register(Counter("events", "counter", ["source"]))
+
+    def bare() -> None:
+        parse_intent("open firefox")
+
+    def timed() -> None:
+        with _Timer(stage_seconds.labels("intent_parse")):
+            parse_intent("open firefox")
+
+    def empty() -> None:
+        with _Timer(stage_seconds.labels("tts")):
+            pass
+
+    def traced() -> None:
+        with stage("tts"):
+            pass
+
+    def in_trace() -> None:
+        token = _current.set(Trace())
+        for _ in range(100):
+            traced()
+        _current.reset(token)
+
+    for s in STAGES:
+        stage_seconds.labels(s).observe(0.01)
+    for r in ROUTES:
+        for status in (200, 429, 503):
+            http_seconds.labels("POST", r, status).observe(0.05)
+
+    rows = [
+        ("counter inc", per_call_us(lambda: counter.labels("rules").inc(), number=50000)),
+        ("histogram observe", per_call_us(lambda: stage_seconds.labels("tts").observe(0.002), number=50000)),
+        ("stage timer (empty block)", per_call_us(empty, number=50000)),
+        ("stage() with span", per_call_us(in_trace, number=500) / 100),
+        ("parse_intent", per_call_us(bare, number=20000)),
+        ("parse_intent + timer", per_call_us(timed, number=20000)),
+        ("render /metrics", per_call_us(registry.render, number=500)),
+    ]
+    print(f"{'operation':<28} {'us':>8}")
+    for name, us in rows:
+        print(f"{name:<28} {us:>8.2f}")
+    print(f"/metrics body: {len(registry.render())} bytes")
+
+
+if __name__ == "__main__":
+    main()
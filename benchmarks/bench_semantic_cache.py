@@ -0,0 +1,59 @@
+"""Semantic intent cache lookup cost as the index grows.
+
+Uses random vectors of Ollama-embedding size (768) through a stub embedder,
+so the numbers cover the similarity search and entity check only, not the
+embedding call. Entries are spread over the whitelisted apps and services the
+way real LLM-resolved intents are; "full scan" scores every row, which is what
+the entity-word prefilter avoids.
+
+    python -m benchmarks.bench_semantic_cache
+"""
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from astra.agent.executor import WHITELIST
+from astra.agent.intent_parser import Intent
+from astra.agent.semantic_cache import SemanticIntentCache
+
+from .common import per_call_us
+
+DIM = 768
+
+
+class _RandomEmbedder:
+    name = "random"
+
+    def __init__(self, seed: int = 0):
+        self._rng = np.random.default_rng(seed)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._rng.standard_normal((len(texts), DIM)).astype(np.float32)
+
+
+def _intents() -> List[Intent]:
+    intents = [Intent("open_app", {"app": app}, 0.9) for app in sorted(WHITELIST["apps"])]
+    for service in sorted(WHITELIST["services"]):
+        for action in sorted(WHITELIST["service_actions"]):
+            intents.append(Intent("manage_service", {"action": action, "service": service}, 0.9))
+    return intents
+
+
+def main() -> None:
+    intents = _intents()
+    query = np.random.default_rng(1).standard_normal(DIM).astype(np.float32)
+    print(f"{'entries':>8} {'lookup us':>10} {'full scan us':>13}")
+    for size in (1_000, 10_000, 50_000):
+        cache = SemanticIntentCache(_RandomEmbedder(), path=None, max_entries=size, threshold=0.99)
+        for i in range(size):
+            cache.add(f"utterance {i}", intents[i % len(intents)])
+        assert cache.size == size
+        lookup_us = per_call_us(cache.lookup, "bring up firefox now", number=200)
+        full_us = per_call_us(lambda: cache._vectors[:size] @ query, number=50)
+        print(f"{size:>8} {lookup_us:>10.1f} {full_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def per_call_us(fn: Callable[..., Any], *args: Any, number: int = 2000, repeat: int = 5) -> float:
+    """Best-of-``repeat`` mean wall time of ``fn(*args)`` in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def percentiles(samples: List[float], points: Sequence[float] = (50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of ``samples``, keyed "p50", "p95", ..."""
+    ordered = sorted(samples)
+    out: Dict[str, float] = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        out[f"p{p:g}"] = ordered[rank - 1] if ordered else float("nan")
+    return out
+
+
+@dataclass
+class Result:
+    """One comparable number; ``better`` says which direction is an improvement."""
+
+    name: str
+    value: float
+    unit: str
+    better: str = "lower"  # lower|higher
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        rev = ""
+    return {
+        "git_rev": rev or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": int(time.time()),
+    }
+
+
+def write_results(path: str, results: List[Result], **meta: Any) -> None:
+    doc = {"meta": {**environment(), **meta}, "results": [asdict(r) for r in results]}
+    Path(path).write_text(json.dumps(doc, indent=2) + "\n")
+
+
+def load_results(path: str) -> Tuple[Dict[str, Any], Dict[str, Result]]:
+    doc = json.loads(Path(path).read_text())
+    return doc.get("meta", {}), {r["name"]: Result(**r) for r in doc["results"]}
+
+
+def isolate_environment(ollama_url: str = "http://127.0.0.1:9") -> Path:
+    """Point Astra's on-disk state at a temp dir and its model calls at ``ollama_url``.
+
+    Config is read when ``astra`` is first imported, so call this before that.
+    Whisper models are not preloaded; the STT benchmarks load one explicitly.
+    """
+    if "astra.agent.config" in sys.modules:
+        raise RuntimeError("isolate_environment() must run before astra is imported")
+    root = Path(tempfile.mkdtemp(prefix="astra-bench-"))
+    os.environ.update({
+        "ASTRA_AUDIT_DIR": str(root / "audit"),
+        "ASTRA_AUDIT_KEY": str(root / "audit" / "key.fernet"),
+        "ASTRA_SEMANTIC_CACHE_PATH": str(root / "semantic_intents.npz"),
+        "ASTRA_LLM_CACHE_DB": "",
+        "WHISPER_PRELOAD": "",
+        "OLLAMA_URL": ollama_url,
+    })
+    return root
@@ -0,0 +1,64 @@
+"""Compare two benchmark result files and flag regressions.
+
+A metric regresses when it moves the wrong way (see each result's
+``better``) by more than ``--threshold`` (relative; default 10%). Metrics
+below ``--floor`` in both runs are ignored, since timer noise dominates
+them. Exits 1 when anything regressed, so it can gate CI.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+from typing import List, Optional
+
+from .common import Result, load_results
+
+
+def change(base: Result, head: Result) -> Optional[float]:
+    """Relative change, positive meaning worse; None when it cannot be computed."""
+    if not base.value or math.isnan(base.value) or math.isnan(head.value):
+        return None
+    delta = (head.value - base.value) / abs(base.value)
+    return -delta if base.better == "higher" else delta
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compare two Astra benchmark result files")
+    ap.add_argument("base")
+    ap.add_argument("head")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    ap.add_argument("--floor", type=float, default=0.0, help="ignore metrics below this value in both runs")
+    args = ap.parse_args(argv)
+    base_meta, base = load_results(args.base)
+    head_meta, head = load_results(args.head)
+    print(f"base: {base_meta.get('git_rev')}  head: {head_meta.get('git_rev')}  threshold: {args.threshold:.0%}")
+    for key in ("python", "platform", "cpus", "scale", "requests", "concurrency", "fake_latency_ms"):
+        if base_meta.get(key) != head_meta.get(key):
+            print(f"warning: {key} differs ({base_meta.get(key)} vs {head_meta.get(key)})")
+
+    width = max(len(n) for n in {*base, *head})
+    regressions = 0
+    for name in sorted({*base, *head}):
+        if name not in base or name not in head:
+            print(f"{name:<{width}}  only in {'head' if name in head else 'base'}")
+            continue
+        b, h = base[name], head[name]
+        worse = change(b, h)
+        flag = ""
+        if worse is not None and max(b.value, h.value) >= args.floor:
+            if worse > args.threshold:
+                flag = "REGRESSION"
+                regressions += 1
+            elif worse < -args.threshold:
+                flag = "improved"
+        pct = "n/a" if worse is None else f"{(h.value - b.value) / abs(b.value):+.1%}"
+        print(f"{name:<{width}}  {b.value:>12.3f} -> {h.value:>12.3f} {h.unit:<10} {pct:>8}  {flag}")
+    print(f"\n{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Local stand-in for the Ollama HTTP API, for benchmarks that must run offline.
+
+Serves the endpoints Astra calls: ``/api/tags`` (health probe), ``/api/chat``
+(buffered and streamed) and ``/api/embed``. Every chat reply waits
+``latency_ms`` before the first token and then emits ``tokens_per_sec``
+tokens per second, so model cost can be dialled in without a GPU. Intent
+prompts get a fixed JSON intent; other prompts get filler text. Embeddings
+are pseudo-random per text, so paraphrases do not hit the semantic cache.
+
+    python -m benchmarks.fake_ollama --port 11434 --latency-ms 150 --tokens-per-sec 40
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+INTENT_REPLY = '{"intent": "open_app", "entities": {"app": "firefox"}, "confidence": 0.9}'
+FILLER = "Sure. Here is a short answer that stands in for a real model reply on this machine."
+
+
+class FakeOllama:
+    """Threaded fake server; use as a context manager or call start/stop."""
+
+    def __init__(self, latency_ms: float = 50.0, tokens_per_sec: float = 200.0, reply_tokens: int = 24,
+                 host: str = "127.0.0.1", port: int = 0, embed_dim: int = 64):
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.reply_tokens = reply_tokens
+        self.embed_dim = embed_dim
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeOllama:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeOllama:
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def reply(self, body: Dict[str, Any]) -> List[str]:
+        messages = body.get("messages") or []
+        system = messages[0].get("content", "") if messages else ""
+        if "intent" in system.lower():
+            return [INTENT_REPLY]
+        words = (FILLER.split() * (self.reply_tokens // len(FILLER.split()) + 1))[: self.reply_tokens]
+        return [w + " " for w in words]
+
+    def embedding(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.embed_dim).round(6).tolist()
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _json(self, payload: Any) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, payload: Any) -> None:
+                data = (json.dumps(payload) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_GET(self) -> None:
+                fake.requests += 1
+                self._json({"models": [{"name": "fake:latest"}]})
+
+            def do_POST(self) -> None:
+                fake.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path.startswith("/api/embed"):
+                    texts = body.get("input")
+                    texts = [texts] if isinstance(texts, str) else texts or []
+                    self._json({"embeddings": [fake.embedding(t) for t in texts]})
+                    return
+                tokens = fake.reply(body)
+                gap = 1.0 / fake.tokens_per_sec if fake.tokens_per_sec > 0 else 0.0
+                time.sleep(fake.latency_ms / 1000)
+                if not body.get("stream"):
+                    time.sleep(gap * (len(tokens) - 1))
+                    self._json({"message": {"role": "assistant", "content": "".join(tokens)}, "done": True,
+                                "eval_count": len(tokens)})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(gap)
+                    self._chunk({"message": {"role": "assistant", "content": token}, "done": False})
+                self._chunk({"done": True, "eval_count": len(tokens)})
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11434)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="delay before the first token")
+    ap.add_argument("--tokens-per-sec", type=float, default=200.0)
+    ap.add_argument("--reply-tokens", type=int, default=24)
+    args = ap.parse_args()
+    fake = FakeOllama(args.latency_ms, args.tokens_per_sec, args.reply_tokens, args.host, args.port)
+    print(f"fake Ollama on {fake.url} (first token {args.latency_ms:g} ms, {args.tokens_per_sec:g} tok/s)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
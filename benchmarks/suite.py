@@ -0,0 +1,44 @@
+"""Run the hot-path microbenchmarks and the end-to-end scenarios offline, as one JSON file.
+
+Nothing leaves the machine: model calls go to a fake Ollama on a free local
+port and all state lives in a temp dir. Compare two result files with
+``python -m benchmarks.compare``.
+
+    python -m benchmarks.suite --out bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --quick --out /tmp/quick.json   # fewer iterations, for CI
+"""
+from __future__ import annotations
+
+import argparse
+
+from . import bench_e2e, bench_hot_paths
+from .common import isolate_environment, write_results
+from .fake_ollama import FakeOllama
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Astra offline benchmark suite")
+    ap.add_argument("--out", required=True, help="results JSON")
+    ap.add_argument("--quick", action="store_true", help="smaller iteration counts and request totals")
+    ap.add_argument("--requests", type=int, help="requests per e2e scenario (default 200, quick 50)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="fake model time to first token")
+    ap.add_argument("--tokens-per-sec", type=float, default=200.0, help="fake model generation speed")
+    ap.add_argument("--stt-model", help="also time transcription with this Whisper model (must be available)")
+    args = ap.parse_args()
+    scale = 0.2 if args.quick else 1.0
+    requests = args.requests or (50 if args.quick else 200)
+
+    with FakeOllama(args.latency_ms, args.tokens_per_sec) as fake:
+        isolate_environment(fake.url)
+        results = bench_hot_paths.run(scale, args.stt_model)
+        bench_hot_paths.print_results(results)
+        print()
+        results += bench_e2e.run(requests, args.concurrency, args.stt_model)
+    write_results(args.out, results, suite="full", scale=scale, requests=requests, concurrency=args.concurrency,
+                  fake_latency_ms=args.latency_ms, fake_tokens_per_sec=args.tokens_per_sec)
+    print(f"\nwrote {len(results)} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()